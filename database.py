@@ -3,54 +3,504 @@ Barkod Stok Takip Sistemi - Veritabanı Modülü
 SQLite ile stok yönetimi ve satış kayıtları
 """
 
+import functools
+import json
+import re
 import sqlite3
-from datetime import datetime, date
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, date, timedelta
 from typing import List, Tuple, Optional, Dict
 import os
 
+from money import format_money, to_cents
+
+
+# SQLite eski sürümlerde sorgu başına en fazla 999 parametre kabul eder
+SQLITE_MAX_PARAMS = 900
+
+# Bağlantı başına hazırlanmış (prepared) statement önbelleği. Değişken
+# uzunluklu IN (...) sorguları da önbelleğe girdiği için varsayılan 128'den
+# büyük tutulur; sık kullanılan sorgular önbellekten düşmez.
+STATEMENT_CACHE_SIZE = 512
+
+# Ürün satırı: product.price ile isimle veya product[6] ile sırayla okunur.
+# namedtuple __slots__ kullanır, dict/sqlite3.Row'dan hafiftir.
+ProductRow = namedtuple(
+    "ProductRow", "id product_id barcode name size quantity price created_at updated_at"
+)
+PRODUCT_COLUMNS = ", ".join(ProductRow._fields)
+
+# tuple -> ProductRow dönüşümü. Performans için değil, isimle erişim için:
+# ölçümlerde (scripts/bench_queries.py) çok satırlı sonuçlarda düz tuple'dan
+# %10-35 pahalı. Bu yüzden sayfa ve arama sorguları (liste sadece
+# görünen satırları biçimlendirir) düz tuple döndürür - bkz. _query_rows. Alan
+# sayısı kontrolü yapılmaz - sadece PRODUCT_COLUMNS seçen sorgularla kullanılır.
+_make_product = functools.partial(tuple.__new__, ProductRow)
+
+# get_many_by_barcode: bu sayıdan fazla barkod tek sorguda json_each ile,
+# azı parça parça IN (...) sorgularıyla çözülür. Geçici tablo + JOIN de
+# denendi; tabloya yazma maliyeti yüzünden her boyutta IN'den yavaştı.
+BARCODE_JSON_THRESHOLD = 5000
+# Bu sayıya kadar barkodluk toplu sorguların sonuçları önbelleğe yazılır
+# (büyük sayım/içe aktarma listeleri sık okutulan ürünleri önbellekten atmasın)
+BARCODE_CACHE_FILL_LIMIT = 64
+
+
+# Ürün sorguları (isim -> SQL). Metinler modül yüklenirken bir kez kurulur;
+# aynı metin her çağrıda aynı hazırlanmış statement'ı kullanır.
+_PRODUCT_ORDER = "ORDER BY product_id, size, id"
+_PRODUCT_ORDER_DESC = "ORDER BY product_id DESC, size DESC, id DESC"
+PRODUCT_QUERIES = {
+    'by_barcode': f"SELECT {PRODUCT_COLUMNS} FROM products WHERE barcode = ?",
+    'by_product_id': f"SELECT {PRODUCT_COLUMNS} FROM products WHERE product_id = ? ORDER BY size",
+    'all': f"SELECT {PRODUCT_COLUMNS} FROM products ORDER BY product_id, size",
+    'page_offset': f"SELECT {PRODUCT_COLUMNS} FROM products {_PRODUCT_ORDER} LIMIT ? OFFSET ?",
+    'page_first': f"SELECT {PRODUCT_COLUMNS} FROM products {_PRODUCT_ORDER} LIMIT ?",
+    'page_last': f"SELECT {PRODUCT_COLUMNS} FROM products {_PRODUCT_ORDER_DESC} LIMIT ?",
+    'page_next': f"SELECT {PRODUCT_COLUMNS} FROM products "
+                 f"WHERE (product_id, size, id) > (?, ?, ?) {_PRODUCT_ORDER} LIMIT ?",
+    'page_at': f"SELECT {PRODUCT_COLUMNS} FROM products "
+               f"WHERE (product_id, size, id) >= (?, ?, ?) {_PRODUCT_ORDER} LIMIT ?",
+    'page_prev': f"SELECT {PRODUCT_COLUMNS} FROM products "
+                 f"WHERE (product_id, size, id) < (?, ?, ?) {_PRODUCT_ORDER_DESC} LIMIT ?",
+    # bm25 ağırlıkları: barkod ve ürün ID eşleşmeleri isimden önce gelir
+    'fts_ranked': "SELECT " + ", ".join(f"p.{c}" for c in ProductRow._fields) + " "
+                  "FROM products_fts f JOIN products p ON p.id = f.rowid "
+                  "WHERE products_fts MATCH ? "
+                  "ORDER BY bm25(products_fts, 1.0, 5.0, 10.0), p.product_id, p.size LIMIT ?",
+    # Sadece rowid <= ? olan eşleşmeleri sırala (bkz. FTS_RANK_WINDOW)
+    'fts_ranked_window': "SELECT " + ", ".join(f"p.{c}" for c in ProductRow._fields) + " "
+                         "FROM products_fts f JOIN products p ON p.id = f.rowid "
+                         "WHERE products_fts MATCH ? AND f.rowid <= ? "
+                         "ORDER BY bm25(products_fts, 1.0, 5.0, 10.0), p.product_id, p.size LIMIT ?",
+    # Tam eşleşme araması (FTS5 yoksa)
+    'exact_product_id': f"SELECT {PRODUCT_COLUMNS} FROM products WHERE product_id = ? "
+                        f"ORDER BY product_id, size LIMIT ?",
+    'exact_barcode': f"SELECT {PRODUCT_COLUMNS} FROM products WHERE barcode = ? "
+                     f"ORDER BY product_id, size LIMIT ?",
+    'exact_name': f"SELECT {PRODUCT_COLUMNS} FROM products WHERE name = ? "
+                  f"ORDER BY product_id, size LIMIT ?",
+    'exact_all': f"SELECT {PRODUCT_COLUMNS} FROM products "
+                 f"WHERE product_id = ? OR barcode = ? OR name = ? ORDER BY product_id, size LIMIT ?",
+}
+
+# Bağlantı açılırken uygulanan PRAGMA profilleri
+#   legacy: SQLite varsayılanları (rollback journal, synchronous=FULL)
+#   safe:   WAL + FULL - her commit diske yazılır, okuyucular bloklanmaz
+#   fast:   WAL + NORMAL - elektrik kesintisinde son commit'ler kaybolabilir,
+#           uygulama çökmesinde veri kaybı yok
+DB_PROFILES = {
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+# PRAGMA'ların geri okunan sayısal değerleri -> isim
+_SYNCHRONOUS_NAMES = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+_TEMP_STORE_NAMES = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def _synchronized(method):
+    """
+    Metodu bağlantı kilidi altında çalıştır.
+    
+    Bağlantı ve paylaşılan self.cursor birden fazla thread'den (ör. arka
+    planda arama) kullanılabildiği için her genel metot tek seferde bir
+    thread tarafından çalıştırılır.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class BarcodeCache:
+    """
+    Barkod → ürün satırı için sınırlı boyutlu LRU önbellek.
+    
+    Satış ekranında her okutma search_by_barcode çağırır; sık okutulan
+    ürünler SQLite'a gitmeden bellekten döner. Yazma işlemleri ilgili
+    kayıtları geçersiz kılar (invalidate); başka bir bağlantı commit
+    ettiğinde Database önbelleği tamamen boşaltır (PRAGMA data_version).
+    """
+    
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._rows: "OrderedDict[str, Tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, barcode: str) -> Optional[Tuple]:
+        row = self._rows.get(barcode)
+        if row is None:
+            self.misses += 1
+            return None
+        self._rows.move_to_end(barcode)
+        self.hits += 1
+        return row
+    
+    def put(self, barcode: str, row: Tuple):
+        if self.maxsize <= 0:
+            return
+        self._rows[barcode] = row
+        self._rows.move_to_end(barcode)
+        if len(self._rows) > self.maxsize:
+            self._rows.popitem(last=False)
+    
+    def invalidate(self, barcode: str):
+        self._rows.pop(barcode, None)
+    
+    def invalidate_row(self, row_id: int):
+        """Satır ID'si ile geçersiz kıl (barkod değişmiş olabilir)."""
+        for barcode, row in list(self._rows.items()):
+            if row[0] == row_id:
+                del self._rows[barcode]
+    
+    def invalidate_product_id(self, product_id: str):
+        """Aynı modelin tüm bedenlerini geçersiz kıl."""
+        for barcode, row in list(self._rows.items()):
+            if row[1] == product_id:
+                del self._rows[barcode]
+    
+    def clear(self):
+        self._rows.clear()
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._rows),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
 
 class Database:
-    def __init__(self, db_path: str = "stock.db"):
+    def __init__(self, db_path: str = "stock.db", cache_size: int = 2048, profile: str = "safe"):
         """Veritabanı bağlantısını başlat ve tabloları oluştur."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # Arka plan thread'leri de kullanabilir - erişim self.lock ile sıralanır
+        self.conn = sqlite3.connect(db_path, check_same_thread=False,
+                                    cached_statements=STATEMENT_CACHE_SIZE)
         self.cursor = self.conn.cursor()
-        self._create_tables()
-        self._migrate_tables()
+        self.lock = threading.RLock()
+        self.barcode_cache = BarcodeCache(cache_size)
+        self.profile = profile
+        start = time.perf_counter()
+        self.pragmas = self._apply_profile(profile)
+        self.fts_enabled = False
+        # Ürün sayısı önbelleği - ekleme/silmede veya başka bir bağlantı
+        # commit ettiğinde (PRAGMA data_version) geçersiz olur
+        self._product_count: Optional[int] = None
+        self._data_version: Optional[int] = None
+        # Bu açılışta uygulanan migration sürümleri (güncelse boş)
+        self.applied_migrations = self._run_migrations()
+        self.schema_setup = bool(self.applied_migrations)
+        self.open_time = time.perf_counter() - start
     
-    def _create_tables(self):
-        """Gerekli tabloları oluştur."""
-        # Ürünler tablosu
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id TEXT NOT NULL,
-                barcode TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                size TEXT DEFAULT '',
-                quantity INTEGER DEFAULT 0,
-                price REAL DEFAULT 0.0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    def _apply_profile(self, profile: str) -> Dict:
+        """
+        PRAGMA profilini uygula ve gerçekten uygulanan değerleri döndür.
+        
+        SQLite bazı ayarları sessizce reddedebilir (ör. :memory: veya ağ
+        sürücüsünde WAL), bu yüzden değerler uygulandıktan sonra geri okunur.
+        """
+        if profile not in DB_PROFILES:
+            raise ValueError(f"Bilinmeyen veritabanı profili: {profile}")
+        
+        settings = DB_PROFILES[profile]
+        for name, value in settings.items():
+            self.cursor.execute(f"PRAGMA {name} = {value}")
+        
+        applied = {}
+        for name in settings:
+            self.cursor.execute(f"PRAGMA {name}")
+            row = self.cursor.fetchone()
+            value = row[0] if row else None
+            if name == "journal_mode" and value is not None:
+                value = value.upper()
+            elif name == "synchronous":
+                value = _SYNCHRONOUS_NAMES.get(value, value)
+            elif name == "temp_store":
+                value = _TEMP_STORE_NAMES.get(value, value)
+            applied[name] = value
+        return applied
+    
+    def get_pragma_report(self) -> Dict:
+        """Aktif profil ve istenen/uygulanan PRAGMA değerleri."""
+        requested = DB_PROFILES[self.profile]
+        return {
+            'profile': self.profile,
+            'settings': {
+                name: {
+                    'requested': requested[name],
+                    'applied': self.pragmas.get(name),
+                    'ok': str(requested[name]).upper() == str(self.pragmas.get(name)).upper()
+                }
+                for name in requested
+            }
+        }
+    
+    # ========== ŞEMA / MIGRATION ==========
+    
+    # Sıralı şema adımları: (sürüm, açıklama, metot adı). Yeni tablo/index
+    # eklemek için listenin sonuna yeni sürüm eklenir. Adımlar:
+    #   - tekrar çalıştırılabilir olmalı (IF NOT EXISTS, kolon kontrolü vb.)
+    #   - commit etmemeli; runner her adımı tek transaction'da çalıştırır ve
+    #     user_version'ı aynı transaction'da yazar (yarım kalan adım geri alınır)
+    MIGRATIONS = [
+        (1, "Temel tablolar, index'ler ve eski verilerin aktarımı", "_migration_base_schema"),
+        (2, "FTS5 ürün arama index'i", "_create_search_index"),
+        (3, "Tutarlar REAL liradan INTEGER kuruşa", "_migration_integer_money"),
+        (4, "Stok toplamları özeti (inventory_totals)", "_create_inventory_totals"),
+        (5, "Stok sayımı denetim kayıtları", "_migration_stock_takes"),
+        (6, "Stok hareket defteri ve açılış bakiyeleri", "_migration_stock_movements"),
+    ]
+    SCHEMA_VERSION = MIGRATIONS[-1][0]
+    
+    def get_schema_version(self) -> int:
+        """Veritabanında kayıtlı şema sürümü (PRAGMA user_version)."""
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+    
+    def _run_migrations(self) -> List[int]:
+        """
+        Kayıtlı sürümden sonraki migration adımlarını sırayla uygula.
+        
+        Veritabanı güncelse (user_version == SCHEMA_VERSION) CREATE/ALTER
+        veya veri taraması yapılmaz, sadece sürüm ve FTS tablosu kontrol
+        edilir - büyük veritabanlarında açılış yavaşlamaz.
+        
+        Returns:
+            Uygulanan sürümler (güncelse boş liste)
+        """
+        current = self.get_schema_version()
+        
+        if current > self.SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Veritabanı şeması (v{current}) bu uygulama sürümünden yeni (v{self.SCHEMA_VERSION})"
             )
-        ''')
         
-        # Satışlar tablosu (gün sonu için)
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sale_date DATE NOT NULL,
-                total_amount REAL NOT NULL,
-                payment_method TEXT NOT NULL,
-                items_json TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        if current == self.SCHEMA_VERSION:
+            self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
             )
-        ''')
+            if self.cursor.fetchone():
+                self.fts_enabled = True
+            else:
+                # Şema FTS5 olmayan bir SQLite ile kurulmuş olabilir - tekrar dene
+                self._create_search_index()
+                self.conn.commit()
+            return []
+        
+        applied = []
+        for version, description, step in self.MIGRATIONS:
+            if version <= current:
+                continue
+            
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                getattr(self, step)()
+                self.cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            applied.append(version)
         
-        self.conn.commit()
+        return applied
+    
+    def _migration_base_schema(self):
+        """v1: Tablolar, index'ler, items_json -> sale_items ve daily_totals doldurma."""
+        self._create_tables()
+        self._create_indexes()
+        self._backfill_sale_items()
         
-        # Performans için index'ler
+        # daily_totals yeni oluşturulduysa mevcut satışlardan doldur
+        self.cursor.execute("SELECT 1 FROM daily_totals LIMIT 1")
+        if not self.cursor.fetchone():
+            self._fill_daily_totals()
+    
+    # Tablo tanımları (isim -> kolonlar). Tutarlar kuruş cinsinden INTEGER.
+    TABLE_DEFINITIONS = {
+        # Ürünler tablosu
+        'products': '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id TEXT NOT NULL,
+            barcode TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            size TEXT DEFAULT '',
+            quantity INTEGER DEFAULT 0,
+            price INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ''',
+        # Satışlar tablosu (gün sonu için)
+        'sales': '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_date DATE NOT NULL,
+            total_amount INTEGER NOT NULL,
+            payment_method TEXT NOT NULL,
+            items_json TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ''',
+        # Satış satırları (items_json yerine normalize tablo)
+        'sale_items': '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL REFERENCES sales(id),
+            product_row_id INTEGER,
+            barcode TEXT NOT NULL,
+            name TEXT DEFAULT '',
+            size TEXT DEFAULT '',
+            quantity INTEGER NOT NULL,
+            unit_price INTEGER NOT NULL,
+            line_total INTEGER NOT NULL
+        ''',
+        # Günlük satış özeti (rollup) - record_sale ile aynı transaction'da güncellenir
+        'daily_totals': '''
+            sale_date DATE NOT NULL,
+            payment_method TEXT NOT NULL,
+            sale_count INTEGER NOT NULL DEFAULT 0,
+            total_amount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (sale_date, payment_method)
+        ''',
+        # Stok toplamları (tek satır) - products tetikleyicileriyle güncellenir
+        'inventory_totals': '''
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_quantity INTEGER NOT NULL DEFAULT 0,
+            total_value INTEGER NOT NULL DEFAULT 0
+        ''',
+        # Uygulanan stok sayımları (denetim kaydı)
+        'stock_takes': '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            full_count INTEGER NOT NULL DEFAULT 0,
+            counted_items INTEGER NOT NULL DEFAULT 0,
+            adjusted_items INTEGER NOT NULL DEFAULT 0,
+            quantity_delta INTEGER NOT NULL DEFAULT 0,
+            value_delta INTEGER NOT NULL DEFAULT 0,
+            note TEXT DEFAULT ''
+        ''',
+        # Sayımda düzeltilen satırlar - düzeltme öncesi/sonrası adet
+        'stock_take_lines': '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_take_id INTEGER NOT NULL REFERENCES stock_takes(id),
+            product_row_id INTEGER,
+            barcode TEXT NOT NULL,
+            expected_quantity INTEGER NOT NULL,
+            counted_quantity INTEGER NOT NULL,
+            price INTEGER NOT NULL DEFAULT 0
+        ''',
+        # Stok hareket defteri (sadece ekleme) - adet değişikliğiyle aynı transaction'da yazılır
+        'stock_movements': '''
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            barcode TEXT NOT NULL,
+            delta INTEGER NOT NULL,
+            reason TEXT NOT NULL,
+            sale_id INTEGER REFERENCES sales(id),
+            created_at TIMESTAMP NOT NULL
+        ''',
+        # Defterden sıkıştırılan hareketlerin barkod bazında toplamı (açılış bakiyesi)
+        'stock_snapshots': '''
+            barcode TEXT PRIMARY KEY,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            movement_count INTEGER NOT NULL DEFAULT 0,
+            snapshot_at TIMESTAMP
+        ''',
+        # Günlük hareket özeti (rollup) - stock_movements tetikleyicisiyle güncellenir,
+        # sıkıştırmadan etkilenmez
+        'stock_movement_days': '''
+            day DATE NOT NULL,
+            reason TEXT NOT NULL,
+            movement_count INTEGER NOT NULL DEFAULT 0,
+            quantity_in INTEGER NOT NULL DEFAULT 0,
+            quantity_out INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, reason)
+        ''',
+    }
+    
+    # Kuruş cinsinden tutulan kolonlar (tablo -> kolonlar)
+    MONEY_COLUMNS = {
+        'products': ("price",),
+        'sales': ("total_amount",),
+        'sale_items': ("unit_price", "line_total"),
+        'daily_totals': ("total_amount",),
+        'inventory_totals': ("total_value",),
+        'stock_takes': ("value_delta",),
+        'stock_take_lines': ("price",),
+    }
+    
+    def _migration_integer_money(self):
+        """
+        v3: REAL (lira) tutar kolonlarını INTEGER (kuruş) yap.
+        
+        SQLite kolon tipini değiştiremediği için tablo yeni tanımla kopyalanır
+        (id'ler korunur), eskisi silinir ve yenisi yeniden adlandırılır. Kolon
+        tipi zaten INTEGER olan tablolar atlanır - adım tekrar çalışabilir.
+        """
+        for table in ("products", "sales", "sale_items"):
+            self._rebuild_money_table(table)
+        
+        # Özet tablosu sales'ten yeniden hesaplanır (eski değerler lira olabilir)
+        self.cursor.execute("DROP TABLE IF EXISTS daily_totals")
+        self.cursor.execute(f"CREATE TABLE daily_totals ({self.TABLE_DEFINITIONS['daily_totals']})")
+        self._fill_daily_totals()
+        
+        # Tablo silinince index'ler ve FTS tetikleyicileri de silinir
         self._create_indexes()
+        self._create_search_index()
+    
+    def _rebuild_money_table(self, table: str):
+        """Tabloyu kuruş kolonlarıyla yeniden oluştur ve verileri çevirerek kopyala."""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        columns = {row[1]: row[2].upper() for row in self.cursor.fetchall()}
+        money = self.MONEY_COLUMNS[table]
+        if all(columns.get(column) == "INTEGER" for column in money):
+            return
+        
+        names = list(columns)
+        select = ", ".join(
+            f"CAST(ROUND({name} * 100) AS INTEGER)" if name in money else name
+            for name in names
+        )
+        self.cursor.execute(f"CREATE TABLE {table}_new ({self.TABLE_DEFINITIONS[table]})")
+        self.cursor.execute(
+            f"INSERT INTO {table}_new ({', '.join(names)}) SELECT {select} FROM {table}"
+        )
+        self.cursor.execute(f"DROP TABLE {table}")
+        self.cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    
+    def _create_tables(self):
+        """Gerekli tabloları oluştur."""
+        for table, columns in self.TABLE_DEFINITIONS.items():
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        
+        # Eski veritabanları: product_id kolonu sonradan eklendi
+        self.cursor.execute("PRAGMA table_info(products)")
+        if "product_id" not in [column[1] for column in self.cursor.fetchall()]:
+            self.cursor.execute("ALTER TABLE products ADD COLUMN product_id TEXT DEFAULT ''")
     
     def _create_indexes(self):
         """Büyük veri setleri için index'ler oluştur."""
@@ -59,87 +509,309 @@ class Database:
             "CREATE INDEX IF NOT EXISTS idx_products_barcode ON products(barcode)",
             "CREATE INDEX IF NOT EXISTS idx_products_product_id ON products(product_id)",
             "CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)",
+            # Keyset pagination sırası (product_id, size, id)
+            "CREATE INDEX IF NOT EXISTS idx_products_order ON products(product_id, size, id)",
             # Satışlar tablosu
             "CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(sale_date)",
             "CREATE INDEX IF NOT EXISTS idx_sales_method ON sales(payment_method)",
+            # Raporlar için kapsayan index - aralık sorguları tabloya gitmez
+            "CREATE INDEX IF NOT EXISTS idx_sales_report ON sales(sale_date, payment_method, total_amount, created_at)",
+            # Satış satırları tablosu
+            "CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items(sale_id)",
+            "CREATE INDEX IF NOT EXISTS idx_sale_items_barcode ON sale_items(barcode)",
+            "CREATE INDEX IF NOT EXISTS idx_sale_items_product ON sale_items(product_row_id)",
         ]
         
         for idx in indexes:
-            try:
-                self.cursor.execute(idx)
-            except sqlite3.OperationalError:
-                pass  # Index zaten var
-        
-        self.conn.commit()
+            self.cursor.execute(idx)
     
-    def _migrate_tables(self):
-        """Mevcut tabloya product_id kolonu ekle (migration)."""
+    def _create_search_index(self):
+        """
+        FTS5 arama index'i (isim / ürün ID / barkod) ve senkron tetikleyicileri.
+        
+        products tablosunu içerik kaynağı olarak kullanır (external content),
+        metin iki kez saklanmaz. SQLite FTS5 olmadan derlenmişse arama
+        eski tam eşleşme sorgusuna düşer.
+        """
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+        )
+        exists = self.cursor.fetchone() is not None
+        
         try:
-            self.cursor.execute("SELECT product_id FROM products LIMIT 1")
+            self.cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                    name, product_id, barcode,
+                    content='products', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            ''')
         except sqlite3.OperationalError:
-            self.cursor.execute("ALTER TABLE products ADD COLUMN product_id TEXT DEFAULT ''")
-            self.conn.commit()
+            self.fts_enabled = False
+            return
+        
+        triggers = [
+            '''CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, name, product_id, barcode)
+                VALUES (new.id, new.name, new.product_id, new.barcode);
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, product_id, barcode)
+                VALUES ('delete', old.id, old.name, old.product_id, old.barcode);
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, product_id, barcode ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, name, product_id, barcode)
+                VALUES ('delete', old.id, old.name, old.product_id, old.barcode);
+                INSERT INTO products_fts(rowid, name, product_id, barcode)
+                VALUES (new.id, new.name, new.product_id, new.barcode);
+            END''',
+        ]
+        for trigger in triggers:
+            self.cursor.execute(trigger)
+        
+        # İlk oluşturmada mevcut ürünleri index'le
+        if not exists:
+            self.cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        
+        self.fts_enabled = True
+    
+    def _create_inventory_totals(self):
+        """
+        v4: inventory_totals tablosu, tetikleyicileri ve ilk doldurma.
+        
+        Toplam adet/değer her products yazımında (ekleme, silme, adet veya
+        fiyat değişikliği) farkı kadar güncellenir; okuma tam tablo taraması
+        yerine tek satırlık sorgudur. Tüm yazma yolları (satış, toplu yükleme,
+        düzenleme) tetikleyicilerden geçtiği için ayrıca güncelleme gerekmez.
+        """
+        self.cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS inventory_totals ({self.TABLE_DEFINITIONS['inventory_totals']})"
+        )
+        
+        triggers = [
+            '''CREATE TRIGGER IF NOT EXISTS inventory_totals_ai AFTER INSERT ON products BEGIN
+                UPDATE inventory_totals
+                SET total_quantity = total_quantity + COALESCE(new.quantity, 0),
+                    total_value = total_value + COALESCE(new.quantity * new.price, 0)
+                WHERE id = 1;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS inventory_totals_ad AFTER DELETE ON products BEGIN
+                UPDATE inventory_totals
+                SET total_quantity = total_quantity - COALESCE(old.quantity, 0),
+                    total_value = total_value - COALESCE(old.quantity * old.price, 0)
+                WHERE id = 1;
+            END''',
+            '''CREATE TRIGGER IF NOT EXISTS inventory_totals_au AFTER UPDATE OF quantity, price ON products BEGIN
+                UPDATE inventory_totals
+                SET total_quantity = total_quantity + COALESCE(new.quantity, 0) - COALESCE(old.quantity, 0),
+                    total_value = total_value + COALESCE(new.quantity * new.price, 0)
+                                              - COALESCE(old.quantity * old.price, 0)
+                WHERE id = 1;
+            END''',
+        ]
+        for trigger in triggers:
+            self.cursor.execute(trigger)
+        
+        self._fill_inventory_totals()
+    
+    def _migration_stock_takes(self):
+        """v5: stock_takes / stock_take_lines tabloları."""
+        for table in ("stock_takes", "stock_take_lines"):
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({self.TABLE_DEFINITIONS[table]})")
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stock_take_lines_take ON stock_take_lines(stock_take_id)"
+        )
+    
+    def _migration_stock_movements(self):
+        """
+        v6: Stok hareket defteri - stock_movements, stock_snapshots,
+        stock_movement_days tabloları, index'ler ve günlük özet tetikleyicisi.
+        
+        Mevcut stoklar açılış bakiyesi olarak stock_snapshots'a yazılır;
+        her barkod için bakiye + hareketler toplamı = products.quantity olur.
+        """
+        for table in ("stock_movements", "stock_snapshots", "stock_movement_days"):
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({self.TABLE_DEFINITIONS[table]})")
+        
+        # Ürün geçmişi: index (barcode, rowid) sıralı - ORDER BY id ayrıca sıralanmaz
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stock_movements_barcode ON stock_movements(barcode)"
+        )
+        # Gün listesi ve sıkıştırma (created_at < ?) için
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_stock_movements_date ON stock_movements(created_at)"
+        )
+        
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS stock_movement_days_ai AFTER INSERT ON stock_movements BEGIN
+                INSERT INTO stock_movement_days (day, reason, movement_count, quantity_in, quantity_out)
+                VALUES (substr(new.created_at, 1, 10), new.reason, 1,
+                        MAX(new.delta, 0), MAX(-new.delta, 0))
+                ON CONFLICT(day, reason) DO UPDATE SET
+                    movement_count = movement_count + 1,
+                    quantity_in = quantity_in + excluded.quantity_in,
+                    quantity_out = quantity_out + excluded.quantity_out;
+            END
+        ''')
+        
+        # Açılış bakiyesi = stok - mevcut hareketler. Adım yeniden çalışırsa
+        # (ör. user_version geri alınmışsa) deftere yazılmış hareketler iki kez
+        # sayılmaz; bakiyesi olan barkodlara dokunulmaz.
+        self.cursor.execute('''
+            INSERT INTO stock_snapshots (barcode, quantity, movement_count, snapshot_at)
+            SELECT barcode, opening, 0, ? FROM (
+                SELECT p.barcode,
+                       p.quantity - COALESCE((SELECT SUM(m.delta) FROM stock_movements m
+                                              WHERE m.barcode = p.barcode), 0) AS opening
+                FROM products p
+                WHERE p.barcode NOT IN (SELECT barcode FROM stock_snapshots)
+            )
+            WHERE opening != 0
+        ''', (datetime.now(),))
+    
+    def _fill_inventory_totals(self):
+        """inventory_totals'ı products'tan yeniden hesapla (commit etmez)."""
+        self.cursor.execute('''
+            INSERT OR REPLACE INTO inventory_totals (id, total_quantity, total_value)
+            SELECT 1, COALESCE(SUM(quantity), 0), COALESCE(SUM(quantity * price), 0)
+            FROM products
+        ''')
+    
+    def _backfill_sale_items(self):
+        """
+        Eski satışların items_json içeriğini sale_items tablosuna aktar (tek seferlik).
+        
+        sale_items boşsa ve items_json dolu satış varsa çalışır.
+        """
+        self.cursor.execute("SELECT 1 FROM sale_items LIMIT 1")
+        if self.cursor.fetchone():
+            return
+        self.cursor.execute("SELECT 1 FROM sales WHERE items_json IS NOT NULL LIMIT 1")
+        if not self.cursor.fetchone():
+            return
+        
+        rows = []
+        self.cursor.execute("SELECT id, items_json FROM sales WHERE items_json IS NOT NULL")
+        for sale_id, items_json in self.cursor.fetchall():
+            try:
+                items = json.loads(items_json)
+            except ValueError:
+                continue
+            # items_json'daki fiyatlar lira cinsinden
+            items = [
+                {**item, 'price': to_cents(item.get('price', 0)),
+                 'total': to_cents(item['total']) if 'total' in item else None}
+                for item in items
+            ]
+            rows.extend(self._sale_item_rows(sale_id, items))
+        
+        self.cursor.executemany('''
+            INSERT INTO sale_items (sale_id, product_row_id, barcode, name, size,
+                                    quantity, unit_price, line_total)
+            VALUES (?, (SELECT id FROM products WHERE barcode = ?), ?, ?, ?, ?, ?, ?)
+        ''', [(r[0], r[2], *r[2:]) for r in rows])
     
     # ========== ÜRÜN İŞLEMLERİ ==========
     
+    def _query_products(self, name: str, params: Tuple = ()) -> List[ProductRow]:
+        """Kayıtlı ürün sorgusunu çalıştır (PRODUCT_QUERIES)."""
+        self.cursor.execute(PRODUCT_QUERIES[name], params)
+        return list(map(_make_product, self.cursor.fetchall()))
+    
+    def _query_rows(self, name: str, params: Tuple = ()) -> List[Tuple]:
+        """
+        Kayıtlı ürün sorgusu - düz tuple satırlar (ProductRow sırasıyla).
+        
+        Çok satırlı sayfa/arama sonuçlarında kullanılır; liste sadece görünen
+        satırları biçimlendirir, her satırı ProductRow'a çevirmek boşa gider.
+        """
+        self.cursor.execute(PRODUCT_QUERIES[name], params)
+        return self.cursor.fetchall()
+    
+    def _query_product(self, name: str, params: Tuple = ()) -> Optional[ProductRow]:
+        """Kayıtlı ürün sorgusunun ilk satırı."""
+        self.cursor.execute(PRODUCT_QUERIES[name], params)
+        row = self.cursor.fetchone()
+        return _make_product(row) if row is not None else None
+    
+    @_synchronized
     def add_product(self, product_id: str, barcode: str, name: str, size: str = "", 
-                    quantity: int = 0, price: float = 0.0) -> Tuple[bool, str]:
-        """Yeni ürün ekle veya mevcut ürünün stokunu artır."""
+                    quantity: int = 0, price: int = 0) -> Tuple[bool, str]:
+        """
+        Yeni ürün ekle veya mevcut ürünün stokunu artır.
+        
+        Stok göreli olarak artırılır (quantity = quantity + ?); önbellekteki
+        adet başka bir bağlantının (içe aktarma, ikinci uygulama) yazdığını
+        görmeyebileceği için yazmada kullanılmaz.
+        """
+        now = datetime.now()
         try:
-            existing = self.search_by_barcode(barcode)
+            self.cursor.execute('''
+                UPDATE products 
+                SET quantity = quantity + ?, updated_at = ?
+                WHERE barcode = ?
+            ''', (quantity, now, barcode))
             
-            if existing:
-                new_quantity = existing[5] + quantity
-                self.cursor.execute('''
-                    UPDATE products 
-                    SET quantity = ?, updated_at = ?
-                    WHERE barcode = ?
-                ''', (new_quantity, datetime.now(), barcode))
+            if self.cursor.rowcount:
+                self._record_movements([(barcode, quantity, "add", None)], now)
+                self.cursor.execute("SELECT quantity FROM products WHERE barcode = ?", (barcode,))
+                new_quantity = self.cursor.fetchone()[0]
                 self.conn.commit()
+                self.barcode_cache.invalidate(barcode)
                 return True, f"Stok güncellendi! Yeni miktar: {new_quantity}"
             else:
                 self.cursor.execute('''
                     INSERT INTO products (product_id, barcode, name, size, quantity, price)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (product_id, barcode, name, size, quantity, price))
+                self._record_movements([(barcode, quantity, "add", None)], now)
                 self.conn.commit()
+                self._product_count = None
                 return True, "Yeni ürün başarıyla eklendi!"
                 
         except sqlite3.IntegrityError:
+            self.conn.rollback()
             return False, "Bu barkod zaten mevcut!"
         except Exception as e:
+            self.conn.rollback()
             return False, f"Hata: {str(e)}"
     
+    @_synchronized
     def remove_stock(self, barcode: str, quantity: int) -> Tuple[bool, str]:
-        """Ürün stokunu azalt."""
+        """Ürün stokunu azalt (koşullu göreli düşüm - önbellekteki adet yazılmaz)."""
         try:
-            product = self.search_by_barcode(barcode)
-            
-            if not product:
-                return False, "Ürün bulunamadı!"
-            
-            current_quantity = product[5]
-            
-            if quantity > current_quantity:
-                return False, f"Yetersiz stok! Mevcut: {current_quantity}"
-            
-            new_quantity = current_quantity - quantity
-            
+            now = datetime.now()
             self.cursor.execute('''
                 UPDATE products 
-                SET quantity = ?, updated_at = ?
-                WHERE barcode = ?
-            ''', (new_quantity, datetime.now(), barcode))
+                SET quantity = quantity - ?, updated_at = ?
+                WHERE barcode = ? AND quantity >= ?
+            ''', (quantity, now, barcode, quantity))
+            updated = self.cursor.rowcount
+            
+            self.cursor.execute("SELECT quantity FROM products WHERE barcode = ?", (barcode,))
+            row = self.cursor.fetchone()
+            if not updated:
+                self.conn.rollback()
+                if row is None:
+                    return False, "Ürün bulunamadı!"
+                return False, f"Yetersiz stok! Mevcut: {row[0]}"
+            
+            new_quantity = row[0]
+            self._record_movements([(barcode, -quantity, "remove", None)], now)
             self.conn.commit()
+            self.barcode_cache.invalidate(barcode)
             
             return True, f"Stok güncellendi! Kalan: {new_quantity}"
             
         except Exception as e:
+            self.conn.rollback()
             return False, f"Hata: {str(e)}"
     
+    @_synchronized
     def update_product(self, row_id: int, product_id: str = None, barcode: str = None, 
                        name: str = None, size: str = None,
-                       quantity: int = None, price: float = None) -> Tuple[bool, str]:
+                       quantity: int = None, price: int = None) -> Tuple[bool, str]:
         """Ürün bilgilerini güncelle."""
         try:
             updates = []
@@ -167,28 +839,42 @@ class Database:
             if not updates:
                 return False, "Güncellenecek alan yok!"
             
+            now = datetime.now()
             updates.append("updated_at = ?")
-            values.append(datetime.now())
+            values.append(now)
             values.append(row_id)
             
+            # Defter için eski barkod/adet - güncellemeyle aynı transaction'da okunur
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("SELECT barcode, quantity FROM products WHERE id = ?", (row_id,))
+            before = self.cursor.fetchone()
+            
             query = f"UPDATE products SET {', '.join(updates)} WHERE id = ?"
             self.cursor.execute(query, values)
+            if before:
+                self._record_movements(self._edit_movements(before, barcode, quantity), now)
             self.conn.commit()
+            self.barcode_cache.invalidate_row(row_id)
+            if barcode is not None:
+                self.barcode_cache.invalidate(barcode)
             
             return True, "Ürün güncellendi!"
             
         except sqlite3.IntegrityError:
+            self.conn.rollback()
             return False, "Bu barkod başka bir üründe kullanılıyor!"
         except Exception as e:
+            self.conn.rollback()
             return False, f"Hata: {str(e)}"
     
-    def update_price_by_product_id(self, product_id: str, new_price: float) -> Tuple[bool, str]:
+    @_synchronized
+    def update_price_by_product_id(self, product_id: str, new_price: int) -> Tuple[bool, str]:
         """
         Aynı ürün ID'sine sahip TÜM bedenlerin fiyatını güncelle.
         
         Args:
             product_id: Ürün/Model kodu
-            new_price: Yeni fiyat
+            new_price: Yeni fiyat (kuruş)
         
         Returns:
             (success, message) tuple
@@ -200,192 +886,1071 @@ class Database:
                 WHERE product_id = ?
             ''', (new_price, datetime.now(), product_id))
             self.conn.commit()
+            self.barcode_cache.invalidate_product_id(product_id)
             
             count = self.cursor.rowcount
             if count > 0:
-                return True, f"{count} ürün güncellendi! Yeni fiyat: {new_price:.2f} ₺"
+                return True, f"{count} ürün güncellendi! Yeni fiyat: {format_money(new_price)}"
             else:
                 return False, "Ürün bulunamadı!"
                 
         except Exception as e:
+            self.conn.rollback()
             return False, f"Hata: {str(e)}"
     
+    @_synchronized
     def delete_product(self, row_id: int) -> Tuple[bool, str]:
         """Ürünü sil."""
         try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("SELECT barcode, quantity FROM products WHERE id = ?", (row_id,))
+            before = self.cursor.fetchone()
+            
             self.cursor.execute("DELETE FROM products WHERE id = ?", (row_id,))
+            deleted = self.cursor.rowcount
+            if before:
+                self._record_movements([(before[0], -(before[1] or 0), "delete", None)], datetime.now())
             self.conn.commit()
+            self.barcode_cache.invalidate_row(row_id)
+            self._product_count = None
             
-            if self.cursor.rowcount > 0:
+            if deleted > 0:
                 return True, "Ürün silindi!"
             else:
                 return False, "Ürün bulunamadı!"
                 
         except Exception as e:
+            self.conn.rollback()
             return False, f"Hata: {str(e)}"
     
-    def get_all_products(self) -> List[Tuple]:
+    @_synchronized
+    def get_all_products(self) -> List[ProductRow]:
         """Tüm ürünleri getir."""
-        self.cursor.execute('''
-            SELECT id, product_id, barcode, name, size, quantity, price, created_at, updated_at
-            FROM products
-            ORDER BY product_id, size
-        ''')
+        return self._query_products('all')
+    
+    @_synchronized
+    def search_by_barcode(self, barcode: str) -> Optional[ProductRow]:
+        """Barkod ile ürün ara - tek ürün döner (önce önbelleğe bakar)."""
+        self._check_external_writes()
+        product = self.barcode_cache.get(barcode)
+        if product is not None:
+            return product
+        
+        product = self._query_product('by_barcode', (barcode,))
+        if product is not None:
+            self.barcode_cache.put(barcode, product)
+        return product
+    
+    @_synchronized
+    def get_many_by_barcode(self, barcodes: List[str]) -> Dict[str, ProductRow]:
+        """
+        Birden fazla barkodu tek seferde çöz.
+        
+        Önbellekte olanlar oradan, kalanlar SQLITE_MAX_PARAMS'lık IN (...)
+        parçalarıyla; büyük listeler (BARCODE_JSON_THRESHOLD üstü) tek
+        parametre olarak JSON dizisiyle gönderilir (json_each), parça başına
+        statement çalıştırma maliyeti olmaz.
+        
+        Returns:
+            {barcode: ProductRow} - bulunamayan barkodlar sonuçta yer almaz
+        """
+        self._check_external_writes()
+        unique = list(dict.fromkeys(barcodes))
+        found = {}
+        missing = []
+        for barcode in unique:
+            product = self.barcode_cache.get(barcode)
+            if product is not None:
+                found[barcode] = product
+            else:
+                missing.append(barcode)
+        
+        rows = None
+        if len(missing) > BARCODE_JSON_THRESHOLD:
+            rows = self._resolve_barcodes_json(missing)
+        if rows is None:
+            rows = []
+            for i in range(0, len(missing), SQLITE_MAX_PARAMS):
+                chunk = missing[i:i + SQLITE_MAX_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                self.cursor.execute(
+                    f"SELECT {PRODUCT_COLUMNS} FROM products WHERE barcode IN ({placeholders})", chunk
+                )
+                rows.extend(self.cursor.fetchall())
+        
+        fill_cache = len(unique) <= BARCODE_CACHE_FILL_LIMIT
+        for product in map(_make_product, rows):
+            found[product.barcode] = product
+            if fill_cache:
+                self.barcode_cache.put(product.barcode, product)
+        
+        return found
+    
+    def _resolve_barcodes_json(self, barcodes: List[str]) -> Optional[List[tuple]]:
+        """Barkod listesini tek sorguda çöz; JSON1 yoksa None (IN parçalarına düşülür)."""
+        try:
+            self.cursor.execute(
+                f"SELECT {PRODUCT_COLUMNS} FROM products "
+                f"WHERE barcode IN (SELECT value FROM json_each(?))",
+                (json.dumps(barcodes),)
+            )
+        except sqlite3.OperationalError:
+            return None
         return self.cursor.fetchall()
     
-    def search_by_barcode(self, barcode: str) -> Optional[Tuple]:
-        """Barkod ile ürün ara - tek ürün döner."""
-        self.cursor.execute('''
-            SELECT id, product_id, barcode, name, size, quantity, price, created_at, updated_at
-            FROM products
-            WHERE barcode = ?
-        ''', (barcode,))
-        return self.cursor.fetchone()
+    @_synchronized
+    def get_cache_stats(self) -> Dict:
+        """Barkod önbelleği isabet/ıskalama istatistikleri."""
+        return self.barcode_cache.stats()
     
-    def search_by_product_id(self, product_id: str) -> List[Tuple]:
+    @_synchronized
+    def search_by_product_id(self, product_id: str) -> List[ProductRow]:
         """Ürün ID ile ara - aynı modelin TÜM bedenlerini döner."""
-        self.cursor.execute('''
-            SELECT id, product_id, barcode, name, size, quantity, price, created_at, updated_at
-            FROM products
-            WHERE product_id = ?
-            ORDER BY size
-        ''', (product_id,))
-        return self.cursor.fetchall()
+        return self._query_products('by_product_id', (product_id,))
     
-    def search_products(self, search_term: str, search_type: str = "all") -> List[Tuple]:
-        """Ürün ara - TAM EŞLEŞMEile (exact match)."""
-        # Tam eşleşme için wildcard yok
-        if search_type == "product_id":
-            query = "WHERE product_id = ?"
-        elif search_type == "barcode":
-            query = "WHERE barcode = ?"
-        elif search_type == "name":
-            query = "WHERE name = ?"
-        else:  # all - herhangi birinde tam eşleşme
-            query = "WHERE product_id = ? OR barcode = ? OR name = ?"
-        
-        sql = f'''
-            SELECT id, product_id, barcode, name, size, quantity, price, created_at, updated_at
-            FROM products
-            {query}
-            ORDER BY product_id, size
-            LIMIT 100
-        '''
+    # Arama tipi -> FTS sütun filtresi ("all" tüm sütunlarda arar)
+    FTS_COLUMNS = {"name": "name", "product_id": "product_id", "barcode": "barcode"}
+    # bm25 ile sıralanan en fazla eşleşme sayısı. Daha fazla eşleşen kısa
+    # öneklerde ("ti") sadece index sırasındaki (rowid) ilk FTS_RANK_WINDOW
+    # eşleşme sıralanır; sıralama maliyeti eşleşme sayısıyla büyümez.
+    FTS_RANK_WINDOW = 1000
+    
+    def _search_match(self, search_term: str, search_type: str) -> Optional[str]:
+        """Arama metnini FTS5 MATCH ifadesine çevir ("tiş bey" -> "tiş"* "bey"*)."""
+        tokens = re.findall(r"\w+", search_term)
+        if not tokens:
+            return None
         
-        if search_type == "all":
-            self.cursor.execute(sql, (search_term, search_term, search_term))
-        else:
-            self.cursor.execute(sql, (search_term,))
+        match = " ".join(f'"{token}"*' for token in tokens)
+        column = self.FTS_COLUMNS.get(search_type)
+        if column:
+            match = f"{{{column}}} : ({match})"
+        return match
+    
+    @_synchronized
+    def search_products(self, search_term: str, search_type: str = "all", limit: int = 100) -> List[Tuple]:
+        """
+        Ürün ara - kelime ve önek (prefix) eşleşmesi, alaka sırasıyla.
         
-        return self.cursor.fetchall()
+        "tiş bey" -> adında "tiş*" VE "bey*" geçen ürünler. Sıralama SQL
+        içinde bm25 ile yapılır (ORDER BY ... LIMIT). max(limit,
+        FTS_RANK_WINDOW)'dan fazla eşleşme varsa sadece rowid sırasındaki ilk
+        pencere sıralanır - kısa öneklerde en alakalı sonuçlar bu pencereden
+        seçilir, süre toplam eşleşme sayısından bağımsız kalır.
+        Toplam eşleşme sayısı için count_search_matches. FTS5 yoksa tam
+        eşleşme aramasına düşer. Satırlar düz tuple (ProductRow sırasıyla).
+        """
+        if not self.fts_enabled:
+            return self._search_products_exact(search_term, search_type, limit)
+        
+        match = self._search_match(search_term, search_type)
+        if match is None:
+            return []
+        
+        # Pencerenin son rowid'i - index'te sıralı okunur, sıralama gerekmez
+        window = max(limit, self.FTS_RANK_WINDOW)
+        self.cursor.execute(
+            "SELECT rowid FROM products_fts WHERE products_fts MATCH ? LIMIT 1 OFFSET ?",
+            (match, window - 1)
+        )
+        row = self.cursor.fetchone()
+        if row is None:
+            # Eşleşmelerin hepsi pencereye sığıyor
+            return self._query_rows('fts_ranked', (match, limit))
+        return self._query_rows('fts_ranked_window', (match, row[0], limit))
+    
+    @_synchronized
+    def count_search_matches(self, search_term: str, search_type: str = "all") -> int:
+        """search_products ile aynı aramanın toplam eşleşme sayısı (sayfa sınırı olmadan)."""
+        if not self.fts_enabled:
+            return len(self._search_products_exact(search_term, search_type, -1))
+        
+        match = self._search_match(search_term, search_type)
+        if match is None:
+            return 0
+        self.cursor.execute(
+            "SELECT COUNT(*) FROM products_fts WHERE products_fts MATCH ?", (match,)
+        )
+        return self.cursor.fetchone()[0]
+    
+    def _search_products_exact(self, search_term: str, search_type: str = "all",
+                               limit: int = 100) -> List[Tuple]:
+        """Ürün ara - TAM EŞLEŞMEile (exact match)."""
+        # Tam eşleşme için wildcard yok
+        if search_type in ("product_id", "barcode", "name"):
+            return self._query_rows(f'exact_{search_type}', (search_term, limit))
+        # all - herhangi birinde tam eşleşme
+        return self._query_rows('exact_all', (search_term, search_term, search_term, limit))
     
+    @_synchronized
+    def rebuild_search_index(self) -> Tuple[bool, str]:
+        """FTS index'ini products tablosundan yeniden oluştur."""
+        if not self.fts_enabled:
+            return False, "FTS5 desteklenmiyor!"
+        try:
+            self.cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+            self.conn.commit()
+            return True, "Arama index'i yeniden oluşturuldu!"
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}"
+    
+    @_synchronized
     def get_all_products_paginated(self, page: int = 1, per_page: int = 50) -> Tuple[List[Tuple], int]:
         """
         Tüm ürünleri sayfalı olarak getir (pagination).
         
+        Derin sayfalar için get_products_page (keyset) tercih edilmeli.
+        
         Returns:
-            (products, total_count) tuple
+            (products, total_count) tuple - satırlar düz tuple, ProductRow sırasıyla
         """
         # Toplam sayı
-        self.cursor.execute('SELECT COUNT(*) FROM products')
-        total_count = self.cursor.fetchone()[0]
+        total_count = self.count_products()
         
         # Sayfalı sonuçlar
         offset = (page - 1) * per_page
-        self.cursor.execute('''
-            SELECT id, product_id, barcode, name, size, quantity, price, created_at, updated_at
-            FROM products
-            ORDER BY product_id, size
-            LIMIT ? OFFSET ?
-        ''', (per_page, offset))
+        return self._query_rows('page_offset', (per_page, offset)), total_count
+    
+    def _check_external_writes(self):
+        """
+        Başka bir bağlantı (içe aktarma betiği, ikinci kasa) commit ettiyse
+        önbellekleri boşalt.
         
-        return self.cursor.fetchall(), total_count
+        PRAGMA data_version sadece diğer bağlantıların commit'lerinde değişir;
+        bu bağlantının kendi yazmaları önbellekleri zaten günceller.
+        """
+        self.cursor.execute("PRAGMA data_version")
+        version = self.cursor.fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._product_count = None
+            self.barcode_cache.clear()
+    
+    @_synchronized
+    def count_products(self) -> int:
+        """Toplam ürün satırı sayısı (önbellekli)."""
+        self._check_external_writes()
+        if self._product_count is None:
+            self.cursor.execute('SELECT COUNT(*) FROM products')
+            self._product_count = self.cursor.fetchone()[0]
+        return self._product_count
     
+    @_synchronized
+    def get_products_page(self, direction: str = "first", anchor: Tuple = None,
+                          per_page: int = 50) -> List[Tuple]:
+        """
+        Keyset (seek) pagination - (product_id, size, id) sırasıyla.
+        
+        OFFSET kullanmaz; idx_products_order üzerinde doğrudan konuma atlar,
+        bu yüzden son sayfa da ilk sayfa kadar hızlıdır.
+        
+        Args:
+            direction: "first", "last", "next", "prev" veya "at"
+            anchor: (product_id, size, id) - next için sayfanın son satırı,
+                    prev/at için sayfanın ilk satırı
+            per_page: Sayfa başına satır
+        
+        Returns:
+            Sıralı ürün satırları - düz tuple, ProductRow alan sırasıyla
+        """
+        if direction in ("next", "prev", "at") and anchor is None:
+            direction = "first"
+        
+        if direction == "first":
+            return self._query_rows('page_first', (per_page,))
+        
+        if direction == "last":
+            # Son sayfa, sayfa numaralarıyla hizalı kalsın diye kalan satır kadar
+            total = self.count_products()
+            remainder = total % per_page or per_page
+            return self._query_rows('page_last', (remainder,))[::-1]
+        
+        if direction in ("next", "at"):
+            return self._query_rows(f'page_{direction}', (*anchor, per_page))
+        
+        if direction == "prev":
+            return self._query_rows('page_prev', (*anchor, per_page))[::-1]
+        
+        raise ValueError(f"Geçersiz yön: {direction}")
+    
+    @_synchronized
     def get_product_summary(self, product_id: str) -> dict:
         """Bir ürün ID'nin özet bilgilerini getir."""
-        products = self.search_by_product_id(product_id)
+        return self.get_product_summaries([product_id]).get(product_id)
+    
+    @_synchronized
+    def get_product_summaries(self, product_ids: List[str]) -> Dict[str, dict]:
+        """
+        Birden fazla ürün ID'nin özetini tek sorguda getir.
         
-        if not products:
-            return None
+        Model toplamları (adet, değer) SQL'de pencere fonksiyonlarıyla
+        hesaplanır; beden satırları aynı sonuçtan gelir, ayrıca
+        search_by_product_id çağırmaya gerek yoktur.
         
-        summary = {
-            'product_id': product_id,
-            'name': products[0][3],
-            'total_quantity': 0,
-            'total_value': 0.0,
-            'sizes': []
-        }
+        Returns:
+            {product_id: {'product_id', 'name', 'total_quantity', 'total_value',
+                          'sizes': [{'id', 'size', 'quantity', 'price', 'barcode'}, ...]}}
+            Bulunamayan ID'ler sonuçta yer almaz.
+        """
+        unique_ids = list(dict.fromkeys(product_ids))
+        summaries = {}
         
-        for p in products:
-            size = p[4]
-            quantity = p[5]
-            price = p[6]
+        for i in range(0, len(unique_ids), SQLITE_MAX_PARAMS):
+            chunk = unique_ids[i:i + SQLITE_MAX_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            self.cursor.execute(f'''
+                SELECT product_id, id, barcode, name, size, quantity, price,
+                       SUM(quantity) OVER model, SUM(quantity * price) OVER model
+                FROM products
+                WHERE product_id IN ({placeholders})
+                WINDOW model AS (PARTITION BY product_id)
+                ORDER BY product_id, size
+            ''', chunk)
             
-            summary['sizes'].append({
-                'size': size or '-',
-                'quantity': quantity,
-                'price': price,
-                'barcode': p[2]
-            })
-            summary['total_quantity'] += quantity
-            summary['total_value'] += quantity * price
+            for product_id, row_id, barcode, name, size, quantity, price, total_qty, total_value \
+                    in self.cursor.fetchall():
+                summary = summaries.get(product_id)
+                if summary is None:
+                    summary = summaries[product_id] = {
+                        'product_id': product_id,
+                        'name': name,
+                        'total_quantity': total_qty or 0,
+                        'total_value': total_value or 0,
+                        'sizes': []
+                    }
+                summary['sizes'].append({
+                    'id': row_id,
+                    'size': size or '-',
+                    'quantity': quantity,
+                    'price': price,
+                    'barcode': barcode
+                })
         
-        return summary
+        return summaries
+    
+    @_synchronized
+    def get_inventory_totals(self) -> Tuple[int, int]:
+        """Toplam stok değeri (kuruş) ve adedi - özet tablosundan, tarama yok."""
+        self.cursor.execute('SELECT total_value, total_quantity FROM inventory_totals WHERE id = 1')
+        row = self.cursor.fetchone()
+        return (row[0], row[1]) if row else (0, 0)
     
-    def get_total_value(self) -> float:
-        """Toplam stok değerini hesapla."""
-        self.cursor.execute('SELECT SUM(quantity * price) FROM products')
-        result = self.cursor.fetchone()[0]
-        return result if result else 0.0
+    @_synchronized
+    def get_total_value(self) -> int:
+        """Toplam stok değerini hesapla (kuruş)."""
+        return self.get_inventory_totals()[0]
     
+    @_synchronized
     def get_total_quantity(self) -> int:
         """Toplam ürün adedini hesapla."""
-        self.cursor.execute('SELECT SUM(quantity) FROM products')
-        result = self.cursor.fetchone()[0]
-        return result if result else 0
+        return self.get_inventory_totals()[1]
+    
+    # ========== TOPLU İŞLEMLER ==========
+    
+    @_synchronized
+    def bulk_upsert_products(self, rows: List[Tuple], mode: str = "add") -> Tuple[bool, str]:
+        """
+        Ürünleri tek transaction içinde toplu ekle/güncelle (INSERT ... ON CONFLICT).
+        
+        Args:
+            rows: [(product_id, barcode, name, size, quantity, price), ...] - price kuruş
+            mode: "add" - mevcut barkodun stoku artırılır (add_product gibi)
+                  "replace" - mevcut barkodun tüm alanları dosyadakiyle değiştirilir
+        
+        Returns:
+            (success, message) tuple
+        """
+        if mode == "add":
+            on_conflict = "quantity = quantity + excluded.quantity"
+        elif mode == "replace":
+            on_conflict = '''product_id = excluded.product_id, name = excluded.name,
+                size = excluded.size, quantity = excluded.quantity, price = excluded.price'''
+        else:
+            return False, f"Geçersiz mod: {mode}"
+        
+        now = datetime.now()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            movements = self._import_movements(rows, mode)
+            self.cursor.executemany(f'''
+                INSERT INTO products (product_id, barcode, name, size, quantity, price, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(barcode) DO UPDATE SET
+                    {on_conflict},
+                    updated_at = excluded.updated_at
+            ''', [(*row, now) for row in rows])
+            self._record_movements(movements, now)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}"
+        finally:
+            for row in rows:
+                self.barcode_cache.invalidate(row[1])
+            self._product_count = None
+        
+        return True, f"{len(rows)} ürün işlendi!"
+    
+    # Dışa aktarılabilir tablolar: isim -> (sütunlar, kaynak, tarih sütunu, sıralama)
+    # Sıralamalar index sırasıyla aynı - sorgu geçici sıralama (temp B-tree) yapmaz
+    EXPORT_TABLES = {
+        'products': (
+            ["id", "product_id", "barcode", "name", "size", "quantity", "price", "created_at", "updated_at"],
+            "products", None, "id"
+        ),
+        'sales': (
+            ["id", "sale_date", "total_amount", "payment_method", "created_at"],
+            "sales", "sale_date", "sale_date, id"
+        ),
+        'sale_items': (
+            ["si.id", "si.sale_id", "s.sale_date", "si.product_row_id", "si.barcode", "si.name",
+             "si.size", "si.quantity", "si.unit_price", "si.line_total"],
+            "sales s JOIN sale_items si ON si.sale_id = s.id", "s.sale_date", "s.sale_date, s.id, si.id"
+        ),
+    }
+    
+    def iter_table(self, table: str, start_date: date = None, end_date: date = None,
+                   batch_size: int = 1000):
+        """
+        Tabloyu fetchmany ile parça parça dolaş (sabit bellek).
+        
+        Ayrı bir cursor kullanır; paylaşılan self.cursor ile çakışmaz.
+        İlk eleman sütun adları, sonrakiler satırlardır.
+        
+        Args:
+            table: "products", "sales" veya "sale_items"
+            start_date, end_date: Satışlar için isteğe bağlı tarih aralığı (dahil)
+        """
+        if table not in self.EXPORT_TABLES:
+            raise ValueError(f"Bilinmeyen tablo: {table}")
+        
+        columns, source, date_column, order = self.EXPORT_TABLES[table]
+        where = []
+        params = []
+        if date_column and start_date:
+            where.append(f"{date_column} >= ?")
+            params.append(start_date)
+        if date_column and end_date:
+            where.append(f"{date_column} <= ?")
+            params.append(end_date)
+        
+        sql = f"SELECT {', '.join(columns)} FROM {source}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order}"
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            yield [c.split(".")[-1] for c in columns]
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            cursor.close()
     
     # ========== SATIŞ İŞLEMLERİ ==========
     
-    def record_sale(self, total_amount: float, payment_method: str, items: List[dict]) -> Tuple[bool, str]:
+    @_synchronized
+    def record_sale(self, total_amount: int, payment_method: str, items: List[dict]) -> Tuple[bool, str]:
         """Satış kaydı oluştur."""
         try:
-            import json
-            items_json = json.dumps(items, ensure_ascii=False)
-            
-            self.cursor.execute('''
-                INSERT INTO sales (sale_date, total_amount, payment_method, items_json)
-                VALUES (?, ?, ?, ?)
-            ''', (date.today(), total_amount, payment_method, items_json))
+            self._insert_sale(total_amount, payment_method, items)
             self.conn.commit()
             
             return True, "Satış kaydedildi!"
         except Exception as e:
+            self.conn.rollback()
             return False, f"Hata: {str(e)}"
     
+    def _insert_sale(self, total_amount: int, payment_method: str, items: List[dict],
+                     sale_date: date = None) -> int:
+        """
+        Satışı ve satırlarını ekle (commit etmez) ve satış ID'sini döndür.
+        
+        Tarih bir kez alınır; gece yarısına denk gelen satış sales ve
+        daily_totals'a farklı günlerle yazılmaz.
+        """
+        if sale_date is None:
+            sale_date = date.today()
+        
+        self.cursor.execute('''
+            INSERT INTO sales (sale_date, total_amount, payment_method)
+            VALUES (?, ?, ?)
+        ''', (sale_date, total_amount, payment_method))
+        sale_id = self.cursor.lastrowid
+        
+        self.cursor.execute('''
+            INSERT INTO daily_totals (sale_date, payment_method, sale_count, total_amount)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT(sale_date, payment_method) DO UPDATE SET
+                sale_count = sale_count + 1,
+                total_amount = total_amount + excluded.total_amount
+        ''', (sale_date, payment_method, total_amount))
+        
+        # Satırlar tek executemany ile; ürün satır ID'si bilinmiyorsa barkoddan bulunur
+        self.cursor.executemany('''
+            INSERT INTO sale_items (sale_id, product_row_id, barcode, name, size,
+                                    quantity, unit_price, line_total)
+            VALUES (?, COALESCE(?, (SELECT id FROM products WHERE barcode = ?)), ?, ?, ?, ?, ?, ?)
+        ''', [(r[0], r[1], r[2], *r[2:]) for r in self._sale_item_rows(sale_id, items)])
+        return sale_id
+    
+    @staticmethod
+    def _sale_item_rows(sale_id: int, items: List[dict]) -> List[Tuple]:
+        """Sepet/items_json sözlüklerini sale_items satırlarına çevir."""
+        rows = []
+        for item in items:
+            quantity = item.get('quantity', 0)
+            price = item.get('price', 0)
+            rows.append((
+                sale_id,
+                item.get('id'),
+                item.get('barcode', ''),
+                item.get('name', ''),
+                item.get('size', ''),
+                quantity,
+                price,
+                item.get('total') or price * quantity
+            ))
+        return rows
+    
+    @_synchronized
+    def get_sale_items(self, sale_id: int) -> List[Tuple]:
+        """Bir satışın satırlarını getir."""
+        self.cursor.execute('''
+            SELECT barcode, name, size, quantity, unit_price, line_total
+            FROM sale_items
+            WHERE sale_id = ?
+            ORDER BY id
+        ''', (sale_id,))
+        return self.cursor.fetchall()
+    
+    @_synchronized
+    def get_product_sales(self, start_date: date, end_date: date = None) -> List[Tuple]:
+        """
+        Tarih aralığında ürün bazlı satış adetleri ve ciro.
+        
+        Returns:
+            [(barcode, name, size, quantity, revenue), ...] ciroya göre azalan
+        """
+        if end_date is None:
+            end_date = start_date
+        
+        self.cursor.execute('''
+            SELECT si.barcode, MAX(si.name), MAX(si.size),
+                   SUM(si.quantity), SUM(si.line_total)
+            FROM sales s
+            JOIN sale_items si ON si.sale_id = s.id
+            WHERE s.sale_date BETWEEN ? AND ?
+            GROUP BY si.barcode
+            ORDER BY SUM(si.line_total) DESC
+        ''', (start_date, end_date))
+        return self.cursor.fetchall()
+    
+    @_synchronized
+    def checkout(self, cart: Dict[str, dict], payment_method: str) -> Tuple[bool, str, List[dict]]:
+        """
+        Sepeti tek bir transaction içinde sat: stokları düş ve satışı kaydet.
+        
+        Tüm satırlar önce tek sorguda kontrol edilir; herhangi bir satırda
+        stok yetersizse hiçbir şey yazılmaz (kısmi yazma yok).
+        
+        Args:
+            cart: {barcode: {'name', 'size', 'quantity', 'price' (kuruş), ...}}
+            payment_method: 'cash' veya 'card'
+        
+        Returns:
+            (success, message, failures) tuple - failures satır bazlı hatalar
+        """
+        if not cart:
+            return False, "Sepet boş!", []
+        
+        barcodes = list(cart.keys())
+        now = datetime.now()
+        
+        try:
+            # Yazma kilidini baştan al - kontrol ile düşüm arasında stok değişmesin
+            self.conn.execute("BEGIN IMMEDIATE")
+            
+            stock = {}
+            for start in range(0, len(barcodes), SQLITE_MAX_PARAMS):
+                chunk = barcodes[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                self.cursor.execute(
+                    f"SELECT barcode, quantity FROM products WHERE barcode IN ({placeholders})",
+                    chunk
+                )
+                stock.update(self.cursor.fetchall())
+            
+            failures = []
+            for barcode, item in cart.items():
+                available = stock.get(barcode)
+                if available is None:
+                    failures.append({'barcode': barcode, 'name': item.get('name', barcode),
+                                     'requested': item['quantity'], 'available': 0,
+                                     'reason': "Ürün bulunamadı!"})
+                elif item['quantity'] > available:
+                    failures.append({'barcode': barcode, 'name': item.get('name', barcode),
+                                     'requested': item['quantity'], 'available': available,
+                                     'reason': f"Yetersiz stok! Mevcut: {available}"})
+            
+            if failures:
+                self.conn.rollback()
+                return False, f"{len(failures)} satırda stok hatası", failures
+            
+            # Koşullu toplu düşüm - tek hazırlanmış ifade
+            self.cursor.executemany('''
+                UPDATE products
+                SET quantity = quantity - ?, updated_at = ?
+                WHERE barcode = ? AND quantity >= ?
+            ''', [(item['quantity'], now, barcode, item['quantity'])
+                  for barcode, item in cart.items()])
+            
+            if self.cursor.rowcount != len(cart):
+                self.conn.rollback()
+                return False, "Stok eşzamanlı değişti, tekrar deneyin!", []
+            
+            items = [{
+                'id': item.get('id'),
+                'barcode': barcode,
+                'name': item['name'],
+                'size': item['size'],
+                'quantity': item['quantity'],
+                'price': item['price'],
+                'total': item['price'] * item['quantity']
+            } for barcode, item in cart.items()]
+            total = sum(item['total'] for item in items)
+            
+            sale_id = self._insert_sale(total, payment_method, items, now.date())
+            self._record_movements(
+                [(item['barcode'], -item['quantity'], "sale", sale_id) for item in items], now
+            )
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}", []
+        finally:
+            for barcode in barcodes:
+                self.barcode_cache.invalidate(barcode)
+        
+        return True, "Satış tamamlandı!", []
+    
+    @_synchronized
     def get_daily_summary(self, target_date: date = None) -> Dict:
         """Belirli bir günün satış özetini getir."""
         if target_date is None:
             target_date = date.today()
         
+        summary = self.get_range_summary(target_date, target_date)
+        summary['date'] = target_date.strftime('%d.%m.%Y')
+        return summary
+    
+    @_synchronized
+    def get_daily_sales(self, target_date: date = None) -> List[Tuple]:
+        """
+        Belirli bir günün tüm satışlarını getir.
+        
+        Returns:
+            [(id, sale_date, total_amount, payment_method, created_at), ...]
+            Satış satırları için get_sale_items(sale_id)
+        """
+        if target_date is None:
+            target_date = date.today()
+        
+        self.cursor.execute('''
+            SELECT id, sale_date, total_amount, payment_method, created_at
+            FROM sales
+            WHERE sale_date = ?
+            ORDER BY created_at DESC
+        ''', (target_date,))
+        
+        return self.cursor.fetchall()
+    
+    # ========== STOK SAYIMI ==========
+    
+    def _stock_count_differences(self, counts: Dict[str, int], full: bool) -> List[Tuple]:
+        """
+        Sayım ile products arasındaki farklar - tek sorgu (commit etmez).
+        
+        Sayımlar JSON nesnesi olarak tek parametreyle gönderilir; okutulan
+        her barkod products'ta index ile bulunur. full=True ise sayılmayan
+        ürünlerin sayımı 0 kabul edilir.
+        
+        Returns:
+            [(barcode, row_id, product_id, name, size, price, expected, counted), ...]
+            Bilinmeyen barkodlarda row_id ve ürün alanları None
+        """
+        payload = json.dumps(counts)
+        sql = '''
+            SELECT c.key, p.id, p.product_id, p.name, p.size, p.price, p.quantity, c.value
+            FROM json_each(?) c
+            LEFT JOIN products p ON p.barcode = c.key
+            WHERE p.id IS NULL OR p.quantity != c.value
+        '''
+        params = [payload]
+        if full:
+            sql += '''
+            UNION ALL
+            SELECT p.barcode, p.id, p.product_id, p.name, p.size, p.price, p.quantity, 0
+            FROM products p
+            WHERE p.quantity != 0 AND p.barcode NOT IN (SELECT key FROM json_each(?))
+            '''
+            params.append(payload)
+        
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchall()
+    
+    @staticmethod
+    def _check_counts(counts: Dict[str, int]):
+        for barcode, quantity in counts.items():
+            if not isinstance(quantity, int) or quantity < 0:
+                raise ValueError(f"Geçersiz sayım: {barcode} = {quantity}")
+    
+    @_synchronized
+    def compare_stock_count(self, counts: Dict[str, int], full: bool = False) -> Dict:
+        """
+        Fiziksel sayımı mevcut stokla karşılaştır (yazma yapmaz).
+        
+        Args:
+            counts: {barcode: sayılan adet}
+            full: Tam sayım - sayılmayan ürünler 0 adet kabul edilir
+        
+        Returns:
+            {'differences': [(barcode, row_id, product_id, name, size, price,
+                              expected, counted), ...] (sadece bilinen ürünler),
+             'unknown': [barcode, ...], 'quantity_delta', 'value_delta' (kuruş)}
+        """
+        self._check_counts(counts)
+        rows = self._stock_count_differences(counts, full)
+        
+        differences = [row for row in rows if row[1] is not None]
+        return {
+            'differences': differences,
+            'unknown': [row[0] for row in rows if row[1] is None],
+            'quantity_delta': sum(row[7] - row[6] for row in differences),
+            'value_delta': sum((row[7] - row[6]) * row[5] for row in differences)
+        }
+    
+    @_synchronized
+    def apply_stock_take(self, counts: Dict[str, int], full: bool = False,
+                         note: str = "") -> Tuple[bool, str]:
+        """
+        Sayımı uygula: tüm farkları tek transaction'da düzelt ve denetim kaydı yaz.
+        
+        Farklar uygulama anında yeniden hesaplanır (sayım sırasında yapılan
+        satışlar dahil). Bilinmeyen barkodlar atlanır.
+        """
+        try:
+            self._check_counts(counts)
+        except ValueError as e:
+            return False, f"Hata: {str(e)}"
+        
+        now = datetime.now()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self._stock_count_differences(counts, full)
+            lines = [row for row in rows if row[1] is not None]
+            unknown = len(rows) - len(lines)
+            
+            quantity_delta = sum(row[7] - row[6] for row in lines)
+            value_delta = sum((row[7] - row[6]) * row[5] for row in lines)
+            self.cursor.execute('''
+                INSERT INTO stock_takes (created_at, full_count, counted_items, adjusted_items,
+                                         quantity_delta, value_delta, note)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (now, int(full), len(counts), len(lines), quantity_delta, value_delta, note))
+            stock_take_id = self.cursor.lastrowid
+            
+            self.cursor.executemany('''
+                INSERT INTO stock_take_lines (stock_take_id, product_row_id, barcode,
+                                              expected_quantity, counted_quantity, price)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(stock_take_id, row[1], row[0], row[6], row[7], row[5]) for row in lines])
+            
+            self.cursor.executemany(
+                "UPDATE products SET quantity = ?, updated_at = ? WHERE id = ?",
+                [(row[7], now, row[1]) for row in lines]
+            )
+            self._record_movements([(row[0], row[7] - row[6], "stock_take", None) for row in lines], now)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}"
+        finally:
+            self.barcode_cache.clear()
+        
+        message = f"Sayım uygulandı! {len(lines)} ürün düzeltildi"
+        if unknown:
+            message += f", {unknown} bilinmeyen barkod atlandı"
+        return True, message
+    
+    @_synchronized
+    def get_stock_takes(self, limit: int = 20) -> List[Tuple]:
+        """Son uygulanan sayımlar (en yeni önce)."""
+        self.cursor.execute('''
+            SELECT id, created_at, full_count, counted_items, adjusted_items,
+                   quantity_delta, value_delta, note
+            FROM stock_takes
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limit,))
+        return self.cursor.fetchall()
+    
+    @_synchronized
+    def get_stock_take_lines(self, stock_take_id: int) -> List[Tuple]:
+        """Bir sayımda düzeltilen satırlar."""
+        self.cursor.execute('''
+            SELECT product_row_id, barcode, expected_quantity, counted_quantity, price
+            FROM stock_take_lines
+            WHERE stock_take_id = ?
+            ORDER BY id
+        ''', (stock_take_id,))
+        return self.cursor.fetchall()
+    
+    # ========== STOK HAREKETLERİ ==========
+    
+    # Hareket nedenleri (kod -> ekranda gösterilen ad)
+    MOVEMENT_REASONS = {
+        'add': "Stok girişi",
+        'remove': "Stok çıkışı",
+        'sale': "Satış",
+        'edit': "Düzenleme",
+        'barcode_change': "Barkod değişikliği",
+        'delete': "Ürün silme",
+        'import': "Toplu yükleme",
+        'stock_take': "Sayım",
+    }
+    
+    def _record_movements(self, movements: List[Tuple], now: datetime):
+        """
+        Hareketleri deftere yaz (commit etmez) - stok yazımıyla aynı transaction'da çağrılır.
+        
+        Args:
+            movements: [(barcode, delta, reason, sale_id), ...] - 0 farklar atlanır
+        """
+        self.cursor.executemany('''
+            INSERT INTO stock_movements (barcode, delta, reason, sale_id, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(barcode, delta, reason, sale_id, now)
+              for barcode, delta, reason, sale_id in movements if delta])
+    
+    @staticmethod
+    def _edit_movements(before: Tuple, barcode: Optional[str], quantity: Optional[int]) -> List[Tuple]:
+        """update_product hareketleri; before = güncelleme öncesi (barcode, quantity)."""
+        old_barcode, old_quantity = before[0], before[1] or 0
+        new_barcode = barcode if barcode is not None else old_barcode
+        new_quantity = quantity if quantity is not None else old_quantity
+        
+        movements = []
+        if new_barcode != old_barcode:
+            # Bakiye eski barkoddan yenisine taşınır - geçmiş kayıtlar değiştirilmez
+            movements.append((old_barcode, -old_quantity, "barcode_change", None))
+            movements.append((new_barcode, old_quantity, "barcode_change", None))
+        movements.append((new_barcode, new_quantity - old_quantity, "edit", None))
+        return movements
+    
+    def _import_movements(self, rows: List[Tuple], mode: str) -> List[Tuple]:
+        """
+        bulk_upsert_products hareketleri - yazmadan önce, aynı transaction'da hesaplanır.
+        
+        "add" modunda fark satırdaki adettir; "replace" modunda mevcut
+        adetler IN (...) parçalarıyla okunur ve fark yeni - eski olur.
+        """
+        if mode == "add":
+            return [(row[1], row[4], "import", None) for row in rows]
+        
+        # Önbellek kullanılmaz - adetler BEGIN IMMEDIATE içinde veritabanından okunur
+        barcodes = list(dict.fromkeys(row[1] for row in rows))
+        current = {}
+        for start in range(0, len(barcodes), SQLITE_MAX_PARAMS):
+            chunk = barcodes[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            self.cursor.execute(
+                f"SELECT barcode, COALESCE(quantity, 0) FROM products WHERE barcode IN ({placeholders})",
+                chunk
+            )
+            current.update(self.cursor.fetchall())
+        
+        movements = []
+        for row in rows:
+            # Aynı barkod dosyada birden fazla geçerse sonuncusu kalır
+            movements.append((row[1], row[4] - current.get(row[1], 0), "import", None))
+            current[row[1]] = row[4]
+        return movements
+    
+    @_synchronized
+    def get_stock_movements(self, barcode: str, limit: int = 100) -> Dict:
+        """
+        Bir barkodun hareket geçmişi (en yeni önce), her satırda o anki bakiye.
+        
+        Sıkıştırılmış hareketler açılış bakiyesi olarak döner.
+        
+        Returns:
+            {'barcode', 'opening', 'snapshot_at',
+             'movements': [(id, created_at, delta, reason, sale_id, balance), ...]}
+        """
+        self.cursor.execute(
+            "SELECT quantity, snapshot_at FROM stock_snapshots WHERE barcode = ?", (barcode,)
+        )
+        snapshot = self.cursor.fetchone()
+        opening, snapshot_at = snapshot if snapshot else (0, None)
+        
+        self.cursor.execute('''
+            SELECT id, created_at, delta, reason, sale_id,
+                   ? + SUM(delta) OVER (ORDER BY id) AS balance
+            FROM stock_movements
+            WHERE barcode = ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (opening, barcode, limit))
+        
+        return {
+            'barcode': barcode,
+            'opening': opening,
+            'snapshot_at': snapshot_at,
+            'movements': self.cursor.fetchall()
+        }
+    
+    @_synchronized
+    def get_daily_movements(self, target_date: date = None, limit: int = 1000) -> List[Tuple]:
+        """
+        Belirli bir günün stok hareketleri (en yeni önce).
+        
+        Returns:
+            [(id, created_at, barcode, delta, reason, sale_id), ...]
+        """
+        if target_date is None:
+            target_date = date.today()
+        
+        self.cursor.execute('''
+            SELECT id, created_at, barcode, delta, reason, sale_id
+            FROM stock_movements
+            WHERE created_at >= ? AND created_at < ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        ''', (target_date, target_date + timedelta(days=1), limit))
+        return self.cursor.fetchall()
+    
+    @_synchronized
+    def get_movement_summary(self, start_date: date, end_date: date = None) -> List[Tuple]:
+        """
+        Tarih aralığında gün ve neden bazında hareket toplamları.
+        
+        stock_movement_days rollup tablosundan okunur (gün x neden kadar
+        satır); sıkıştırılmış dönemler de dahildir.
+        
+        Returns:
+            [(day 'YYYY-MM-DD', reason, movement_count, quantity_in, quantity_out), ...]
+        """
+        if end_date is None:
+            end_date = start_date
+        
+        self.cursor.execute('''
+            SELECT day, reason, movement_count, quantity_in, quantity_out
+            FROM stock_movement_days
+            WHERE day BETWEEN ? AND ?
+            ORDER BY day, reason
+        ''', (start_date, end_date))
+        return self.cursor.fetchall()
+    
+    @_synchronized
+    def compact_stock_movements(self, before: date) -> Tuple[bool, str]:
+        """
+        Verilen tarihten eski hareketleri barkod bazında stock_snapshots'a
+        topla ve defterden sil (tek transaction).
+        
+        Bakiyeler, günlük özetler (stock_movement_days) ve ürün geçmişinin
+        son kısmı korunur; sıkıştırılan dönemin satır satır hareketleri artık
+        sorgulanamaz (satış detayları sale_items'ta kalır). Silinen sayfalar
+        yeni hareketlerce yeniden kullanılır, ayrıca VACUUM gerekmez.
+        """
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.cursor.execute('''
+                INSERT INTO stock_snapshots (barcode, quantity, movement_count, snapshot_at)
+                SELECT barcode, SUM(delta), COUNT(*), ?
+                FROM stock_movements
+                WHERE created_at < ?
+                GROUP BY barcode
+                ON CONFLICT(barcode) DO UPDATE SET
+                    quantity = quantity + excluded.quantity,
+                    movement_count = movement_count + excluded.movement_count,
+                    snapshot_at = MAX(COALESCE(snapshot_at, ''), excluded.snapshot_at)
+            ''', (before, before))
+            barcodes = self.cursor.rowcount
+            
+            self.cursor.execute("DELETE FROM stock_movements WHERE created_at < ?", (before,))
+            compacted = self.cursor.rowcount
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}"
+        
+        return True, f"{compacted} hareket sıkıştırıldı ({barcodes} barkod)"
+    
+    @_synchronized
+    def verify_stock_movements(self) -> List[Tuple]:
+        """
+        Defteri products ile karşılaştır: her barkod için açılış bakiyesi +
+        hareketler toplamı mevcut stoka eşit olmalı (silinen ürünlerde 0).
+        
+        Returns:
+            [(barcode, ledger_quantity, actual_quantity), ...] - boşsa tutarlı
+        """
+        self.cursor.execute('''
+            SELECT barcode, SUM(ledger), SUM(actual)
+            FROM (
+                SELECT barcode, quantity AS ledger, 0 AS actual FROM stock_snapshots
+                UNION ALL
+                SELECT barcode, delta, 0 FROM stock_movements
+                UNION ALL
+                SELECT barcode, 0, COALESCE(quantity, 0) FROM products
+            )
+            GROUP BY barcode
+            HAVING SUM(ledger) != SUM(actual)
+            ORDER BY barcode
+        ''')
+        return self.cursor.fetchall()
+    
+    # ========== RAPORLAMA ==========
+    
+    # Gruplama -> SQL ifadesi. Saat dışındaki gruplar daily_totals rollup
+    # tablosundan hesaplanır (gün sayısı kadar satır okunur).
+    REPORT_GROUPS = {
+        'day': "sale_date",
+        'week': "date(sale_date, 'weekday 0', '-6 days')",  # haftanın pazartesi günü
+        'month': "strftime('%Y-%m', sale_date)",
+        'hour': "strftime('%H', created_at, 'localtime')",
+        'payment_method': "payment_method",
+    }
+    
+    @_synchronized
+    def get_range_summary(self, start_date: date, end_date: date) -> Dict:
+        """Tarih aralığının nakit/kart özetini getir (get_daily_summary ile aynı yapı)."""
+        # daily_totals üzerinden - maliyet satış sayısına değil gün sayısına bağlı
         self.cursor.execute('''
             SELECT 
                 payment_method,
-                COUNT(*) as count,
+                SUM(sale_count) as count,
                 SUM(total_amount) as total
-            FROM sales
-            WHERE sale_date = ?
+            FROM daily_totals
+            WHERE sale_date BETWEEN ? AND ?
             GROUP BY payment_method
-        ''', (target_date,))
+        ''', (start_date, end_date))
         
         results = self.cursor.fetchall()
         
         summary = {
-            'date': target_date.strftime('%d.%m.%Y'),
-            'cash_total': 0.0,
+            'date': f"{start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')}",
+            'cash_total': 0,
             'cash_count': 0,
-            'card_total': 0.0,
+            'card_total': 0,
             'card_count': 0,
-            'grand_total': 0.0,
+            'grand_total': 0,
             'total_sales': 0
         }
         
@@ -403,20 +1968,148 @@ class Database:
         
         return summary
     
-    def get_daily_sales(self, target_date: date = None) -> List[Tuple]:
-        """Belirli bir günün tüm satışlarını getir."""
-        if target_date is None:
-            target_date = date.today()
+    @_synchronized
+    def get_sales_report(self, start_date: date, end_date: date, group_by: str = "day") -> List[Dict]:
+        """
+        Tarih aralığındaki satışları SQL'de grupla.
         
+        Args:
+            start_date: Başlangıç tarihi (dahil)
+            end_date: Bitiş tarihi (dahil)
+            group_by: "day", "week", "month", "hour" veya "payment_method"
+        
+        Returns:
+            [{'period', 'count', 'total', 'cash_total', 'card_total'}, ...] period sırasıyla
+        """
+        if group_by not in self.REPORT_GROUPS:
+            raise ValueError(f"Geçersiz gruplama: {group_by}")
+        
+        period = self.REPORT_GROUPS[group_by]
+        if group_by == 'hour':
+            # Saat bilgisi sadece satış satırlarında var
+            sql = f'''
+                SELECT 
+                    {period} AS period,
+                    COUNT(*),
+                    COALESCE(SUM(total_amount), 0),
+                    COALESCE(SUM(CASE WHEN payment_method = 'cash' THEN total_amount END), 0),
+                    COALESCE(SUM(CASE WHEN payment_method = 'card' THEN total_amount END), 0)
+                FROM sales
+                WHERE sale_date BETWEEN ? AND ?
+                GROUP BY period
+                ORDER BY period
+            '''
+        else:
+            sql = f'''
+                SELECT 
+                    {period} AS period,
+                    SUM(sale_count),
+                    COALESCE(SUM(total_amount), 0),
+                    COALESCE(SUM(CASE WHEN payment_method = 'cash' THEN total_amount END), 0),
+                    COALESCE(SUM(CASE WHEN payment_method = 'card' THEN total_amount END), 0)
+                FROM daily_totals
+                WHERE sale_date BETWEEN ? AND ?
+                GROUP BY period
+                ORDER BY period
+            '''
+        self.cursor.execute(sql, (start_date, end_date))
+        
+        return [
+            {'period': period, 'count': count, 'total': total,
+             'cash_total': cash_total, 'card_total': card_total}
+            for period, count, total, cash_total, card_total in self.cursor.fetchall()
+        ]
+    
+    def _fill_daily_totals(self) -> int:
+        """daily_totals'ı sales'ten yeniden hesapla (commit etmez)."""
+        self.cursor.execute("DELETE FROM daily_totals")
         self.cursor.execute('''
-            SELECT id, sale_date, total_amount, payment_method, items_json, created_at
+            INSERT INTO daily_totals (sale_date, payment_method, sale_count, total_amount)
+            SELECT sale_date, payment_method, COUNT(*), COALESCE(SUM(total_amount), 0)
             FROM sales
-            WHERE sale_date = ?
-            ORDER BY created_at DESC
-        ''', (target_date,))
+            GROUP BY sale_date, payment_method
+        ''')
+        return self.cursor.rowcount
+    
+    @_synchronized
+    def rebuild_daily_totals(self) -> Tuple[bool, str]:
+        """daily_totals tablosunu sales tablosundan baştan hesapla."""
+        try:
+            count = self._fill_daily_totals()
+            self.conn.commit()
+            return True, f"Günlük özet yeniden oluşturuldu! {count} satır"
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}"
+    
+    @_synchronized
+    def verify_daily_totals(self) -> List[Tuple]:
+        """
+        daily_totals ile sales tablosunu karşılaştır.
         
+        Returns:
+            Uyuşmayan satırlar: [(sale_date, payment_method, rollup_count, rollup_total,
+                                  actual_count, actual_total), ...] - boşsa tutarlı
+        """
+        self.cursor.execute('''
+            WITH actual AS (
+                SELECT sale_date, payment_method, COUNT(*) AS cnt,
+                       COALESCE(SUM(total_amount), 0) AS total
+                FROM sales
+                GROUP BY sale_date, payment_method
+            ),
+            keys AS (
+                SELECT sale_date, payment_method FROM actual
+                UNION
+                SELECT sale_date, payment_method FROM daily_totals
+            )
+            SELECT k.sale_date, k.payment_method,
+                   COALESCE(d.sale_count, 0), COALESCE(d.total_amount, 0),
+                   COALESCE(a.cnt, 0), COALESCE(a.total, 0)
+            FROM keys k
+            LEFT JOIN daily_totals d
+                ON d.sale_date = k.sale_date AND d.payment_method = k.payment_method
+            LEFT JOIN actual a
+                ON a.sale_date = k.sale_date AND a.payment_method = k.payment_method
+            WHERE COALESCE(d.sale_count, 0) != COALESCE(a.cnt, 0)
+               OR COALESCE(d.total_amount, 0) != COALESCE(a.total, 0)
+            ORDER BY k.sale_date, k.payment_method
+        ''')
         return self.cursor.fetchall()
     
+    @_synchronized
+    def rebuild_inventory_totals(self) -> Tuple[bool, str]:
+        """inventory_totals satırını products tablosundan baştan hesapla."""
+        try:
+            self._fill_inventory_totals()
+            self.conn.commit()
+            return True, "Stok toplamları yeniden hesaplandı!"
+        except Exception as e:
+            self.conn.rollback()
+            return False, f"Hata: {str(e)}"
+    
+    @_synchronized
+    def verify_inventory_totals(self) -> List[Tuple]:
+        """
+        inventory_totals ile products tablosunu karşılaştır.
+        
+        Returns:
+            Uyuşmayan değerler: [(kolon, özet, gerçek), ...] - boşsa tutarlı
+        """
+        stored_value, stored_quantity = self.get_inventory_totals()
+        self.cursor.execute(
+            'SELECT COALESCE(SUM(quantity * price), 0), COALESCE(SUM(quantity), 0) FROM products'
+        )
+        actual_value, actual_quantity = self.cursor.fetchone()
+        
+        return [
+            (column, stored, actual)
+            for column, stored, actual in (("total_value", stored_value, actual_value),
+                                           ("total_quantity", stored_quantity, actual_quantity))
+            if stored != actual
+        ]
+    
+    @_synchronized
     def close(self):
         """Veritabanı bağlantısını kapat."""
         self.conn.close()
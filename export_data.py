@@ -0,0 +1,118 @@
+"""
+Barkod Stok Takip Sistemi - Veri Dışa Aktarma
+=============================================
+Ürünleri, satışları ve satış satırlarını CSV veya JSON Lines olarak
+akış halinde (fetchmany + satır satır yazma) dışa aktarır. Bellek
+kullanımı tablo boyutundan bağımsızdır. Kuruş olarak saklanan tutarlar
+ondalık metin olarak yazılır (19990 -> "199.90").
+
+Çalıştırmak için:
+    python export_data.py products urunler.csv
+    python export_data.py sales satislar.jsonl --from 2026-01-01 --to 2026-01-31
+    python export_data.py sale_items satirlar.csv --from 2026-01-01
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date
+from typing import Dict, List, Optional, TextIO
+
+from database import Database
+from money import format_amount
+
+
+def export_table(db: Database, table: str, out: TextIO, fmt: str = "csv",
+                 start_date: Optional[date] = None, end_date: Optional[date] = None,
+                 batch_size: int = 1000) -> int:
+    """
+    Tabloyu açık bir dosyaya akış halinde yaz.
+    
+    Args:
+        table: "products", "sales" veya "sale_items"
+        out: Yazılabilir metin dosyası
+        fmt: "csv" veya "jsonl"
+        start_date, end_date: Satışlar için isteğe bağlı tarih filtresi
+    
+    Returns:
+        Yazılan satır sayısı
+    """
+    rows = db.iter_table(table, start_date, end_date, batch_size)
+    columns = next(rows)
+    money = [i for i, column in enumerate(columns) if column in Database.MONEY_COLUMNS.get(table, ())]
+    if money:
+        rows = (_format_money_columns(row, money) for row in rows)
+    count = 0
+    
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            out.write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Geçersiz format: {fmt}")
+    
+    return count
+
+
+def _format_money_columns(row: tuple, indexes: List[int]) -> tuple:
+    """Kuruş sütunlarını ondalık metne çevir."""
+    row = list(row)
+    for i in indexes:
+        if row[i] is not None:
+            row[i] = format_amount(row[i])
+    return tuple(row)
+
+
+def export_to_file(db: Database, table: str, path: str, fmt: str = None,
+                   start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict:
+    """Tabloyu dosyaya aktar - format verilmezse uzantıdan belirlenir."""
+    if fmt is None:
+        fmt = "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json") else "csv"
+    
+    start = time.perf_counter()
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        count = export_table(db, table, out, fmt, start_date, end_date)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'rows': count,
+        'elapsed': elapsed,
+        'rows_per_sec': count / elapsed if elapsed else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ürün ve satış verilerini dışa aktar")
+    parser.add_argument("table", choices=list(Database.EXPORT_TABLES), help="Aktarılacak veri")
+    parser.add_argument("output", help="Çıktı dosyası (.csv veya .jsonl), '-' = standart çıktı")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "stock.db"),
+                        help="Veritabanı dosyası")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Çıktı formatı (varsayılan: uzantıdan)")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Bitiş tarihi (YYYY-MM-DD)")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    
+    if args.output == "-":
+        export_table(db, args.table, sys.stdout, args.format or "csv", args.start, args.end)
+    else:
+        report = export_to_file(db, args.table, args.output, args.format, args.start, args.end)
+        print(f"✅ {report['rows']:,} satır yazıldı: {args.output} "
+              f"({report['elapsed']:.2f} sn, {report['rows_per_sec']:,.0f} satır/sn)")
+    
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
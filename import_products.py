@@ -0,0 +1,267 @@
+"""
+Barkod Stok Takip Sistemi - Toplu Ürün İçe Aktarma
+==================================================
+CSV veya XLSX dosyasından ürünleri parça parça (chunk) okuyup
+tek transaction'lık executemany ile veritabanına yazar.
+
+Çalıştırmak için:
+    python import_products.py urunler.csv
+    python import_products.py urunler.xlsx --mode replace --rejects hatalar.csv
+
+Beklenen sütunlar (başlık satırı, sıra önemsiz):
+    product_id / Ürün ID, barcode / Barkod, name / Ürün Adı,
+    size / Beden, quantity / Adet, price / Fiyat
+"""
+
+import argparse
+import csv
+import os
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import Database
+from money import parse_money
+
+
+# Başlık adı -> alan adı (küçük harfe çevrilmiş başlıklarla eşleşir)
+HEADER_ALIASES = {
+    "product_id": "product_id", "ürün id": "product_id", "urun id": "product_id", "model": "product_id",
+    "barcode": "barcode", "barkod": "barcode",
+    "name": "name", "ürün adı": "name", "urun adi": "name", "isim": "name",
+    "size": "size", "beden": "size",
+    "quantity": "quantity", "adet": "quantity", "stok": "quantity",
+    "price": "price", "fiyat": "price",
+}
+
+REQUIRED_FIELDS = ("product_id", "barcode", "name")
+
+
+def _normalize_header(header) -> Optional[str]:
+    key = str(header or "").strip().lower().replace("i̇", "i")
+    return HEADER_ALIASES.get(key)
+
+
+def iter_csv_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """CSV satırlarını tembel (lazy) oku - (satır no, {alan: değer})."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        
+        reader = csv.reader(f, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = [_normalize_header(h) for h in header]
+        
+        for line_no, values in enumerate(reader, start=2):
+            if not any(v.strip() for v in values):
+                continue
+            yield line_no, {field: value for field, value in zip(fields, values) if field}
+
+
+def iter_xlsx_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """XLSX satırlarını tembel oku (openpyxl read_only modu)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("XLSX içe aktarmak için openpyxl gerekli: pip install openpyxl")
+    
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        fields = [_normalize_header(h) for h in header]
+        
+        for line_no, values in enumerate(rows, start=2):
+            if not any(v not in (None, "") for v in values):
+                continue
+            yield line_no, {
+                field: "" if value is None else str(value)
+                for field, value in zip(fields, values) if field
+            }
+    finally:
+        workbook.close()
+
+
+def iter_rows(path: str) -> Iterator[Tuple[int, Dict]]:
+    """Dosya uzantısına göre uygun okuyucuyu seç."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(path)
+    return iter_csv_rows(path)
+
+
+def parse_quantity(text: str) -> int:
+    """
+    Adet metnini tam sayıya çevir.
+    
+    Excel tam sayıları "12.0" olarak verebilir; kesirli ("2.7"), sonsuz
+    veya NaN değerler kırpılmaz, reddedilir.
+    
+    Raises:
+        ValueError: Geçersiz veya negatif adet
+    """
+    try:
+        quantity = int(text)
+    except ValueError:
+        number = float(text)
+        if not number.is_integer():
+            raise ValueError(f"Tam sayı değil: {text}")
+        quantity = int(number)
+    
+    if quantity < 0:
+        raise ValueError(f"Negatif adet: {text}")
+    return quantity
+
+
+def validate_row(raw: Dict) -> Tuple[Optional[Tuple], str]:
+    """
+    Ham satırı doğrula.
+    
+    Returns:
+        ((product_id, barcode, name, size, quantity, price), "") veya (None, hata mesajı)
+        price kuruş cinsindendir
+    """
+    values = {key: str(raw.get(key, "")).strip() for key in HEADER_ALIASES.values()}
+    
+    for field in REQUIRED_FIELDS:
+        if not values[field]:
+            return None, f"{field} boş"
+    
+    # Excel sayısal barkodları "8690000000001.0" olarak verebilir
+    barcode = values["barcode"]
+    if barcode.endswith(".0") and barcode[:-2].isdigit():
+        barcode = barcode[:-2]
+    
+    try:
+        quantity = parse_quantity(values["quantity"] or "0")
+    except (ValueError, OverflowError):
+        return None, f"Geçersiz adet: {values['quantity']}"
+    
+    try:
+        price = parse_money(values["price"] or "0")
+        if price < 0:
+            raise ValueError()
+    except ValueError:
+        return None, f"Geçersiz fiyat: {values['price']}"
+    
+    return (values["product_id"], barcode, values["name"], values["size"], quantity, price), ""
+
+
+def import_products(db: Database, path: str, mode: str = "add", chunk_size: int = 5000,
+                    progress=None) -> Dict:
+    """
+    Dosyadaki ürünleri içe aktar.
+    
+    Satırlar tembel okunur, chunk_size'lık parçalar halinde doğrulanır ve
+    her parça tek transaction'da Database.bulk_upsert_products ile yazılır.
+    
+    Args:
+        db: Database nesnesi
+        path: CSV veya XLSX dosya yolu
+        mode: "add" (stoku artır) veya "replace" (alanları değiştir)
+        chunk_size: Transaction başına satır
+        progress: İsteğe bağlı callback(işlenen_satır)
+    
+    Returns:
+        {'accepted', 'inserted', 'updated', 'rejected', 'rejects', 'elapsed', 'rows_per_sec'}
+    """
+    start = time.perf_counter()
+    count_before = db.count_products()
+    
+    accepted = 0
+    rejects: List[Tuple[int, str]] = []
+    rows = iter_rows(path)
+    
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        
+        valid = []
+        valid_lines = []
+        for line_no, raw in chunk:
+            row, error = validate_row(raw)
+            if row is None:
+                rejects.append((line_no, error))
+            else:
+                valid.append(row)
+                valid_lines.append(line_no)
+        
+        if valid:
+            success, message = db.bulk_upsert_products(valid, mode)
+            if success:
+                accepted += len(valid)
+            else:
+                # Parça yazılamadı - hatalı satırları ayırmak için satır satır dene
+                for line_no, row in zip(valid_lines, valid):
+                    success, message = db.bulk_upsert_products([row], mode)
+                    if success:
+                        accepted += 1
+                    else:
+                        rejects.append((line_no, message))
+        
+        if progress:
+            progress(accepted + len(rejects))
+    
+    elapsed = time.perf_counter() - start
+    inserted = db.count_products() - count_before
+    
+    return {
+        'accepted': accepted,
+        'inserted': inserted,
+        'updated': accepted - inserted,
+        'rejected': len(rejects),
+        'rejects': rejects,
+        'elapsed': elapsed,
+        'rows_per_sec': (accepted + len(rejects)) / elapsed if elapsed else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV/XLSX dosyasından toplu ürün içe aktarma")
+    parser.add_argument("file", help="CSV veya XLSX dosyası")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "stock.db"),
+                        help="Veritabanı dosyası")
+    parser.add_argument("--mode", choices=["add", "replace"], default="add",
+                        help="add: mevcut barkodun stokunu artır, replace: alanları değiştir")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Transaction başına satır")
+    parser.add_argument("--rejects", help="Reddedilen satırları bu CSV dosyasına yaz")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    print(f"📥 İçe aktarılıyor: {args.file}")
+    
+    report = import_products(
+        db, args.file, args.mode, args.chunk_size,
+        progress=lambda n: print(f"   {n:,} satır...", end="\r")
+    )
+    db.close()
+    
+    print(f"\n✅ {report['accepted']:,} satır yazıldı "
+          f"({report['inserted']:,} yeni, {report['updated']:,} güncellendi)")
+    print(f"⏱️  {report['elapsed']:.2f} sn - {report['rows_per_sec']:,.0f} satır/sn")
+    
+    if report['rejects']:
+        print(f"❌ {report['rejected']:,} satır reddedildi")
+        for line_no, reason in report['rejects'][:20]:
+            print(f"   Satır {line_no}: {reason}")
+        if report['rejected'] > 20:
+            print("   ...")
+        
+        if args.rejects:
+            with open(args.rejects, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["line", "reason"])
+                writer.writerows(report['rejects'])
+            print(f"📝 Hatalar yazıldı: {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
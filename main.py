@@ -7,7 +7,12 @@ Depo ve stok yönetimi için masaüstü uygulaması.
     python main.py
 """
 
+import time
+
+# Açılış süresi raporu için - arayüz modülleri yüklenmeden önce
+STARTED_AT = time.perf_counter()
+
 from ui.app import run
 
 if __name__ == "__main__":
-    run()
+    run(STARTED_AT)
@@ -0,0 +1,69 @@
+"""
+Barkod Stok Takip Sistemi - Para Birimi Yardımcıları
+====================================================
+Tüm tutarlar veritabanında ve uygulama içinde kuruş cinsinden tam sayı
+(int) olarak tutulur: 199,90 ₺ -> 19990. Toplamlar tam sayı toplamı olduğu
+için kayan nokta kayması olmaz; ondalık sadece ekrana yazarken/okurken
+kullanılır.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CURRENCY_SYMBOL = "₺"
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(value) -> int:
+    """
+    Lira cinsinden tutarı kuruşa çevir (yarım kuruş yukarı yuvarlanır).
+    
+    float için repr kullanılır, böylece 19.99 -> 1999 olur (1998 değil).
+    """
+    if isinstance(value, int):
+        return value * 100
+    amount = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+    return int(amount.quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def parse_money(text: str) -> int:
+    """
+    Kullanıcı girişini kuruşa çevir: "199,90", "199.90 ₺", "1.250,50" -> kuruş.
+    
+    Raises:
+        ValueError: Geçersiz tutar
+    """
+    cleaned = str(text).replace(CURRENCY_SYMBOL, "").replace(" ", "").strip()
+    if not cleaned:
+        raise ValueError("Boş tutar")
+    
+    # Hem nokta hem virgül varsa sondaki ondalık ayırıcıdır
+    if "," in cleaned and "." in cleaned:
+        if cleaned.rfind(",") > cleaned.rfind("."):
+            cleaned = cleaned.replace(".", "").replace(",", ".")
+        else:
+            cleaned = cleaned.replace(",", "")
+    else:
+        cleaned = cleaned.replace(",", ".")
+    
+    try:
+        return to_cents(Decimal(cleaned))
+    except InvalidOperation:
+        raise ValueError(f"Geçersiz tutar: {text}")
+
+
+def format_money(cents: int, grouping: bool = True, symbol: bool = True) -> str:
+    """
+    Kuruşu ekran metnine çevir: 1234550 -> "12,345.50 ₺".
+    
+    Sadece tam sayı işlemleri kullanır (float'a çevirip yuvarlama yok).
+    """
+    sign = "-" if cents < 0 else ""
+    lira, kurus = divmod(abs(cents), 100)
+    text = f"{sign}{lira:,}.{kurus:02d}" if grouping else f"{sign}{lira}.{kurus:02d}"
+    return f"{text} {CURRENCY_SYMBOL}" if symbol else text
+
+
+def format_amount(cents: int) -> str:
+    """Sembolsüz, gruplamasız ondalık metin (CSV/JSON dışa aktarma): 19990 -> "199.90"."""
+    return format_money(cents, grouping=False, symbol=False)
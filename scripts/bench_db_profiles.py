@@ -0,0 +1,70 @@
+"""
+Veritabanı PRAGMA profilleri için commit/saniye karşılaştırması.
+
+Her profil için geçici bir stock.db oluşturur ve gerçek yazma yollarını
+(add_product, remove_stock, record_sale) tek tek commit ederek ölçer.
+
+Çalıştırmak için:
+    python scripts/bench_db_profiles.py [--commits 500]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, DB_PROFILES
+
+
+def bench_profile(profile: str, commits: int) -> dict:
+    """Tek bir profil için yazma performansını ölç."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile=profile)
+        
+        # Ürünleri hazırla (ölçüme dahil değil)
+        for i in range(100):
+            db.add_product(f"M{i:03d}", f"869{i:010d}", f"Ürün {i}", "M", 1_000_000, 9990)
+        
+        start = time.perf_counter()
+        for i in range(commits):
+            barcode = f"869{i % 100:010d}"
+            if i % 3 == 0:
+                db.add_product(f"M{i % 100:03d}", barcode, "", "M", 1, 9990)
+            elif i % 3 == 1:
+                db.remove_stock(barcode, 1)
+            else:
+                db.record_sale(9990, "cash", [{'barcode': barcode, 'quantity': 1}])
+        elapsed = time.perf_counter() - start
+        
+        report = db.get_pragma_report()
+        db.close()
+    
+    return {
+        'profile': profile,
+        'commits_per_sec': commits / elapsed if elapsed else 0.0,
+        'elapsed': elapsed,
+        'applied': {name: s['applied'] for name, s in report['settings'].items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PRAGMA profili commit/saniye ölçümü")
+    parser.add_argument("--commits", type=int, default=500, help="Profil başına commit sayısı")
+    parser.add_argument("--profiles", nargs="+", default=list(DB_PROFILES), help="Ölçülecek profiller")
+    args = parser.parse_args()
+    
+    print(f"📊 {args.commits} commit / profil\n")
+    print(f"{'Profil':<8} {'commit/sn':>10} {'süre (sn)':>10}  Uygulanan ayarlar")
+    print("-" * 90)
+    for profile in args.profiles:
+        result = bench_profile(profile, args.commits)
+        applied = ", ".join(f"{k}={v}" for k, v in result['applied'].items())
+        print(f"{profile:<8} {result['commits_per_sec']:>10.1f} {result['elapsed']:>10.3f}  {applied}")
+
+
+if __name__ == "__main__":
+    main()
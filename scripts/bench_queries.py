@@ -0,0 +1,185 @@
+"""
+Sorgu kaydı (PRODUCT_QUERIES) ve ProductRow satır tipi için mikro ölçüm.
+
+Üç şeyi ölçer:
+    statement   - barkod sorgusu (araya değişken uzunluklu IN (...) sorguları
+                  girerken): önceki satır içi SQL (varsayılan önbellek 128) ve
+                  kayıtlı sorgu (STATEMENT_CACHE_SIZE)
+    satır tipi  - aynı sorgu için önceki düz tuple, ProductRow (map +
+                  tuple.__new__), row_factory, namedtuple._make, sqlite3.Row
+                  ve dict maliyeti
+    toplu barkod - N barkod için tek tek search_by_barcode ve
+                  get_many_by_barcode (IN parçaları / json_each)
+
+ProductRow isimle erişim içindir, hız kazandırmaz: çok satırlı
+sonuçlarda düz tuple'dan pahalıdır. Bu yüzden sayfa ve arama sorguları
+(_query_rows) düz tuple döndürür.
+
+Her ölçüm --rounds kez, seçenekler araya karışarak tekrarlanır; tur
+medyanlarının medyanı ve en düşük-en yüksek aralığı yazılır. Aralıklar
+örtüşüyorsa fark gürültü düzeyindedir.
+
+Çalıştırmak için:
+    python scripts/bench_queries.py [--products 20000] [--repeat 5000] [--rounds 5]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import (Database, PRODUCT_COLUMNS, PRODUCT_QUERIES, ProductRow,
+                      STATEMENT_CACHE_SIZE, _make_product)
+
+# Eski kodun barkod sorgusu (çok satırlı metin, ayrı hazırlanır)
+OLD_BY_BARCODE = '''
+            SELECT id, product_id, barcode, name, size, quantity, price, created_at, updated_at
+            FROM products
+            WHERE barcode = ?
+        '''
+
+
+def populate(path: str, count: int):
+    db = Database(path)
+    rows = [(f"MDL{i // 6:06d}", f"869{i:010d}", f"Ürün {i}", "M", 10, 9990) for i in range(count)]
+    db.bulk_upsert_products(rows, "replace")
+    db.close()
+
+
+def rounds(measures, count: int):
+    """
+    measures: [(etiket, ölçüm fonksiyonu), ...] - her tur tüm seçenekleri sırayla çalıştırır.
+    
+    Returns:
+        [(etiket, medyan, en düşük, en yüksek), ...]
+    """
+    results = {label: [] for label, _ in measures}
+    for _ in range(count):
+        for label, measure in measures:
+            results[label].append(measure())
+    return [(label, statistics.median(values), min(values), max(values))
+            for label, values in results.items()]
+
+
+def print_rounds(title: str, unit: str, results):
+    print(title)
+    print(f"{'Durum':<34}{f'medyan ({unit})':>14}{'aralık':>22}")
+    for label, median, low, high in results:
+        print(f"{label:<34}{median:>14.3f}{f'{low:.3f} - {high:.3f}':>22}")
+
+
+def lookup_us(conn: sqlite3.Connection, sql: str, barcodes, repeat: int) -> float:
+    """Her barkod sorgusu arasında farklı uzunlukta bir IN sorgusu çalışır."""
+    cursor = conn.cursor()
+    timings = []
+    for i in range(repeat):
+        ids = list(range(1, i % 200 + 2))
+        cursor.execute(f"SELECT id FROM products WHERE id IN ({','.join('?' * len(ids))})", ids)
+        cursor.fetchall()
+        
+        start = time.perf_counter()
+        cursor.execute(sql, (barcodes[i % len(barcodes)],))
+        cursor.fetchone()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _product_row_factory(cursor, row):
+    return _make_product(row)
+
+
+def _namedtuple_make(cursor, row):
+    return ProductRow._make(row)
+
+
+def materialize_ms(conn: sqlite3.Connection, factory, convert, limit: int, repeat: int) -> float:
+    """factory: cursor.row_factory, convert: fetchall sonucuna uygulanan dönüşüm."""
+    cursor = conn.cursor()
+    cursor.row_factory = factory
+    sql = f"SELECT {PRODUCT_COLUMNS} FROM products ORDER BY product_id, size, id LIMIT ?"
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, (limit,))
+        rows = cursor.fetchall()
+        if convert:
+            rows = list(map(convert, rows))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def resolve_ms(db: Database, barcodes, many: bool) -> float:
+    db.barcode_cache.clear()
+    start = time.perf_counter()
+    if many:
+        found = len(db.get_many_by_barcode(barcodes))
+    else:
+        found = sum(1 for barcode in barcodes if db.search_by_barcode(barcode))
+    elapsed = (time.perf_counter() - start) * 1000
+    assert found == len(set(barcodes))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sorgu kaydı / satır tipi mikro ölçümü")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"📦 {args.products:,} ürün yükleniyor...\n")
+        populate(path, args.products)
+        barcodes = [f"869{random.randrange(args.products):010d}" for _ in range(1000)]
+        
+        old = sqlite3.connect(path)
+        new = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+        print_rounds("Barkod sorgusu (araya IN sorguları girerken)", "µs", rounds([
+            ("önceki: satır içi SQL, önbellek 128",
+             lambda: lookup_us(old, OLD_BY_BARCODE, barcodes, args.repeat)),
+            (f"kayıtlı sorgu, önbellek {STATEMENT_CACHE_SIZE}",
+             lambda: lookup_us(new, PRODUCT_QUERIES['by_barcode'], barcodes, args.repeat)),
+        ], args.rounds))
+        old.close()
+        
+        factories = [
+            ("tuple (sayfa/arama sorguları)", None, None),
+            ("ProductRow (map + tuple.__new__)", None, _make_product),
+            ("ProductRow row_factory", _product_row_factory, None),
+            ("namedtuple._make", _namedtuple_make, None),
+            ("sqlite3.Row", sqlite3.Row, None),
+            ("dict", _dict_row, None),
+        ]
+        for limit in (50, min(10_000, args.products)):
+            repeat = max(20, args.repeat // (limit // 50))
+            print()
+            print_rounds(f"Satır oluşturma ({limit:,} satır)", "ms", rounds([
+                (label, lambda f=factory, c=convert: materialize_ms(new, f, c, limit, repeat))
+                for label, factory, convert in factories
+            ], args.rounds))
+        new.close()
+        
+        db = Database(path)
+        print(f"\nToplu barkod çözme")
+        print(f"{'Barkod':>8}{'tek tek (ms)':>16}{'get_many (ms)':>16}")
+        for count in (100, 1000, min(20_000, args.products)):
+            sample = random.sample(range(args.products), count)
+            codes = [f"869{i:010d}" for i in sample]
+            print(f"{count:>8,}{resolve_ms(db, codes, False):>16.1f}{resolve_ms(db, codes, True):>16.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+FTS5 ürün araması için gecikme ölçümü.
+
+Geçici bir veritabanına N ürün yükler (varsayılan 100.000) ve farklı
+sorgu tipleri için milisaniye cinsinden p50 / p95 / max süreleri yazar.
+Hedef: her senaryoda p95 < 10 ms (TARGET_MS); hedefi aşan satırlar
+işaretlenir ve çıkış kodu 1 olur.
+
+Çalıştırmak için:
+    python scripts/bench_search.py [--products 100000] [--repeat 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+WORDS = ["Tişört", "Gömlek", "Pantolon", "Etek", "Ceket", "Mont", "Kazak", "Hırka",
+         "Elbise", "Şort", "Basic", "Slim", "Oversize", "Keten", "Pamuklu", "Kadın",
+         "Erkek", "Çocuk", "Siyah", "Beyaz", "Lacivert", "Bej", "Yeşil", "Kırmızı"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "STD"]
+
+# Arama gecikmesi hedefi (p95, ms)
+TARGET_MS = 10.0
+
+
+def populate(db: Database, count: int):
+    rows = []
+    for i in range(count):
+        name = " ".join(random.sample(WORDS, 3))
+        rows.append((f"MDL{i // 6:06d}", f"869{i:010d}", name, SIZES[i % len(SIZES)], 10, 19990))
+    for start in range(0, count, 10000):
+        db.bulk_upsert_products(rows[start:start + 10000], "replace")
+
+
+def measure(db: Database, queries, search_type: str, limit: int, repeat: int) -> dict:
+    timings = []
+    hits = 0
+    for i in range(repeat):
+        query = queries[i % len(queries)]
+        start = time.perf_counter()
+        hits += len(db.search_products(query, search_type, limit))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'max': timings[-1],
+        'avg_hits': hits / repeat
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FTS5 arama gecikmesi ölçümü")
+    parser.add_argument("--products", type=int, default=100_000, help="Ürün sayısı")
+    parser.add_argument("--repeat", type=int, default=200, help="Senaryo başına sorgu")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile="fast")
+        if not db.fts_enabled:
+            print("❌ Bu SQLite sürümünde FTS5 yok - arama tam eşleşmeye düşer")
+            return
+        
+        print(f"📦 {args.products:,} ürün yükleniyor...")
+        start = time.perf_counter()
+        populate(db, args.products)
+        print(f"   {time.perf_counter() - start:.1f} sn\n")
+        
+        # (başlık, arama tipi, sorgular, sonuç sınırı)
+        scenarios = [
+            ("Önek (2 harf)", "name", [w[:2] for w in WORDS], 100),
+            ("Önek (4 harf)", "name", [w[:4] for w in WORDS], 100),
+            ("İki kelime", "all", [f"{a[:3]} {b[:3]}" for a, b in zip(WORDS, reversed(WORDS))], 100),
+            ("Hepsi eşleşir", "all", ["869"], 100),
+            ("Ürün ID öneki", "product_id", [f"MDL{random.randint(0, args.products // 6):06d}"[:7]
+                                             for _ in range(50)], 100),
+            ("Tam barkod", "barcode", [f"869{random.randint(0, args.products - 1):010d}"
+                                       for _ in range(50)], 100),
+            ("Önek, 1000 sonuç", "name", [w[:4] for w in WORDS], 1000),
+        ]
+        
+        print(f"Hedef: p95 < {TARGET_MS:.0f} ms\n")
+        print(f"{'Senaryo':<18} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'sonuç':>7}")
+        print("-" * 56)
+        missed = []
+        for title, search_type, queries, limit in scenarios:
+            r = measure(db, queries, search_type, limit, args.repeat)
+            mark = "" if r['p95'] < TARGET_MS else "  ❌ hedef aşıldı"
+            if mark:
+                missed.append(title)
+            print(f"{title:<18} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['max']:>8.2f} "
+                  f"{r['avg_hits']:>7.0f}{mark}")
+        
+        db.close()
+        
+        if missed:
+            print(f"\n❌ Hedef aşılan senaryolar: {', '.join(missed)}")
+            sys.exit(1)
+        print("\n✅ Tüm senaryolar hedefin altında")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Veritabanı açılış süresi ölçümü.
+
+Geçici bir veritabanında üç durumu karşılaştırır:
+    ilk kurulum   - boş dosya, tüm tablolar/index'ler oluşturulur
+    sürüm eski    - dolu veritabanı, kayıtlı şema sürümü eşleşmiyor
+    sürüm güncel  - dolu veritabanı, şema kurulumu atlanır (normal açılış)
+
+Sonda migration'ların yeniden çalışmasının stok defterini bozmadığı
+(verify_stock_movements boş) kontrol edilir.
+
+Arayüzün açılış süreleri uygulama her başladığında konsola yazılır.
+
+Çalıştırmak için:
+    python scripts/bench_startup.py [--products 100000] [--sales 50000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+# Proje kök dizinini path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+
+def open_time(path: str) -> float:
+    start = time.perf_counter()
+    db = Database(path)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed * 1000
+
+
+def populate(path: str, products: int, sales: int):
+    db = Database(path)
+    rows = [(f"MDL{i // 6:06d}", f"869{i:010d}", f"Ürün {i}", "M", 10, 9990) for i in range(products)]
+    db.bulk_upsert_products(rows, "replace")
+    
+    for _ in range(sales):
+        db._insert_sale(9990, random.choice(["cash", "card"]), [{
+            'barcode': f"869{random.randrange(products):010d}", 'name': "Ürün",
+            'size': "M", 'price': 9990, 'quantity': 1
+        }])
+    db.conn.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veritabanı açılış süresi ölçümü")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--sales", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        
+        first = open_time(path)
+        print(f"📦 {args.products:,} ürün, {args.sales:,} satış yükleniyor...")
+        populate(path, args.products, args.sales)
+        
+        stale, current = [], []
+        for _ in range(args.repeat):
+            conn = sqlite3.connect(path)
+            conn.execute("PRAGMA user_version = 0")
+            conn.close()
+            stale.append(open_time(path))
+            current.append(open_time(path))
+        
+        print(f"{'Durum':<14}{'p50 (ms)':>10}{'max (ms)':>10}")
+        print(f"{'ilk kurulum':<14}{first:>10.2f}{first:>10.2f}")
+        for label, timings in (("sürüm eski", stale), ("sürüm güncel", current)):
+            print(f"{label:<14}{statistics.median(timings):>10.2f}{max(timings):>10.2f}")
+        
+        # Her "sürüm eski" açılışı tüm migration'ları yeniden çalıştırdı
+        db = Database(path)
+        mismatches = db.verify_stock_movements()
+        db.close()
+        if mismatches:
+            print(f"❌ Migration tekrarı sonrası {len(mismatches)} barkodda defter ile stok uyumsuz")
+            sys.exit(1)
+        print("✅ Migration tekrarı sonrası stok defteri tutarlı")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Özet tabloları (daily_totals, inventory_totals) doğrulama / yeniden oluşturma aracı.
+
+Çalıştırmak için:
+    python scripts/daily_totals.py --verify
+    python scripts/daily_totals.py --rebuild
+"""
+
+import argparse
+import os
+import sys
+
+# Proje kök dizinini path'e ekle
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from database import Database
+from money import format_money
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Özet tabloları doğrulama / yeniden oluşturma")
+    parser.add_argument("--db", default=os.path.join(root_dir, "stock.db"), help="Veritabanı dosyası")
+    parser.add_argument("--rebuild", action="store_true", help="Özetleri sales/products tablolarından yeniden hesapla")
+    parser.add_argument("--verify", action="store_true", help="Özetleri kaynak tablolarla karşılaştır (varsayılan)")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    exit_code = 0
+    
+    if args.rebuild:
+        for rebuild in (db.rebuild_daily_totals, db.rebuild_inventory_totals):
+            success, message = rebuild()
+            print(("✅ " if success else "❌ ") + message)
+            if not success:
+                exit_code = 1
+    
+    if args.verify or not args.rebuild:
+        mismatches = db.verify_daily_totals()
+        if not mismatches:
+            print("✅ daily_totals tutarlı")
+        else:
+            exit_code = 1
+            print(f"❌ {len(mismatches)} uyumsuz satır:")
+            for sale_date, method, r_count, r_total, a_count, a_total in mismatches:
+                print(f"   {sale_date} {method:<5} özet: {r_count} / {format_money(r_total)}  "
+                      f"gerçek: {a_count} / {format_money(a_total)}")
+            print("   Düzeltmek için: python scripts/daily_totals.py --rebuild")
+        
+        inventory = db.verify_inventory_totals()
+        if not inventory:
+            print("✅ inventory_totals tutarlı")
+        else:
+            exit_code = 1
+            print("❌ inventory_totals uyumsuz:")
+            for column, stored, actual in inventory:
+                if column == "total_value":
+                    stored, actual = format_money(stored), format_money(actual)
+                print(f"   {column:<15} özet: {stored}  gerçek: {actual}")
+            print("   Düzeltmek için: python scripts/daily_totals.py --rebuild")
+    
+    db.close()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Stok hareket defteri (stock_movements) doğrulama, sıkıştırma ve geçmiş aracı.
+
+Sıkıştırma yazma kilidini işlem boyunca tutar; milyonlarca harekette
+birkaç saniye sürebilir - gün sonunda veya uygulama kapalıyken çalıştırın.
+
+Çalıştırmak için:
+    python scripts/stock_ledger.py --verify
+    python scripts/stock_ledger.py --compact --keep-days 365
+    python scripts/stock_ledger.py --history 8690000000001
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+# Proje kök dizinini path'e ekle
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from database import Database
+
+
+def print_history(db: Database, barcode: str, limit: int):
+    history = db.get_stock_movements(barcode, limit)
+    reasons = Database.MOVEMENT_REASONS
+    
+    print(f"📦 {barcode} - son {len(history['movements'])} hareket")
+    for _, created_at, delta, reason, sale_id, balance in history['movements']:
+        sale = f"  (satış #{sale_id})" if sale_id else ""
+        print(f"   {str(created_at)[:19]}  {delta:+6d}  bakiye {balance:>6}  "
+              f"{reasons.get(reason, reason)}{sale}")
+    if history['snapshot_at']:
+        print(f"   Açılış bakiyesi: {history['opening']} ({str(history['snapshot_at'])[:19]} öncesi)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stok hareket defteri doğrulama / sıkıştırma")
+    parser.add_argument("--db", default=os.path.join(root_dir, "stock.db"), help="Veritabanı dosyası")
+    parser.add_argument("--verify", action="store_true", help="Defteri stoklarla karşılaştır (varsayılan)")
+    parser.add_argument("--compact", action="store_true", help="Eski hareketleri açılış bakiyesine topla")
+    parser.add_argument("--keep-days", type=int, default=365, help="Sıkıştırmada korunacak gün sayısı")
+    parser.add_argument("--history", metavar="BARKOD", help="Bir ürünün hareket geçmişini göster")
+    parser.add_argument("--limit", type=int, default=50, help="Gösterilecek hareket sayısı")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    exit_code = 0
+    
+    if args.history:
+        print_history(db, args.history, args.limit)
+    
+    if args.compact:
+        success, message = db.compact_stock_movements(date.today() - timedelta(days=args.keep_days))
+        print(("✅ " if success else "❌ ") + message)
+        if not success:
+            exit_code = 1
+    
+    if args.verify or not (args.compact or args.history):
+        mismatches = db.verify_stock_movements()
+        if not mismatches:
+            print("✅ stock_movements tutarlı")
+        else:
+            exit_code = 1
+            print(f"❌ {len(mismatches)} barkodda defter ile stok uyumsuz:")
+            for barcode, ledger, actual in mismatches[:50]:
+                print(f"   {barcode:<16} defter: {ledger}  stok: {actual}")
+    
+    db.close()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,23 +5,33 @@ Barkod Stok Takip Sistemi - Ana Uygulama Penceresi
 import customtkinter as ctk
 import sys
 import os
+import time
 
 # Proje kök dizinini path'e ekle
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import Database
+from ui.db_worker import DbWorker, AsyncDatabase
 from ui.frames.sales import SalesFrame
 from ui.frames.add_stock import AddStockFrame
 from ui.frames.remove_stock import RemoveStockFrame
 from ui.frames.depo import DepoFrame
 from ui.frames.gun_sonu import GunSonuFrame
 from ui.frames.butun_depo import ButunDepoFrame
+from ui.frames.stock_take import StockTakeFrame
 
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, started_at: float = None):
+        # Açılış süresi ölçümü - started_at verilmezse pencere oluşturulmadan önce başlar
+        if started_at is None:
+            started_at = time.perf_counter()
+        
         super().__init__()
         
+        self.started_at = started_at
+        self.startup_times = {}
+        
         # Pencere ayarları
         self.title("🏪 Barkod Stok Takip Sistemi")
         self.geometry("1150x780")
@@ -40,7 +50,13 @@ class App(ctk.CTk):
             application_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             
         db_path = os.path.join(application_path, "stock.db")
-        self.db = Database(db_path)
+        # Dayanıklılık profili: "safe" (varsayılan) veya "fast"
+        db_profile = os.environ.get("POS_DB_PROFILE", "safe")
+        self.db = Database(db_path, profile=db_profile)
+        self._mark_startup("veritabanı")
+        # Frame'ler veritabanına işçi thread'i üzerinden erişir - Tk döngüsü SQLite'ı beklemez
+        self.db_worker = DbWorker(self.db, self)
+        self.adb = AsyncDatabase(self.db_worker)
         
         # Frame'ler için referanslar
         self.frames = {}
@@ -51,8 +67,13 @@ class App(ctk.CTk):
         
         self._create_layout()
         
-        # Başlangıçta SATIŞ sayfasını göster (ana sayfa)
+        # Başlangıçta SATIŞ sayfasını göster (ana sayfa) - diğer sayfalar ilk
+        # ziyarette oluşturulur
         self._show_frame("sales")
+        self._mark_startup("arayüz")
+        
+        # İlk boşta kalma anı: pencere çizildi, barkod okutmaya hazır
+        self.after_idle(self._report_startup)
     
     def _create_layout(self):
         # Grid yapılandırması
@@ -163,6 +184,18 @@ class App(ctk.CTk):
         )
         self.butun_depo_btn.pack(fill="x", padx=20, pady=2)
         
+        self.stock_take_btn = ctk.CTkButton(
+            self.depo_submenu,
+            text="   🧮 Stok Sayımı",
+            font=ctk.CTkFont(size=13),
+            height=40,
+            fg_color=("#00695C", "#004D40"),
+            hover_color="#00796B",
+            anchor="w",
+            command=lambda: self._show_frame("stock_take")
+        )
+        self.stock_take_btn.pack(fill="x", padx=20, pady=2)
+        
         # GÜN SONU butonu
         self.gunsonu_btn = ctk.CTkButton(
             self.sidebar,
@@ -181,16 +214,35 @@ class App(ctk.CTk):
         self.main_content.grid_rowconfigure(0, weight=1)
         self.main_content.grid_columnconfigure(0, weight=1)
         
-        # Frame'leri oluştur
-        self.frames["sales"] = SalesFrame(self.main_content, self.db, self._on_sale_complete)
-        self.frames["add"] = AddStockFrame(self.main_content, self.db, self._on_stock_change)
-        self.frames["remove"] = RemoveStockFrame(self.main_content, self.db, self._on_stock_change)
-        self.frames["depo"] = DepoFrame(self.main_content, self.db, self._on_stock_change)
-        self.frames["butun_depo"] = ButunDepoFrame(self.main_content, self.db, self._on_stock_change)
-        self.frames["gunsonu"] = GunSonuFrame(self.main_content, self.db, None)
-        
-        for frame in self.frames.values():
+        # Frame'ler ilk gösterildiklerinde oluşturulur (açılışta sadece SATIŞ)
+        self.frame_factories = {
+            "sales": lambda: SalesFrame(self.main_content, self.adb, self._on_sale_complete),
+            "add": lambda: AddStockFrame(self.main_content, self.adb, self._on_stock_change),
+            "remove": lambda: RemoveStockFrame(self.main_content, self.adb, self._on_stock_change),
+            "depo": lambda: DepoFrame(self.main_content, self.adb, self._on_stock_change),
+            "butun_depo": lambda: ButunDepoFrame(self.main_content, self.adb, self._on_stock_change),
+            "gunsonu": lambda: GunSonuFrame(self.main_content, self.adb, None),
+            "stock_take": lambda: StockTakeFrame(self.main_content, self.adb, self._on_stock_change),
+        }
+    
+    def _get_frame(self, frame_name: str):
+        """Frame'i döndür, henüz oluşturulmadıysa oluştur."""
+        frame = self.frames.get(frame_name)
+        if frame is None and frame_name in self.frame_factories:
+            frame = self.frame_factories[frame_name]()
             frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[frame_name] = frame
+        return frame
+    
+    def _mark_startup(self, step: str):
+        self.startup_times[step] = time.perf_counter() - self.started_at
+    
+    def _report_startup(self):
+        """Açılış süre raporunu konsola yaz."""
+        self._mark_startup("hazır")
+        steps = ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in self.startup_times.items())
+        schema = "şema kuruldu" if self.db.schema_setup else "şema güncel"
+        print(f"⏱️  Açılış: {steps} (DB açılışı {self.db.open_time * 1000:.1f} ms, {schema})")
     
     def _toggle_depo_menu(self):
         """Depo alt menüsünü aç/kapa."""
@@ -206,22 +258,19 @@ class App(ctk.CTk):
     
     def _show_frame(self, frame_name: str):
         """Belirtilen frame'i göster."""
-        if frame_name in self.frames:
+        created = frame_name not in self.frames
+        if self._get_frame(frame_name) is not None:
             # DEPO alt sayfaları - aralarında geçişte veya dışarı çıkınca resetle
-            depo_frames = ["add", "remove", "depo", "butun_depo"]
+            depo_frames = ["add", "remove", "depo", "butun_depo", "stock_take"]
             
             # Önceki frame DEPO altındaysa ve farklı bir sayfaya gidiyorsak resetle
             if self.current_frame in depo_frames and self.current_frame != frame_name:
                 if hasattr(self.frames[self.current_frame], 'reset'):
                     self.frames[self.current_frame].reset()
             
-            # Hedef sayfaya refresh
-            if frame_name == "depo":
-                self.frames["depo"].refresh()
-            elif frame_name == "gunsonu":
-                self.frames["gunsonu"].refresh()
-            elif frame_name == "butun_depo":
-                self.frames["butun_depo"].refresh()
+            # Hedef sayfaya refresh - yeni oluşturulan sayfa verisini kendisi yükler
+            if not created and frame_name in ("depo", "gunsonu", "butun_depo"):
+                self.frames[frame_name].refresh()
             
             self.frames[frame_name].tkraise()
             self.current_frame = frame_name
@@ -247,6 +296,8 @@ class App(ctk.CTk):
             frame.search_entry.focus_set()
         elif frame_name == "depo" and hasattr(frame, 'search_entry'):
             frame.search_entry.focus_set()
+        elif frame_name == "stock_take" and hasattr(frame, 'scan_entry'):
+            frame.scan_entry.focus_set()
     
     def _update_button_highlights(self, active_frame: str):
         """Aktif butonun vurgusunu güncelle."""
@@ -259,7 +310,7 @@ class App(ctk.CTk):
         )
         
         # Depo alt menü
-        depo_active = active_frame in ["add", "remove", "depo", "butun_depo"]
+        depo_active = active_frame in ["add", "remove", "depo", "butun_depo", "stock_take"]
         self.depo_btn.configure(
             fg_color=("gray60", "gray40") if depo_active else "#1565C0"
         )
@@ -286,12 +337,14 @@ class App(ctk.CTk):
     
     def on_closing(self):
         """Uygulama kapatılırken."""
+        # Kuyruktaki yazmalar (ör. son satış) bitsin, sonra bağlantıyı kapat
+        self.db_worker.shutdown()
         self.db.close()
         self.destroy()
 
 
-def run():
-    app = App()
+def run(started_at: float = None):
+    app = App(started_at)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
 
@@ -0,0 +1,171 @@
+"""
+Veritabanı işçi thread'i
+Tüm SQLite çağrıları tek bir arka plan thread'inde sırayla çalışır;
+sonuçlar Tk thread'ine widget.after ile geri verilir. Yavaş commit veya
+kilit beklemesi arayüzü dondurmaz.
+
+Kullanım:
+    worker = DbWorker(database, root)
+    adb = AsyncDatabase(worker)
+    adb.search_by_barcode(barcode).then(self._on_product, self._on_error)
+"""
+
+import queue
+import sys
+import threading
+import traceback
+from typing import Callable, Optional
+
+
+# Sonuç kuyruğunun kontrol aralığı (sadece bekleyen iş varken)
+POLL_MS = 10
+
+
+class DbFuture:
+    """
+    Arka plan çağrısının sonucu.
+    
+    then() ile verilen callback'ler her zaman Tk thread'inde çalışır.
+    cancel() sonrası callback çağrılmaz; iş henüz başlamadıysa hiç
+    çalıştırılmaz.
+    """
+    
+    def __init__(self, worker: "DbWorker"):
+        self._worker = worker
+        self._callbacks = []
+        self.cancelled = False
+        self.finished = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+    
+    def then(self, callback: Callable = None, on_error: Callable = None) -> "DbFuture":
+        """Sonuç (veya hata) gelince çağrılacak fonksiyonları ekle."""
+        self._callbacks.append((callback, on_error))
+        if self.finished:
+            # Sonuç zaten teslim edildi - yeni callback'i sıradaki turda çalıştır
+            self._worker.root.after(0, self._deliver)
+        return self
+    
+    def cancel(self):
+        """Sonucu artık isteme (ör. yeni arama eskisinin yerine geçti)."""
+        self.cancelled = True
+    
+    def _deliver(self):
+        callbacks, self._callbacks = self._callbacks, []
+        if self.cancelled:
+            return
+        
+        for callback, on_error in callbacks:
+            # Hata veren callback diğerlerini engellemez - sadece loglanır
+            try:
+                if self.error is None:
+                    if callback:
+                        callback(self.result)
+                elif on_error:
+                    on_error(self.error)
+                else:
+                    traceback.print_exception(type(self.error), self.error, self.error.__traceback__,
+                                              file=sys.stderr)
+            except Exception:
+                traceback.print_exc(file=sys.stderr)
+
+
+class DbWorker:
+    """
+    Tek thread'li veritabanı yürütücüsü.
+    
+    İstekler FIFO sırasıyla çalışır, böylece bir ekrandan gelen yazma ve
+    okumalar verildikleri sırayla uygulanır.
+    """
+    
+    def __init__(self, database, root):
+        self.database = database
+        self.root = root
+        self._requests = queue.Queue()
+        self._done = queue.Queue()
+        self._pending = 0
+        self._poll_id = None
+        
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> DbFuture:
+        """fn(*args, **kwargs)'ı işçi thread'inde çalıştır (Tk thread'inden çağrılır)."""
+        future = DbFuture(self)
+        self._pending += 1
+        self._requests.put((future, fn, args, kwargs))
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+        return future
+    
+    def shutdown(self, timeout: float = 5.0):
+        """Kuyruktaki işleri bitir ve thread'i durdur."""
+        self._requests.put(None)
+        self._thread.join(timeout)
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+    
+    def _run(self):
+        """İşçi döngüsü - widget'lara dokunmaz."""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            
+            future, fn, args, kwargs = request
+            if not future.cancelled:
+                try:
+                    future.result = fn(*args, **kwargs)
+                except Exception as e:
+                    future.error = e
+            future.finished = True
+            self._done.put(future)
+    
+    def _poll(self):
+        """Biten işlerin callback'lerini Tk thread'inde çalıştır."""
+        self._poll_id = None
+        try:
+            while True:
+                try:
+                    future = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending -= 1
+                try:
+                    future._deliver()
+                except Exception:
+                    # Bir sonucun hatası kuyruktaki diğer sonuçları bekletmez
+                    traceback.print_exc(file=sys.stderr)
+        finally:
+            if self._pending > 0 and self._poll_id is None:
+                self._poll_id = self.root.after(POLL_MS, self._poll)
+
+
+class AsyncDatabase:
+    """
+    Database metotlarının DbFuture döndüren karşılıkları.
+    
+    adb.checkout(cart, "cash").then(...) çağrısı Database.checkout'u işçi
+    thread'inde çalıştırır. Eşzamanlı (senkron) erişim gerekiyorsa
+    adb.sync kullanılır.
+    """
+    
+    def __init__(self, worker: DbWorker):
+        self.worker = worker
+        self.sync = worker.database
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> DbFuture:
+        """Birden fazla Database çağrısını tek iş olarak çalıştır."""
+        return self.worker.submit(fn, *args, **kwargs)
+    
+    def __getattr__(self, name: str):
+        method = getattr(self.sync, name)
+        if not callable(method):
+            return method
+        
+        def call(*args, **kwargs) -> DbFuture:
+            return self.worker.submit(method, *args, **kwargs)
+        
+        call.__name__ = name
+        return call
@@ -5,6 +5,8 @@ Stok Ekleme Frame
 import customtkinter as ctk
 from typing import Callable, Dict
 
+from money import parse_money
+
 
 class AddStockFrame(ctk.CTkFrame):
     def __init__(self, parent, database, on_update: Callable = None):
@@ -225,15 +227,18 @@ class AddStockFrame(ctk.CTkFrame):
             return
         
         try:
-            price = float(self.price_entry.get() or "0")
+            price = parse_money(self.price_entry.get() or "0")
             if price < 0:
                 raise ValueError()
         except ValueError:
             self._show_message("❌ Geçersiz fiyat!", "red")
             return
         
-        # Kaydet
-        success, message = self.db.add_product(product_id, barcode, name, size, quantity, price)
+        # Kaydet (arka planda)
+        self.db.add_product(product_id, barcode, name, size, quantity, price).then(self._on_saved)
+    
+    def _on_saved(self, result):
+        success, message = result
         
         if success:
             self._show_message(f"✅ {message}", "green")
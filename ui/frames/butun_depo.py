@@ -6,6 +6,9 @@ Onbinlerce ürün için optimize edilmiş
 import customtkinter as ctk
 from typing import Callable
 
+from ui.widgets.virtual_list import VirtualList
+from money import format_money
+
 
 class ButunDepoFrame(ctk.CTkFrame):
     def __init__(self, parent, database, on_update: Callable = None):
@@ -14,11 +17,17 @@ class ButunDepoFrame(ctk.CTkFrame):
         self.db = database
         self.on_update = on_update
         
-        # Pagination ayarları
+        # Pagination ayarları - satırlar sanal listede çizildiği için
+        # sayfa boyutu widget sayısını etkilemez
         self.current_page = 1
-        self.per_page = 50
+        self.per_page = 500
         self.total_count = 0
         self.total_pages = 0
+        # Keyset pagination: görünen sayfanın ilk/son satır anahtarı (product_id, size, id)
+        self._first_key = None
+        self._last_key = None
+        # Arka planda yüklenen sayfa
+        self._load_future = None
         
         self._create_widgets()
     
@@ -64,9 +73,11 @@ class ButunDepoFrame(ctk.CTkFrame):
                 width=width
             ).pack(side="left", padx=3, pady=10)
         
-        # Scrollable liste
-        self.list_container = ctk.CTkScrollableFrame(
+        # Sanal liste - sabit sayıda satır widget'ı, kaydırınca yeniden bağlanır
+        self.list_container = VirtualList(
             self,
+            columns=[(width, "w") for _, width in headers],
+            formatter=self._format_row,
             fg_color=("gray95", "gray17"),
             height=350
         )
@@ -138,91 +149,76 @@ class ButunDepoFrame(ctk.CTkFrame):
     
     def _show_placeholder(self):
         """Boş mesaj göster."""
-        for widget in self.list_container.winfo_children():
-            widget.destroy()
-        
-        self.placeholder = ctk.CTkLabel(
-            self.list_container,
-            text="📦 Ürünleri görüntülemek için 'Yükle' butonuna tıklayın",
-            font=ctk.CTkFont(size=16),
-            text_color="gray"
-        )
-        self.placeholder.pack(pady=80)
-        
-        load_btn = ctk.CTkButton(
-            self.list_container,
-            text="📥 Ürünleri Yükle",
-            font=ctk.CTkFont(size=14, weight="bold"),
-            height=40,
-            width=150,
-            command=self._load_products
+        self.list_container.show_placeholder(
+            "📦 Ürünleri görüntülemek için 'Yükle' butonuna tıklayın",
+            button_text="📥 Ürünleri Yükle",
+            command=self._first_page
         )
-        load_btn.pack()
     
-    def _load_products(self):
-        """Ürünleri yükle."""
-        # Temizle
-        for widget in self.list_container.winfo_children():
-            widget.destroy()
-        
-        # Verileri al
-        products, self.total_count = self.db.get_all_products_paginated(
-            self.current_page, 
-            self.per_page
+    def _load_products(self, direction: str = "first"):
+        """Ürünleri yükle (keyset pagination) - sorgu arka planda."""
+        anchor = self._last_key if direction == "next" else self._first_key
+        
+        # Hızlı sayfa geçişlerinde sadece son istenen sayfa gösterilir
+        if self._load_future:
+            self._load_future.cancel()
+        self._load_future = self.db.submit(self._fetch_page, direction, anchor).then(
+            lambda result: self._show_page(direction, *result)
         )
-        
-        if self.total_count == 0:
-            label = ctk.CTkLabel(
-                self.list_container,
-                text="📭 Depoda ürün yok",
-                font=ctk.CTkFont(size=16),
-                text_color="gray"
-            )
-            label.pack(pady=80)
+    
+    def _fetch_page(self, direction: str, anchor):
+        """İşçi thread'inde çalışır - widget'lara dokunmaz."""
+        db = self.db.sync
+        total_count = db.count_products()
+        products = db.get_products_page(direction, anchor, self.per_page)
+        
+        if not products and total_count > 0:
+            # Sayfadaki ürünler silinmiş olabilir - son sayfaya dön
+            direction = "last"
+            products = db.get_products_page("last", None, self.per_page)
+        
+        return total_count, products, direction
+    
+    def _show_page(self, direction: str, total_count: int, products, fetched: str):
+        """Sayfa verisini listeye bağla."""
+        self._load_future = None
+        self.total_count = total_count
+        
+        if total_count == 0:
+            self._first_key = self._last_key = None
+            self.list_container.show_placeholder("📭 Depoda ürün yok")
             self._update_pagination_info()
             return
         
         # Toplam sayfa hesapla
         self.total_pages = (self.total_count + self.per_page - 1) // self.per_page
+        if fetched == "last" and direction != "last":
+            self.current_page = self.total_pages
         
-        # Ürünleri göster
-        for product in products:
-            self._add_product_row(product)
+        self._first_key = (products[0][1], products[0][4], products[0][0])
+        self._last_key = (products[-1][1], products[-1][4], products[-1][0])
+        
+        # Ürünleri göster - aynı sayfa yenileniyorsa kaydırma konumu korunur
+        self.list_container.set_rows(products, keep_offset=(direction == "at"))
         
         self._update_pagination_info()
     
-    def _add_product_row(self, product):
-        """Tek bir ürün satırı ekle."""
-        product_id = product[1]
-        barcode = product[2]
+    def _format_row(self, product):
+        """Tek bir ürün satırının sütun metinleri."""
         name = product[3]
-        size = product[4] or "-"
         quantity = product[5]
         price = product[6]
         total = quantity * price
         
-        row = ctk.CTkFrame(self.list_container, fg_color=("gray90", "gray20"), height=35)
-        row.pack(fill="x", pady=1)
-        row.pack_propagate(False)
-        
-        data = [
-            (product_id, 100),
-            (barcode, 120),
-            (name[:20] + "..." if len(name) > 20 else name, 180),
-            (size, 60),
-            (str(quantity), 60),
-            (f"{price:.2f} ₺", 80),
-            (f"{total:.2f} ₺", 90)
+        return [
+            product[1],
+            product[2],
+            name[:20] + "..." if len(name) > 20 else name,
+            product[4] or "-",
+            str(quantity),
+            format_money(price, grouping=False),
+            format_money(total, grouping=False)
         ]
-        
-        for text, width in data:
-            ctk.CTkLabel(
-                row,
-                text=text,
-                font=ctk.CTkFont(size=11),
-                width=width,
-                anchor="w"
-            ).pack(side="left", padx=3, pady=5)
     
     def _update_pagination_info(self):
         """Pagination bilgilerini güncelle."""
@@ -247,30 +243,35 @@ class ButunDepoFrame(ctk.CTkFrame):
     
     def _first_page(self):
         self.current_page = 1
-        self._load_products()
+        self._load_products("first")
     
     def _prev_page(self):
-        if self.current_page > 1:
+        # Önceki/sonraki sayfa görünen sayfanın anahtarına bağlı - yükleme bitmeden ilerlenmez
+        if self.current_page > 1 and not self._load_future:
             self.current_page -= 1
-            self._load_products()
+            self._load_products("prev")
     
     def _next_page(self):
-        if self.current_page < self.total_pages:
+        if self.current_page < self.total_pages and not self._load_future:
             self.current_page += 1
-            self._load_products()
+            self._load_products("next")
     
     def _last_page(self):
         self.current_page = self.total_pages
-        self._load_products()
+        self._load_products("last")
     
     def refresh(self):
         """Sayfayı yenile."""
         if self.total_count > 0:
-            self._load_products()
+            self._load_products("at")
     
     def reset(self):
         """Sayfa değiştiğinde çağrılır - başlangıç durumuna dön."""
+        if self._load_future:
+            self._load_future.cancel()
+            self._load_future = None
         self.current_page = 1
         self.total_count = 0
+        self._first_key = self._last_key = None
         self._show_placeholder()
         self._update_pagination_info()
@@ -1,11 +1,25 @@
 """
 Depo Frame - Stok Listesi / Düzenle
 Sadece arama yapınca ürünler görünür (performans için)
+Yazarken arama: tuş vuruşları ertelenir (debounce), sorgu arka planda çalışır
 Fiyat düzenleme özelliği ile
 """
 
 import customtkinter as ctk
-from typing import Callable
+from typing import Callable, Optional
+
+from ui.widgets.virtual_list import VirtualList
+from money import format_money, parse_money
+
+
+# Son tuştan sonra aramaya başlamadan önce beklenecek süre
+SEARCH_DEBOUNCE_MS = 250
+# Yazarken arama için en az karakter (Enter / Ara ile her uzunlukta aranır)
+SEARCH_MIN_CHARS = 2
+# Önce küçük bir sonuç seti gösterilir, ardından liste tamamlanır
+SEARCH_FIRST_BATCH = 50
+# Listede gösterilen en fazla sonuç (alaka sırasıyla); toplam ayrıca sayılır
+SEARCH_MAX_RESULTS = 1000
 
 
 class DepoFrame(ctk.CTkFrame):
@@ -15,6 +29,11 @@ class DepoFrame(ctk.CTkFrame):
         self.db = database
         self.on_update = on_update
         
+        # Canlı arama durumu - sadece en son istenen aramanın sonucu gösterilir
+        self._search_after_id = None
+        self._search_future = None
+        self._last_search = None
+        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -48,6 +67,7 @@ class DepoFrame(ctk.CTkFrame):
         )
         self.search_entry.pack(side="left", padx=5)
         self.search_entry.bind("<Return>", lambda e: self._search_products())
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
         
         search_btn = ctk.CTkButton(
             search_frame,
@@ -81,23 +101,30 @@ class DepoFrame(ctk.CTkFrame):
                 width=width
             ).pack(side="left", padx=2, pady=10)
         
-        # Scrollable liste
-        self.list_container = ctk.CTkScrollableFrame(
+        # Sanal liste - sabit sayıda satır widget'ı, kaydırınca yeniden bağlanır
+        self.list_container = VirtualList(
             self,
+            columns=[(width, "w") for _, width in headers[:-1]],
+            formatter=self._format_row,
+            actions=[
+                # Ayarlar butonu (menü açar)
+                ("⚙️", ("#1976D2", "#0D47A1"), ("#2196F3", "#1976D2"),
+                 lambda p: self._show_edit_menu(p[1], p[2], p[6], p[4] or "-", p[0])),
+                # Silme butonu
+                ("🗑️", ("#E53935", "#C62828"), ("#F44336", "#E53935"),
+                 lambda p: self._delete_product(p[0])),
+            ],
+            row_height=42,
+            padx=2,
             fg_color=("gray95", "gray17"),
             height=300
         )
         self.list_container.pack(fill="both", expand=True, padx=20, pady=(0, 10))
         
         # Başlangıç mesajı
-        self.placeholder = ctk.CTkLabel(
-            self.list_container,
-            text="🔍 Ürün aramak için yukarıdaki arama kutusunu kullanın\n\nÖrnek: Ürün ID, barkod veya ürün adı ile arayın",
-            font=ctk.CTkFont(size=16),
-            text_color="gray",
-            justify="center"
+        self.list_container.show_placeholder(
+            "🔍 Ürün aramak için yukarıdaki arama kutusunu kullanın\n\nÖrnek: Ürün ID, barkod veya ürün adı ile arayın"
         )
-        self.placeholder.pack(pady=80)
         
         # ===== FOOTER - TOPLAM BİLGİLER =====
         self.footer = ctk.CTkFrame(self, fg_color=("gray85", "gray22"), height=50)
@@ -146,110 +173,143 @@ class DepoFrame(ctk.CTkFrame):
             "İsim": "🔍 Ürün adı ara..."
         }
         self.search_entry.configure(placeholder_text=placeholders.get(value, "🔍 Ara..."))
-    
-    def _search_products(self):
-        """Ürünleri ara ve listele."""
-        search_term = self.search_entry.get().strip()
         
-        if not search_term:
-            self._show_message("❌ Arama terimi girin!", "red")
-            return
-        
-        # Arama tipini belirle
+        # Kutuda terim varsa yeni tiple hemen tekrar ara
+        if self.search_entry.get().strip():
+            self._search_products()
+    
+    def _get_search_type(self) -> str:
         search_type_map = {
             "Tümü": "all",
             "Ürün ID": "product_id",
             "Barkod": "barcode",
             "İsim": "name"
         }
-        search_type = search_type_map.get(self.search_type.get(), "all")
+        return search_type_map.get(self.search_type.get(), "all")
+    
+    def _on_search_key(self, event=None):
+        """Tuş bırakıldı - aramayı son tuştan SEARCH_DEBOUNCE_MS sonraya ertele."""
+        if event is not None and event.keysym == "Return":
+            return
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._live_search)
+    
+    def _live_search(self):
+        """Yazarken arama (debounce sonrası)."""
+        self._search_after_id = None
+        search_term = self.search_entry.get().strip()
         
-        # Ara
-        products = self.db.search_products(search_term, search_type)
+        if not search_term:
+            self._cancel_search()
+            self.list_container.show_placeholder("🔍 Ürün aramak için yukarıdaki arama kutusunu kullanın")
+            self.result_count_label.configure(text="")
+            return
         
-        # Sonuçları göster
-        self._load_products(products)
+        if len(search_term) < SEARCH_MIN_CHARS:
+            return
+        
+        self._start_search(search_term)
     
-    def _load_products(self, products):
-        """Ürünleri listele."""
-        # Temizle
-        for widget in self.list_container.winfo_children():
-            widget.destroy()
+    def _search_products(self):
+        """Ürünleri ara ve listele (Enter / Ara butonu - beklemeden)."""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
         
+        search_term = self.search_entry.get().strip()
+        
+        if not search_term:
+            self._show_message("❌ Arama terimi girin!", "red")
+            return
+        
+        self._start_search(search_term, force=True)
+    
+    def _start_search(self, search_term: str, force: bool = False):
+        """Aramayı veritabanı işçisine ver; bekleyen eski arama iptal edilir."""
+        search_type = self._get_search_type()
+        if not force and (search_term, search_type) == self._last_search:
+            return
+        self._last_search = (search_term, search_type)
+        
+        if self._search_future:
+            self._search_future.cancel()
+        
+        self.result_count_label.configure(text="⏳ Aranıyor...")
+        # Önce küçük bir sonuç seti; daha fazlası varsa liste ve toplam ayrı
+        # bir işte tamamlanır. İki sorgu da aynı sıralama penceresini
+        # (FTS_RANK_WINDOW) kullanır - ilk parti tam listenin başıdır.
+        # Her iş birkaç ms sürer, satış yazmaları arkasında uzun beklemez.
+        self._search_future = self.db.search_products(search_term, search_type, SEARCH_FIRST_BATCH).then(
+            lambda products: self._on_first_batch(search_term, search_type, products)
+        )
+    
+    def _on_first_batch(self, search_term: str, search_type: str, products):
+        if len(products) < SEARCH_FIRST_BATCH:
+            self._search_future = None
+            self._load_products(products, len(products))
+            return
+        
+        self._load_products(products, None)
+        self._search_future = self.db.submit(self._fetch_results, search_term, search_type).then(
+            self._on_results
+        )
+    
+    def _fetch_results(self, search_term: str, search_type: str):
+        """İşçi thread'inde çalışır - alaka sıralı tam liste ve toplam eşleşme."""
+        db = self.db.sync
+        products = db.search_products(search_term, search_type, SEARCH_MAX_RESULTS)
+        total = len(products)
+        if total == SEARCH_MAX_RESULTS:
+            total = db.count_search_matches(search_term, search_type)
+        return products, total
+    
+    def _on_results(self, result):
+        self._search_future = None
+        products, total = result
+        self._load_products(products, total, keep_offset=True)
+    
+    def _cancel_search(self):
+        """Bekleyen/çalışan aramanın sonucunu geçersiz kıl."""
+        if self._search_future:
+            self._search_future.cancel()
+            self._search_future = None
+        self._last_search = None
+    
+    def _load_products(self, products, total: Optional[int], keep_offset: bool = False):
+        """Ürünleri listele (total None ise liste henüz tamamlanıyor)."""
         if not products:
-            self.placeholder = ctk.CTkLabel(
-                self.list_container,
-                text="❌ Ürün bulunamadı",
-                font=ctk.CTkFont(size=16),
-                text_color="gray"
-            )
-            self.placeholder.pack(pady=80)
+            self.list_container.show_placeholder("❌ Ürün bulunamadı")
             self.result_count_label.configure(text="")
             return
         
-        self.result_count_label.configure(text=f"Bulunan: {len(products)} kayıt")
-        
-        for product in products:
-            self._add_product_row(product)
+        if total is None:
+            text = f"Bulunan: {len(products)}+ kayıt (yükleniyor...)"
+        elif total > len(products):
+            text = f"Bulunan: {total:,} kayıt (en alakalı {len(products)} gösteriliyor)"
+        else:
+            text = f"Bulunan: {total:,} kayıt"
+        self.result_count_label.configure(text=text)
+        self.list_container.set_rows(products, keep_offset=keep_offset)
     
-    def _add_product_row(self, product):
-        """Tek bir ürün satırı ekle."""
-        row_id = product[0]
-        product_id = product[1]
-        barcode = product[2]
+    def _format_row(self, product):
+        """Tek bir ürün satırının sütun metinleri."""
         name = product[3]
-        size = product[4] or "-"
         quantity = product[5]
         price = product[6]
         total = quantity * price
         
-        row = ctk.CTkFrame(self.list_container, fg_color=("gray90", "gray20"), height=40)
-        row.pack(fill="x", pady=1)
-        row.pack_propagate(False)
-        
-        data = [
-            (product_id, 100),
-            (barcode, 110),
-            (name[:18] + "..." if len(name) > 18 else name, 160),
-            (size, 55),
-            (str(quantity), 55),
-            (f"{price:.2f} ₺", 75),
-            (f"{total:.2f} ₺", 85)
+        return [
+            product[1],
+            product[2],
+            name[:18] + "..." if len(name) > 18 else name,
+            product[4] or "-",
+            str(quantity),
+            format_money(price, grouping=False),
+            format_money(total, grouping=False)
         ]
-        
-        for text, width in data:
-            ctk.CTkLabel(
-                row,
-                text=text,
-                font=ctk.CTkFont(size=11),
-                width=width,
-                anchor="w"
-            ).pack(side="left", padx=2, pady=6)
-        
-        # Ayarlar butonu (menü açar)
-        settings_btn = ctk.CTkButton(
-            row,
-            text="⚙️",
-            width=32,
-            height=28,
-            fg_color=("#1976D2", "#0D47A1"),
-            hover_color=("#2196F3", "#1976D2"),
-            command=lambda pid=product_id, bc=barcode, p=price, s=size, rid=row_id: self._show_edit_menu(pid, bc, p, s, rid)
-        )
-        settings_btn.pack(side="left", padx=2)
-        
-        # Silme butonu
-        ctk.CTkButton(
-            row,
-            text="🗑️",
-            width=32,
-            height=28,
-            fg_color=("#E53935", "#C62828"),
-            hover_color=("#F44336", "#E53935"),
-            command=lambda rid=row_id: self._delete_product(rid)
-        ).pack(side="left", padx=2)
     
-    def _show_edit_menu(self, product_id: str, barcode: str, price: float, size: str, row_id: int):
+    def _show_edit_menu(self, product_id: str, barcode: str, price: int, size: str, row_id: int):
         """Düzenleme menüsü göster."""
         # Popup pencere oluştur
         menu_window = ctk.CTkToplevel(self)
@@ -313,33 +373,37 @@ class DepoFrame(ctk.CTkFrame):
             command=menu_window.destroy
         ).pack(fill="x", padx=20, pady=(10, 15))
     
-    def _edit_price(self, product_id: str, current_price: float):
+    def _edit_price(self, product_id: str, current_price: int):
         """Fiyat düzenleme dialogu."""
         dialog = ctk.CTkInputDialog(
-            text=f"Ürün ID: {product_id}\nMevcut fiyat: {current_price:.2f} ₺\n\nYeni fiyat girin:",
+            text=f"Ürün ID: {product_id}\nMevcut fiyat: {format_money(current_price, grouping=False)}\n\nYeni fiyat girin:",
             title="💰 Fiyat Güncelle"
         )
         result = dialog.get_input()
         
         if result:
             try:
-                new_price = float(result.replace(",", ".").replace("₺", "").strip())
+                new_price = parse_money(result)
                 if new_price < 0:
                     raise ValueError()
                 
-                success, message = self.db.update_price_by_product_id(product_id, new_price)
-                
-                if success:
-                    self._show_message(f"✅ {message}", "green")
-                    self._search_products()  # Listeyi yenile
-                    self._update_totals()
-                    if self.on_update:
-                        self.on_update()
-                else:
-                    self._show_message(f"❌ {message}", "red")
+                self.db.update_price_by_product_id(product_id, new_price).then(self._on_product_changed)
             except ValueError:
                 self._show_message("❌ Geçersiz fiyat!", "red")
     
+    def _on_product_changed(self, result):
+        """Fiyat güncelleme / silme sonucu."""
+        success, message = result
+        
+        if success:
+            self._show_message(f"✅ {message}", "green")
+            self._search_products()  # Listeyi yenile
+            self._update_totals()
+            if self.on_update:
+                self.on_update()
+        else:
+            self._show_message(f"❌ {message}", "red")
+    
     def _edit_size(self, row_id: int, barcode: str, current_size: str):
         """Beden düzenleme dialogu - sadece bu barkod için."""
         # Popup pencere
@@ -395,8 +459,11 @@ class DepoFrame(ctk.CTkFrame):
         
         def save_size():
             new_size = selected_size.get()
-            success, message = self.db.update_product(row_id, size=new_size)
-            
+            self.db.update_product(row_id, size=new_size).then(
+                lambda result: on_saved(new_size, *result)
+            )
+        
+        def on_saved(new_size: str, success: bool, message: str):
             if success:
                 size_window.destroy()
                 self._show_message(f"✅ Beden güncellendi: {new_size or '-'}", "green")
@@ -423,23 +490,14 @@ class DepoFrame(ctk.CTkFrame):
         result = dialog.get_input()
         
         if result and result.upper() == "EVET":
-            success, message = self.db.delete_product(row_id)
-            
-            if success:
-                self._show_message(f"✅ {message}", "green")
-                self._search_products()  # Listeyi yenile
-                self._update_totals()
-                if self.on_update:
-                    self.on_update()
-            else:
-                self._show_message(f"❌ {message}", "red")
+            self.db.delete_product(row_id).then(self._on_product_changed)
     
     def _update_totals(self):
-        """Toplam değerleri güncelle."""
-        total_value = self.db.get_total_value()
-        total_qty = self.db.get_total_quantity()
-        
-        self.total_value_label.configure(text=f"💰 TOPLAM STOK DEĞERİ: {total_value:,.2f} ₺")
+        """Toplam değerleri güncelle (arka planda)."""
+        self.db.get_inventory_totals().then(lambda totals: self._show_totals(*totals))
+    
+    def _show_totals(self, total_value: int, total_qty: int):
+        self.total_value_label.configure(text=f"💰 TOPLAM STOK DEĞERİ: {format_money(total_value)}")
         self.total_qty_label.configure(text=f"📦 Toplam: {total_qty} adet")
     
     def refresh(self):
@@ -448,17 +506,12 @@ class DepoFrame(ctk.CTkFrame):
     
     def reset(self):
         """Sayfa değiştiğinde çağrılır - arama sıfırla."""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        self._cancel_search()
         self.search_entry.delete(0, "end")
-        for widget in self.list_container.winfo_children():
-            widget.destroy()
-        self.placeholder = ctk.CTkLabel(
-            self.list_container,
-            text="🔍 Ürün aramak için yukarıdaki arama kutusunu kullanın",
-            font=ctk.CTkFont(size=16),
-            text_color="gray",
-            justify="center"
-        )
-        self.placeholder.pack(pady=80)
+        self.list_container.show_placeholder("🔍 Ürün aramak için yukarıdaki arama kutusunu kullanın")
         self.result_count_label.configure(text="")
         self.message_label.configure(text="")
         self._update_totals()
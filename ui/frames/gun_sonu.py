@@ -1,12 +1,15 @@
 """
 Gün Sonu Frame - Günlük satış raporu
 Tarih seçerek geçmiş günlerin raporlarını görüntüleme
+Haftalık / aylık görünüm (SQL'de gruplanmış özetler)
 """
 
 import customtkinter as ctk
-from typing import Callable
+from typing import Callable, Dict, List, Tuple
 from datetime import datetime, date, timedelta
 
+from money import format_money
+
 
 class GunSonuFrame(ctk.CTkFrame):
     def __init__(self, parent, database, on_update: Callable = None):
@@ -15,6 +18,10 @@ class GunSonuFrame(ctk.CTkFrame):
         self.db = database
         self.on_update = on_update
         self.selected_date = date.today()
+        # Görünüm modu: "day", "week" veya "month"
+        self.mode = "day"
+        # Arka planda yüklenen rapor
+        self._report_future = None
         
         self._create_widgets()
         self._load_report()
@@ -35,6 +42,15 @@ class GunSonuFrame(ctk.CTkFrame):
         date_frame = ctk.CTkFrame(header, fg_color="transparent")
         date_frame.pack(side="right", padx=20, pady=10)
         
+        # Görünüm modu seçici
+        self.mode_selector = ctk.CTkSegmentedButton(
+            header,
+            values=["Gün", "Hafta", "Ay"],
+            command=self._on_mode_change
+        )
+        self.mode_selector.set("Gün")
+        self.mode_selector.pack(side="right", padx=10)
+        
         ctk.CTkButton(
             date_frame,
             text="◀",
@@ -47,7 +63,7 @@ class GunSonuFrame(ctk.CTkFrame):
             date_frame,
             text=self.selected_date.strftime("%d.%m.%Y"),
             font=ctk.CTkFont(size=16, weight="bold"),
-            width=120
+            width=200
         )
         self.date_label.pack(side="left", padx=10)
         
@@ -78,11 +94,12 @@ class GunSonuFrame(ctk.CTkFrame):
         left_frame = ctk.CTkFrame(content, fg_color=("gray90", "gray17"))
         left_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 5), pady=5)
         
-        ctk.CTkLabel(
+        self.summary_title = ctk.CTkLabel(
             left_frame,
             text="📋 GÜNLÜK ÖZET",
             font=ctk.CTkFont(size=18, weight="bold")
-        ).pack(pady=20)
+        )
+        self.summary_title.pack(pady=20)
         
         # Toplam Satış Kartı
         total_card = ctk.CTkFrame(left_frame, fg_color=("gray75", "gray25"))
@@ -190,13 +207,16 @@ class GunSonuFrame(ctk.CTkFrame):
         list_header.pack(fill="x", padx=10)
         
         headers = [("Saat", 60), ("Tutar", 100), ("Ödeme", 80)]
+        self.list_header_labels = []
         for text, width in headers:
-            ctk.CTkLabel(
+            label = ctk.CTkLabel(
                 list_header,
                 text=text,
                 font=ctk.CTkFont(size=12, weight="bold"),
                 width=width
-            ).pack(side="left", padx=10, pady=8)
+            )
+            label.pack(side="left", padx=10, pady=8)
+            self.list_header_labels.append(label)
         
         # Satış listesi
         self.sales_list = ctk.CTkScrollableFrame(
@@ -214,18 +234,56 @@ class GunSonuFrame(ctk.CTkFrame):
         )
         self.empty_label.pack(pady=50)
     
-    def _prev_day(self):
-        """Önceki güne git."""
-        self.selected_date -= timedelta(days=1)
+    def _on_mode_change(self, value):
+        """Gün / Hafta / Ay görünümü değiştiğinde."""
+        self.mode = {"Gün": "day", "Hafta": "week", "Ay": "month"}.get(value, "day")
+        
+        titles = {"day": "📋 GÜNLÜK ÖZET", "week": "📋 HAFTALIK ÖZET", "month": "📋 AYLIK ÖZET"}
+        self.summary_title.configure(text=titles[self.mode])
+        
+        list_headers = ["Saat", "Tutar", "Ödeme"] if self.mode == "day" else ["Tarih", "Tutar", "İşlem"]
+        for label, text in zip(self.list_header_labels, list_headers):
+            label.configure(text=text)
+        
+        self._update_date_display()
+        self._load_report()
+    
+    def _period_range(self):
+        """Seçili tarihi içeren dönemin (başlangıç, bitiş) tarihleri."""
+        if self.mode == "week":
+            start = self.selected_date - timedelta(days=self.selected_date.weekday())
+            return start, start + timedelta(days=6)
+        if self.mode == "month":
+            start = self.selected_date.replace(day=1)
+            next_month = (start + timedelta(days=32)).replace(day=1)
+            return start, next_month - timedelta(days=1)
+        return self.selected_date, self.selected_date
+    
+    def _step(self, direction: int):
+        """Seçili dönemi bir gün/hafta/ay ileri veya geri kaydır."""
+        start, end = self._period_range()
+        if direction > 0:
+            target = end + timedelta(days=1)
+            if target > date.today():
+                return
+        else:
+            target = start - timedelta(days=1)
+        
+        # Yeni dönemin başına git (ay/hafta için)
+        self.selected_date = target
+        if self.mode != "day":
+            self.selected_date = self._period_range()[0]
+        
         self._update_date_display()
         self._load_report()
     
+    def _prev_day(self):
+        """Önceki güne (haftaya/aya) git."""
+        self._step(-1)
+    
     def _next_day(self):
-        """Sonraki güne git."""
-        if self.selected_date < date.today():
-            self.selected_date += timedelta(days=1)
-            self._update_date_display()
-            self._load_report()
+        """Sonraki güne (haftaya/aya) git."""
+        self._step(1)
     
     def _go_today(self):
         """Bugüne git."""
@@ -235,35 +293,106 @@ class GunSonuFrame(ctk.CTkFrame):
     
     def _update_date_display(self):
         """Tarih gösterimini güncelle."""
-        display = self.selected_date.strftime("%d.%m.%Y")
-        if self.selected_date == date.today():
-            display += " (Bugün)"
+        if self.mode == "day":
+            display = self.selected_date.strftime("%d.%m.%Y")
+            if self.selected_date == date.today():
+                display += " (Bugün)"
+        elif self.mode == "week":
+            start, end = self._period_range()
+            display = f"{start.strftime('%d.%m')} - {end.strftime('%d.%m.%Y')}"
+        else:
+            display = self.selected_date.strftime("%m.%Y")
         self.date_label.configure(text=display)
     
     def _load_report(self):
-        """Raporu yükle."""
-        # Özet bilgileri al
-        summary = self.db.get_daily_summary(self.selected_date)
+        """Raporu yükle - sorgular arka planda, sonuç gelince ekran güncellenir."""
+        start, end = self._period_range()
+        mode = self.mode
+        selected_date = self.selected_date
+        
+        # Tarihler arasında hızlı geçişte sadece son istenen rapor gösterilir
+        if self._report_future:
+            self._report_future.cancel()
+        self._report_future = self.db.submit(
+            self._fetch_report, start, end, mode, selected_date
+        ).then(lambda result: self._show_report(mode, *result))
+    
+    def _fetch_report(self, start: date, end: date, mode: str, selected_date: date):
+        """İşçi thread'inde çalışır - widget'lara dokunmaz."""
+        db = self.db.sync
+        # Özet bilgileri al - tek SQL gruplaması, Python döngüsü yok
+        summary = db.get_range_summary(start, end)
+        if mode == "day":
+            rows = db.get_daily_sales(selected_date)
+        else:
+            rows = db.get_sales_report(start, end, "day")
+        return summary, rows
+    
+    def _show_report(self, mode: str, summary: dict, rows):
+        """Rapor verisini ekrana yaz."""
+        self._report_future = None
         
         # Kartları güncelle
-        self.total_label.configure(text=f"{summary['grand_total']:,.2f} ₺")
-        self.cash_total_label.configure(text=f"{summary['cash_total']:,.2f} ₺")
+        self.total_label.configure(text=format_money(summary['grand_total']))
+        self.cash_total_label.configure(text=format_money(summary['cash_total']))
         self.cash_count_label.configure(text=f"{summary['cash_count']} işlem")
-        self.card_total_label.configure(text=f"{summary['card_total']:,.2f} ₺")
+        self.card_total_label.configure(text=format_money(summary['card_total']))
         self.card_count_label.configure(text=f"{summary['card_count']} işlem")
         self.sale_count_label.configure(text=str(summary['total_sales']))
         
         # Satış listesini yükle
-        self._load_sales_list()
+        if mode == "day":
+            self._load_sales_list(rows)
+        else:
+            self._load_period_list(rows)
+    
+    def _load_period_list(self, days: List[Dict]):
+        """Haftalık/aylık görünümde gün bazlı toplamları listele."""
+        for widget in self.sales_list.winfo_children():
+            widget.destroy()
+        
+        if not days:
+            self.empty_label = ctk.CTkLabel(
+                self.sales_list,
+                text="Bu dönemde satış yok",
+                font=ctk.CTkFont(size=14),
+                text_color="gray"
+            )
+            self.empty_label.pack(pady=50)
+            return
+        
+        for day in days:
+            row = ctk.CTkFrame(self.sales_list, fg_color=("gray85", "gray22"), height=35)
+            row.pack(fill="x", pady=1)
+            row.pack_propagate(False)
+            
+            ctk.CTkLabel(
+                row,
+                text=date.fromisoformat(day['period']).strftime("%d.%m"),
+                font=ctk.CTkFont(size=12),
+                width=60
+            ).pack(side="left", padx=10, pady=6)
+            
+            ctk.CTkLabel(
+                row,
+                text=format_money(day['total']),
+                font=ctk.CTkFont(size=12, weight="bold"),
+                width=100
+            ).pack(side="left", padx=10)
+            
+            ctk.CTkLabel(
+                row,
+                text=f"{day['count']} işlem",
+                font=ctk.CTkFont(size=11),
+                width=80
+            ).pack(side="left", padx=10)
     
-    def _load_sales_list(self):
+    def _load_sales_list(self, sales: List[Tuple]):
         """Satış listesini yükle."""
         # Temizle
         for widget in self.sales_list.winfo_children():
             widget.destroy()
         
-        sales = self.db.get_daily_sales(self.selected_date)
-        
         if not sales:
             self.empty_label = ctk.CTkLabel(
                 self.sales_list,
@@ -275,8 +404,8 @@ class GunSonuFrame(ctk.CTkFrame):
             return
         
         for sale in sales:
-            # id, sale_date, total_amount, payment_method, items_json, created_at
-            sale_time = datetime.fromisoformat(sale[5]).strftime("%H:%M")
+            # id, sale_date, total_amount, payment_method, created_at
+            sale_time = datetime.fromisoformat(sale[4]).strftime("%H:%M")
             total = sale[2]
             method = "💵 Nakit" if sale[3] == "cash" else "💳 Kart"
             
@@ -293,7 +422,7 @@ class GunSonuFrame(ctk.CTkFrame):
             
             ctk.CTkLabel(
                 row,
-                text=f"{total:,.2f} ₺",
+                text=format_money(total),
                 font=ctk.CTkFont(size=12, weight="bold"),
                 width=100
             ).pack(side="left", padx=10)
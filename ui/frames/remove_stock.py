@@ -5,6 +5,8 @@ Stok Çıkartma Frame
 import customtkinter as ctk
 from typing import Callable
 
+from money import format_money
+
 
 class RemoveStockFrame(ctk.CTkFrame):
     def __init__(self, parent, database, on_update: Callable = None):
@@ -13,6 +15,8 @@ class RemoveStockFrame(ctk.CTkFrame):
         self.db = database
         self.on_update = on_update
         self.current_product = None
+        # Bekleyen arama (yenisi başlarsa iptal edilir)
+        self._search_future = None
         self.search_mode = ctk.StringVar(value="barcode")
         
         self._create_widgets()
@@ -110,8 +114,10 @@ class RemoveStockFrame(ctk.CTkFrame):
     
     def _clear_results(self):
         """Sonuçları temizle ve placeholder göster."""
-        for widget in self.result_container.winfo_children():
-            widget.destroy()
+        if self._search_future:
+            self._search_future.cancel()
+            self._search_future = None
+        self._clear_result_widgets()
         
         mode = self.search_mode.get()
         if mode == "barcode":
@@ -140,36 +146,44 @@ class RemoveStockFrame(ctk.CTkFrame):
             self._show_message("❌ Arama değeri girin!", "red")
             return
         
-        # Önceki sonuçları temizle
-        for widget in self.result_container.winfo_children():
-            widget.destroy()
-        
         mode = self.search_mode.get()
         
+        # Sorgular arka planda; yeni arama başlarsa eskisinin sonucu atılır
+        if self._search_future:
+            self._search_future.cancel()
+        
         if mode == "barcode":
             # Barkod ile arama - tek ürün
-            product = self.db.search_by_barcode(search_value)
-            
-            if product:
-                self._show_single_product(product)
-            else:
-                self._show_not_found()
+            self._search_future = self.db.search_by_barcode(search_value).then(self._on_barcode_result)
         else:
             # Ürün ID ile arama - tüm bedenler
-            products = self.db.search_by_product_id(search_value)
-            
-            if products:
-                self._show_product_group(products)
-            else:
-                self._show_not_found()
+            self._search_future = self.db.get_product_summary(search_value).then(self._on_product_id_result)
+    
+    def _clear_result_widgets(self):
+        """Önceki sonuçları temizle."""
+        for widget in self.result_container.winfo_children():
+            widget.destroy()
+    
+    def _on_barcode_result(self, product):
+        self._clear_result_widgets()
+        if product:
+            self._show_single_product(product)
+        else:
+            self._show_not_found()
+    
+    def _on_product_id_result(self, summary):
+        self._clear_result_widgets()
+        if summary:
+            self._show_product_group(summary)
+        else:
+            self._show_not_found()
     
     def _show_single_product(self, product):
         """Tek ürün göster (barkod araması)."""
-        # id, product_id, barcode, name, size, quantity, price
         card = ctk.CTkFrame(self.result_container, fg_color=("gray80", "gray25"))
         card.pack(fill="x", pady=5, padx=10)
         
-        info_text = f"📦 {product[3]} | Beden: {product[4] or '-'} | Stok: {product[5]} | Fiyat: {product[6]:.2f} ₺"
+        info_text = f"📦 {product.name} | Beden: {product.size or '-'} | Stok: {product.quantity} | Fiyat: {format_money(product.price, grouping=False)}"
         
         info_label = ctk.CTkLabel(
             card,
@@ -199,19 +213,17 @@ class RemoveStockFrame(ctk.CTkFrame):
             height=35,
             fg_color=("#C62828", "#B71C1C"),
             hover_color=("#D32F2F", "#C62828"),
-            command=lambda p=product, q=quantity_entry: self._remove_stock(p[2], q)
+            command=lambda p=product, q=quantity_entry: self._remove_stock(p.barcode, q)
         )
         remove_btn.pack(side="left", padx=5)
     
-    def _show_product_group(self, products):
+    def _show_product_group(self, summary: dict):
         """Ürün grubu göster (ürün ID araması)."""
         # Özet başlık
-        summary = self.db.get_product_summary(products[0][1])
-        
         header = ctk.CTkFrame(self.result_container, fg_color=("gray75", "gray30"))
         header.pack(fill="x", pady=(5, 10), padx=10)
         
-        header_text = f"📦 {summary['name']} (ID: {summary['product_id']}) | Toplam: {summary['total_quantity']} adet | Değer: {summary['total_value']:.2f} ₺"
+        header_text = f"📦 {summary['name']} (ID: {summary['product_id']}) | Toplam: {summary['total_quantity']} adet | Değer: {format_money(summary['total_value'], grouping=False)}"
         
         ctk.CTkLabel(
             header,
@@ -220,12 +232,11 @@ class RemoveStockFrame(ctk.CTkFrame):
         ).pack(pady=12, padx=15)
         
         # Her beden için satır
-        for product in products:
-            # id, product_id, barcode, name, size, quantity, price
+        for item in summary['sizes']:
             card = ctk.CTkFrame(self.result_container, fg_color=("gray80", "gray25"))
             card.pack(fill="x", pady=3, padx=10)
             
-            info_text = f"   {product[4] or '-':^8} | Barkod: {product[2]} | Stok: {product[5]:>4} | Fiyat: {product[6]:.2f} ₺"
+            info_text = f"   {item['size']:^8} | Barkod: {item['barcode']} | Stok: {item['quantity']:>4} | Fiyat: {format_money(item['price'], grouping=False)}"
             
             info_label = ctk.CTkLabel(
                 card,
@@ -255,7 +266,7 @@ class RemoveStockFrame(ctk.CTkFrame):
                 height=30,
                 fg_color=("#C62828", "#B71C1C"),
                 hover_color=("#D32F2F", "#C62828"),
-                command=lambda p=product, q=quantity_entry: self._remove_stock(p[2], q)
+                command=lambda b=item['barcode'], q=quantity_entry: self._remove_stock(b, q)
             )
             remove_btn.pack(side="left", padx=3)
     
@@ -279,7 +290,10 @@ class RemoveStockFrame(ctk.CTkFrame):
             self._show_message("❌ Geçersiz adet!", "red")
             return
         
-        success, message = self.db.remove_stock(barcode, quantity)
+        self.db.remove_stock(barcode, quantity).then(self._on_stock_removed)
+    
+    def _on_stock_removed(self, result):
+        success, message = result
         
         if success:
             self._show_message(f"✅ {message}", "green")
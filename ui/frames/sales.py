@@ -4,9 +4,13 @@ Ana sayfa - Barkod okutma ve satış işlemleri
 """
 
 import customtkinter as ctk
+from collections import Counter
 from typing import Callable, Dict, List
 from datetime import datetime
 
+from money import format_money
+from ui.scan_buffer import ScanBuffer, parse_scan
+
 
 class SalesFrame(ctk.CTkFrame):
     def __init__(self, parent, database, on_update: Callable = None):
@@ -17,6 +21,16 @@ class SalesFrame(ctk.CTkFrame):
         
         # Sepet: {barcode: {product_info, quantity}}
         self.cart: Dict[str, dict] = {}
+        # Sepet satır widget'ları: {barcode: {'row', 'qty_label', 'total_label'}}
+        self.cart_rows: Dict[str, dict] = {}
+        # Artımlı tutulan özet değerleri
+        self.total_qty = 0
+        self.total_price = 0
+        # Satış kaydı arka planda sürerken sepet değiştirilemez
+        self.checkout_pending = False
+        # Okutmalar tampona alınır, art arda gelenler tek seferde işlenir
+        self.scan_buffer = ScanBuffer(self, on_batch=self._on_scan_batch)
+        self.scan_lookup_pending = False
         
         # Ödeme yöntemi (başlangıçta seçili değil)
         self.payment_method = ctk.StringVar(value="")
@@ -55,13 +69,14 @@ class SalesFrame(ctk.CTkFrame):
         
         self.barcode_entry = ctk.CTkEntry(
             barcode_frame,
-            placeholder_text="Barkod okutun veya girin...",
+            placeholder_text="Barkod okutun veya girin (12*barkod)...",
             width=300,
             height=45,
             font=ctk.CTkFont(size=16)
         )
         self.barcode_entry.pack(side="left", padx=5)
-        self.barcode_entry.bind("<Return>", lambda e: self._add_to_cart())
+        self.barcode_entry.bind("<Key>", lambda e: self.scan_buffer.key(e.char, e.time))
+        self.barcode_entry.bind("<Return>", lambda e: self._add_to_cart(e.time))
         
         add_btn = ctk.CTkButton(
             barcode_frame,
@@ -73,6 +88,18 @@ class SalesFrame(ctk.CTkFrame):
         )
         add_btn.pack(side="left", padx=5)
         
+        batch_btn = ctk.CTkButton(
+            barcode_frame,
+            text="📋 TOPLU",
+            width=80,
+            height=45,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color=("#1976D2", "#0D47A1"),
+            hover_color=("#2196F3", "#1976D2"),
+            command=self._show_batch_entry
+        )
+        batch_btn.pack(side="left", padx=5)
+        
         # Tarih/saat
         self.datetime_label = ctk.CTkLabel(
             header,
@@ -83,6 +110,15 @@ class SalesFrame(ctk.CTkFrame):
         self.datetime_label.pack(side="right", padx=20)
         self._update_datetime()
         
+        # Okutma hızı / kayıp okutma sayısı
+        self.scan_stats_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray"
+        )
+        self.scan_stats_label.pack(side="right", padx=10)
+        
         # ===== SOL TARAF - SEPET =====
         cart_container = ctk.CTkFrame(self, fg_color=("gray90", "gray17"))
         cart_container.grid(row=1, column=0, sticky="nsew", padx=(10, 5), pady=5)
@@ -245,144 +281,273 @@ class SalesFrame(ctk.CTkFrame):
         self.datetime_label.configure(text=now)
         self.after(1000, self._update_datetime)
     
-    def _add_to_cart(self):
-        """Barkod ile ürünü sepete ekle."""
-        barcode = self.barcode_entry.get().strip()
-        
-        if not barcode:
-            return
-        
-        product = self.db.search_by_barcode(barcode)
+    def _add_to_cart(self, timestamp_ms: int = None):
+        """Enter / EKLE - okutulan veya yazılan kodu tampona al."""
+        code = self.scan_buffer.submit(self.barcode_entry.get(), timestamp_ms)
+        # Giriş hemen temizlenir, sonraki okutma beklemez
+        self.barcode_entry.delete(0, "end")
+        if not code:
+            self._update_scan_stats()
+    
+    def _show_batch_entry(self):
+        """Toplu giriş penceresi - her satırda "barkod" veya "adet*barkod"."""
+        batch_window = ctk.CTkToplevel(self)
+        batch_window.title("📋 Toplu Ürün Girişi")
+        batch_window.geometry("360x420")
+        batch_window.resizable(False, False)
+        
+        # Ortala
+        batch_window.update()
+        x = self.winfo_rootx() + 200
+        y = self.winfo_rooty() + 100
+        batch_window.geometry(f"+{x}+{y}")
+        
+        # Pencere görünür olduktan sonra grab
+        batch_window.after(100, lambda: batch_window.grab_set())
         
-        if not product:
-            self._show_message("❌ Ürün bulunamadı!", "red")
-            self.barcode_entry.delete(0, "end")
+        ctk.CTkLabel(
+            batch_window,
+            text="Her satıra bir barkod veya adet*barkod\n(ör. 12*8690000000001)",
+            font=ctk.CTkFont(size=13)
+        ).pack(pady=(15, 10))
+        
+        textbox = ctk.CTkTextbox(batch_window, font=ctk.CTkFont(size=13))
+        textbox.pack(fill="both", expand=True, padx=20, pady=5)
+        textbox.focus()
+        
+        def submit():
+            lines = textbox.get("1.0", "end").splitlines()
+            batch_window.destroy()
+            if self.scan_buffer.submit_many(lines) == 0:
+                self._update_scan_stats()
+            self.barcode_entry.focus()
+        
+        ctk.CTkButton(
+            batch_window,
+            text="📥 SEPETE EKLE",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            height=40,
+            fg_color=("#2E7D32", "#1B5E20"),
+            hover_color=("#388E3C", "#2E7D32"),
+            command=submit
+        ).pack(fill="x", padx=20, pady=15)
+    
+    def _on_scan_batch(self, codes: List[str]):
+        """Tampondan gelen okutmalar - tüm farklı barkodlar tek DB çağrısı ile aranır."""
+        counts = Counter()
+        invalid = []
+        for code in codes:
+            try:
+                quantity, barcode = parse_scan(code)
+            except ValueError:
+                invalid.append(code)
+                continue
+            counts[barcode] += quantity
+        
+        if not counts:
+            self._show_message(f"❌ Geçersiz giriş: {', '.join(invalid[:3])}", "red")
             return
         
-        stock_qty = product[5]
-        current_cart_qty = self.cart.get(barcode, {}).get('quantity', 0)
+        # Sonuç gelene kadar yeni okutmalar bekler (stok kontrolü sıralı kalır)
+        self.scan_buffer.hold()
+        self.scan_lookup_pending = True
+        self.db.get_many_by_barcode(list(counts)).then(
+            lambda products: self._on_products_found(counts, products, invalid),
+            lambda error: self._on_scan_error(len(codes) - len(invalid), error)
+        )
+    
+    def _on_products_found(self, counts: Counter, products: Dict[str, object], invalid: List[str] = ()):
+        """Toplu arama sonucu - ürünleri sepete ekle, sepeti bir kez güncelle."""
+        self.scan_lookup_pending = False
+        added = []
+        missing = []
+        short = []
+        
+        for barcode, count in counts.items():
+            product = products.get(barcode)
+            if not product:
+                missing.append(barcode)
+                continue
+            
+            if barcode not in self.cart:
+                self.cart[barcode] = {
+                    'id': product.id,
+                    'product_id': product.product_id,
+                    'barcode': product.barcode,
+                    'name': product.name,
+                    'size': product.size or '-',
+                    'price': product.price,
+                    'stock': product.quantity,
+                    'quantity': 0
+                }
+            item = self.cart[barcode]
+            item['stock'] = product.quantity
+            
+            take = min(count, item['stock'] - item['quantity'])
+            if take < count:
+                short.append(item)
+            if take > 0:
+                self._apply_quantity(barcode, item['quantity'] + take)
+                added.append(barcode)
+            elif item['quantity'] == 0:
+                del self.cart[barcode]
+        
+        for barcode in added:
+            self._update_cart_row(barcode)
+        self._update_summary()
         
-        if current_cart_qty >= stock_qty:
-            self._show_message(f"❌ Yetersiz stok! Mevcut: {stock_qty}", "red")
-            self.barcode_entry.delete(0, "end")
-            return
+        if short:
+            self._show_message(f"❌ Yetersiz stok! {short[0]['name']} mevcut: {short[0]['stock']}", "red")
+        elif missing:
+            self._show_message(f"❌ Ürün bulunamadı! {', '.join(missing[:3])}", "red")
+        elif invalid:
+            self._show_message(f"❌ Geçersiz giriş: {', '.join(invalid[:3])}", "red")
+        elif len(added) == 1 and counts[added[0]] == 1:
+            self._show_message(f"✅ {self.cart[added[0]]['name']} eklendi", "green")
+        elif added:
+            self._show_message(f"✅ {sum(counts.values())} adet eklendi", "green")
         
-        if barcode in self.cart:
-            self.cart[barcode]['quantity'] += 1
-        else:
-            self.cart[barcode] = {
-                'id': product[0],
-                'product_id': product[1],
-                'barcode': product[2],
-                'name': product[3],
-                'size': product[4] or '-',
-                'price': product[6],
-                'stock': stock_qty,
-                'quantity': 1
-            }
-        
-        self._show_message(f"✅ {product[3]} eklendi", "green")
-        self.barcode_entry.delete(0, "end")
         self.barcode_entry.focus()
-        
-        self._refresh_cart()
+        self._update_scan_stats()
+        self.scan_buffer.release()
+    
+    def _on_scan_error(self, scan_count: int, error: Exception):
+        self.scan_lookup_pending = False
+        self.scan_buffer.drop(scan_count)
+        self._show_message(f"❌ Hata: {error}", "red")
+        self._update_scan_stats()
+        self.scan_buffer.release()
+    
+    def _update_scan_stats(self):
+        stats = self.scan_buffer.stats()
+        self.scan_stats_label.configure(
+            text=f"📶 {stats['scans_per_sec']:.1f} okutma/sn | kayıp: {stats['dropped']}"
+        )
+    
+    def _set_quantity(self, barcode: str, new_qty: int):
+        """Satır adedini değiştir - sadece o satırı ve özet toplamlarını güncelle."""
+        self._apply_quantity(barcode, new_qty)
+        self._update_cart_row(barcode)
+        self._update_summary()
+    
+    def _apply_quantity(self, barcode: str, new_qty: int):
+        """Adedi ve artımlı toplamları değiştir (widget'lara dokunmaz)."""
+        item = self.cart[barcode]
+        delta = new_qty - item['quantity']
+        item['quantity'] = new_qty
+        
+        self.total_qty += delta
+        self.total_price += delta * item['price']
     
     def _refresh_cart(self):
-        """Sepet görünümünü yenile."""
-        for widget in self.cart_list.winfo_children():
-            widget.destroy()
+        """Sepet görünümünü baştan oluştur (temizleme sonrası)."""
+        for barcode in list(self.cart_rows):
+            self._destroy_cart_row(barcode)
         
-        if not self.cart:
-            self.empty_cart_label = ctk.CTkLabel(
-                self.cart_list,
-                text="🛒 Sepet boş\nBarkod okutarak ürün ekleyin",
-                font=ctk.CTkFont(size=18),
-                text_color="gray"
-            )
-            self.empty_cart_label.pack(pady=100)
-            self.complete_btn.configure(state="disabled")
-            self._update_summary()
+        self.total_qty = sum(item['quantity'] for item in self.cart.values())
+        self.total_price = sum(item['price'] * item['quantity'] for item in self.cart.values())
+        
+        for barcode in self.cart:
+            self._update_cart_row(barcode)
+        
+        self._update_summary()
+    
+    def _update_cart_row(self, barcode: str):
+        """Tek satırı oluştur veya mevcut satırın etiketlerini güncelle."""
+        item = self.cart[barcode]
+        line_total = item['price'] * item['quantity']
+        
+        widgets = self.cart_rows.get(barcode)
+        if widgets:
+            widgets['qty_label'].configure(text=str(item['quantity']))
+            widgets['total_label'].configure(text=format_money(line_total, grouping=False))
             return
         
-        self.complete_btn.configure(state="normal")
+        self.empty_cart_label.pack_forget()
         
-        for barcode, item in self.cart.items():
-            row = ctk.CTkFrame(self.cart_list, fg_color=("gray85", "gray22"), height=45)
-            row.pack(fill="x", pady=2)
-            row.pack_propagate(False)
-            
-            ctk.CTkLabel(
-                row,
-                text=item['name'][:25],
-                font=ctk.CTkFont(size=12),
-                width=200,
-                anchor="w"
-            ).pack(side="left", padx=5, pady=8)
-            
-            ctk.CTkLabel(
-                row,
-                text=item['size'],
-                font=ctk.CTkFont(size=12),
-                width=60
-            ).pack(side="left", padx=5)
-            
-            qty_frame = ctk.CTkFrame(row, fg_color="transparent", width=60)
-            qty_frame.pack(side="left", padx=5)
-            qty_frame.pack_propagate(False)
-            
-            ctk.CTkButton(
-                qty_frame,
-                text="-",
-                width=20,
-                height=25,
-                command=lambda b=barcode: self._change_quantity(b, -1)
-            ).pack(side="left")
-            
-            ctk.CTkLabel(
-                qty_frame,
-                text=str(item['quantity']),
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=20
-            ).pack(side="left", padx=2)
-            
-            ctk.CTkButton(
-                qty_frame,
-                text="+",
-                width=20,
-                height=25,
-                command=lambda b=barcode: self._change_quantity(b, 1)
-            ).pack(side="left")
-            
-            ctk.CTkLabel(
-                row,
-                text=f"{item['price']:.2f} ₺",
-                font=ctk.CTkFont(size=12),
-                width=80
-            ).pack(side="left", padx=5)
-            
-            line_total = item['price'] * item['quantity']
-            ctk.CTkLabel(
-                row,
-                text=f"{line_total:.2f} ₺",
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=90
-            ).pack(side="left", padx=5)
-            
-            ctk.CTkButton(
-                row,
-                text="✕",
-                width=30,
-                height=25,
-                fg_color=("#E53935", "#C62828"),
-                hover_color=("#F44336", "#E53935"),
-                command=lambda b=barcode: self._remove_from_cart(b)
-            ).pack(side="left", padx=5)
+        row = ctk.CTkFrame(self.cart_list, fg_color=("gray85", "gray22"), height=45)
+        row.pack(fill="x", pady=2)
+        row.pack_propagate(False)
         
-        self._update_summary()
+        ctk.CTkLabel(
+            row,
+            text=item['name'][:25],
+            font=ctk.CTkFont(size=12),
+            width=200,
+            anchor="w"
+        ).pack(side="left", padx=5, pady=8)
+        
+        ctk.CTkLabel(
+            row,
+            text=item['size'],
+            font=ctk.CTkFont(size=12),
+            width=60
+        ).pack(side="left", padx=5)
+        
+        qty_frame = ctk.CTkFrame(row, fg_color="transparent", width=60)
+        qty_frame.pack(side="left", padx=5)
+        qty_frame.pack_propagate(False)
+        
+        ctk.CTkButton(
+            qty_frame,
+            text="-",
+            width=20,
+            height=25,
+            command=lambda b=barcode: self._change_quantity(b, -1)
+        ).pack(side="left")
+        
+        qty_label = ctk.CTkLabel(
+            qty_frame,
+            text=str(item['quantity']),
+            font=ctk.CTkFont(size=12, weight="bold"),
+            width=20
+        )
+        qty_label.pack(side="left", padx=2)
+        
+        ctk.CTkButton(
+            qty_frame,
+            text="+",
+            width=20,
+            height=25,
+            command=lambda b=barcode: self._change_quantity(b, 1)
+        ).pack(side="left")
+        
+        ctk.CTkLabel(
+            row,
+            text=format_money(item['price'], grouping=False),
+            font=ctk.CTkFont(size=12),
+            width=80
+        ).pack(side="left", padx=5)
+        
+        total_label = ctk.CTkLabel(
+            row,
+            text=format_money(line_total, grouping=False),
+            font=ctk.CTkFont(size=12, weight="bold"),
+            width=90
+        )
+        total_label.pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            row,
+            text="✕",
+            width=30,
+            height=25,
+            fg_color=("#E53935", "#C62828"),
+            hover_color=("#F44336", "#E53935"),
+            command=lambda b=barcode: self._remove_from_cart(b)
+        ).pack(side="left", padx=5)
+        
+        self.cart_rows[barcode] = {'row': row, 'qty_label': qty_label, 'total_label': total_label}
+    
+    def _destroy_cart_row(self, barcode: str):
+        """Tek satırın widget'larını kaldır."""
+        widgets = self.cart_rows.pop(barcode, None)
+        if widgets:
+            widgets['row'].destroy()
     
     def _change_quantity(self, barcode: str, delta: int):
         """Adet değiştir."""
-        if barcode not in self.cart:
+        if barcode not in self.cart or self.checkout_pending:
             return
         
         new_qty = self.cart[barcode]['quantity'] + delta
@@ -395,24 +560,28 @@ class SalesFrame(ctk.CTkFrame):
             self._show_message(f"❌ Yetersiz stok! Max: {self.cart[barcode]['stock']}", "red")
             return
         
-        self.cart[barcode]['quantity'] = new_qty
-        self._refresh_cart()
+        self._set_quantity(barcode, new_qty)
     
     def _remove_from_cart(self, barcode: str):
         """Ürünü sepetten çıkar."""
-        if barcode in self.cart:
-            del self.cart[barcode]
-            self._refresh_cart()
+        if barcode in self.cart and not self.checkout_pending:
+            item = self.cart.pop(barcode)
+            self.total_qty -= item['quantity']
+            self.total_price -= item['price'] * item['quantity']
+            self._destroy_cart_row(barcode)
+            self._update_summary()
     
     def _update_summary(self):
-        """Özet bilgileri güncelle."""
-        item_count = len(self.cart)
-        total_qty = sum(item['quantity'] for item in self.cart.values())
-        total_price = sum(item['price'] * item['quantity'] for item in self.cart.values())
-        
-        self.items_count_label.configure(text=str(item_count))
-        self.total_qty_label.configure(text=str(total_qty))
-        self.total_price_label.configure(text=f"{total_price:,.2f} ₺")
+        """Özet bilgileri güncelle (toplamlar artımlı tutulur)."""
+        if not self.cart:
+            self.empty_cart_label.pack(pady=100)
+            self.complete_btn.configure(state="disabled")
+        else:
+            self.complete_btn.configure(state="normal")
+        
+        self.items_count_label.configure(text=str(len(self.cart)))
+        self.total_qty_label.configure(text=str(self.total_qty))
+        self.total_price_label.configure(text=format_money(self.total_price))
     
     def _on_cash_selected(self):
         """Nakit seçildiğinde kredi kartını kaldır."""
@@ -432,7 +601,7 @@ class SalesFrame(ctk.CTkFrame):
     
     def _complete_sale(self):
         """Satışı tamamla - stoktan düş ve kaydet."""
-        if not self.cart:
+        if not self.cart or self.checkout_pending:
             return
         
         # Ödeme yöntemi kontrolü
@@ -441,35 +610,43 @@ class SalesFrame(ctk.CTkFrame):
             self._show_message("❌ Ödeme yöntemi seçin!", "red")
             return
         
-        total = sum(item['price'] * item['quantity'] for item in self.cart.values())
-        
-        # Satış kaydı için item listesi
-        items_for_record = []
-        
-        # Stokları düş
-        errors = []
-        for barcode, item in self.cart.items():
-            success, msg = self.db.remove_stock(barcode, item['quantity'])
-            if not success:
-                errors.append(f"{item['name']}: {msg}")
-            else:
-                items_for_record.append({
-                    'barcode': barcode,
-                    'name': item['name'],
-                    'size': item['size'],
-                    'quantity': item['quantity'],
-                    'price': item['price'],
-                    'total': item['price'] * item['quantity']
-                })
-        
-        # Satışı kaydet
-        if not errors:
-            self.db.record_sale(total, payment_method, items_for_record)
-            
-            payment_text = "💵 Nakit" if payment_method == "cash" else "💳 Kredi Kartı"
-            self._show_message(f"✅ Satış tamamlandı!\n{payment_text}: {total:,.2f} ₺", "green")
-        else:
-            self._show_message("⚠️ Bazı hatalar: " + ", ".join(errors), "orange")
+        # Okutulan ama henüz sepete eklenmemiş ürünler satışa dahil olmalı
+        if self.scan_lookup_pending or self.scan_buffer.has_pending():
+            self._show_message("⏳ Okutmalar işleniyor, tekrar deneyin", "orange")
+            return
+        
+        total = self.total_price
+        
+        # Stok düşümü + satış kaydı tek transaction (kısmi yazma yok).
+        # İşçi thread'i sepetin kopyasını okur; sonuç gelene kadar sepet kilitli.
+        cart = {barcode: dict(item) for barcode, item in self.cart.items()}
+        self.checkout_pending = True
+        self.complete_btn.configure(state="disabled")
+        # Bu sırada okutulanlar kuyrukta bekler, sonuç gelince sepete eklenir
+        self.scan_buffer.hold()
+        self.db.checkout(cart, payment_method).then(
+            lambda result: self._on_checkout_done(result, payment_method, total),
+            lambda error: self._on_checkout_done((False, f"Hata: {error}", []), payment_method, total)
+        )
+    
+    def _on_checkout_done(self, result, payment_method: str, total: int):
+        """Satış kaydı sonucu."""
+        success, msg, failures = result
+        self.checkout_pending = False
+        
+        if not success:
+            self.complete_btn.configure(state="normal")
+            # Sepet korunur - kasiyer hatalı satırları düzeltebilir
+            for failure in failures:
+                if failure['barcode'] in self.cart:
+                    self.cart[failure['barcode']]['stock'] = failure['available']
+            errors = [f"{f['name']}: {f['reason']}" for f in failures] or [msg]
+            self._show_message("⚠️ Satış yapılamadı: " + ", ".join(errors), "orange")
+            self.scan_buffer.release()
+            return
+        
+        payment_text = "💵 Nakit" if payment_method == "cash" else "💳 Kredi Kartı"
+        self._show_message(f"✅ Satış tamamlandı!\n{payment_text}: {format_money(total)}", "green")
         
         # Sepeti ve ödeme seçimini temizle
         self.cart.clear()
@@ -477,6 +654,7 @@ class SalesFrame(ctk.CTkFrame):
         self.cash_selected.set(False)
         self.card_selected.set(False)
         self.payment_method.set("")
+        self.scan_buffer.release()
         
         # Footer'ı güncelle
         if self.on_update:
@@ -484,6 +662,8 @@ class SalesFrame(ctk.CTkFrame):
     
     def _clear_cart(self):
         """Sepeti temizle."""
+        if self.checkout_pending:
+            return
         self.cart.clear()
         self._refresh_cart()
         self._show_message("🗑️ Sepet temizlendi", "gray")
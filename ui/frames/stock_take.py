@@ -0,0 +1,354 @@
+"""
+Stok Sayımı Frame
+Ürünler serbestçe okutulur, sayımlar bellekte toplanır (okutma başına
+veritabanı çağrısı yok). Farklar tek sorguda hesaplanır, düzeltmeler tek
+transaction'da denetim kaydıyla uygulanır.
+"""
+
+import customtkinter as ctk
+from typing import Callable, Dict, List, Tuple
+
+from ui.scan_buffer import ScanBuffer, parse_scan
+from ui.widgets.virtual_list import VirtualList
+from money import format_money
+
+
+class StockTakeFrame(ctk.CTkFrame):
+    def __init__(self, parent, database, on_update: Callable = None):
+        super().__init__(parent, fg_color="transparent")
+        
+        self.db = database
+        self.on_update = on_update
+        
+        # Sayım: {barcode: adet} ve geri alma için okutma geçmişi
+        self.counts: Dict[str, int] = {}
+        self.history: List[Tuple[str, int]] = []
+        self.full_count = ctk.BooleanVar(value=False)
+        # Uygulama sürerken yeni okutmalar bekler
+        self.apply_pending = False
+        self.scan_buffer = ScanBuffer(self, on_batch=self._on_scan_batch)
+        
+        self._create_widgets()
+    
+    def _create_widgets(self):
+        # Başlık
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=20, pady=(20, 10))
+        
+        ctk.CTkLabel(
+            header,
+            text="🧮 STOK SAYIMI",
+            font=ctk.CTkFont(size=24, weight="bold")
+        ).pack(side="left")
+        
+        # Okutma alanı
+        scan_frame = ctk.CTkFrame(header, fg_color="transparent")
+        scan_frame.pack(side="right")
+        
+        self.scan_entry = ctk.CTkEntry(
+            scan_frame,
+            placeholder_text="Barkod okutun (12*barkod)...",
+            width=260,
+            height=38
+        )
+        self.scan_entry.pack(side="left", padx=5)
+        self.scan_entry.bind("<Key>", lambda e: self.scan_buffer.key(e.char, e.time))
+        self.scan_entry.bind("<Return>", lambda e: self._add_scan(e.time))
+        
+        ctk.CTkButton(
+            scan_frame,
+            text="↩️ Geri Al",
+            width=90,
+            height=38,
+            fg_color=("#455A64", "#37474F"),
+            hover_color="#546E7A",
+            command=self._undo_last
+        ).pack(side="left", padx=5)
+        
+        # Sayım durumu ve işlemler
+        status_frame = ctk.CTkFrame(self, fg_color=("gray85", "gray22"))
+        status_frame.pack(fill="x", padx=20, pady=5)
+        
+        self.count_label = ctk.CTkLabel(
+            status_frame,
+            text="Okutulan: 0 çeşit / 0 adet",
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.count_label.pack(side="left", padx=15, pady=10)
+        
+        self.last_scan_label = ctk.CTkLabel(
+            status_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray"
+        )
+        self.last_scan_label.pack(side="left", padx=10)
+        
+        ctk.CTkButton(
+            status_frame,
+            text="🗑️ SIFIRLA",
+            width=100,
+            height=35,
+            fg_color=("#C62828", "#B71C1C"),
+            hover_color=("#D32F2F", "#C62828"),
+            command=self._reset_session
+        ).pack(side="right", padx=(5, 15), pady=8)
+        
+        self.apply_btn = ctk.CTkButton(
+            status_frame,
+            text="✅ UYGULA",
+            width=100,
+            height=35,
+            fg_color=("#2E7D32", "#1B5E20"),
+            hover_color=("#388E3C", "#2E7D32"),
+            command=self._apply,
+            state="disabled"
+        )
+        self.apply_btn.pack(side="right", padx=5, pady=8)
+        
+        ctk.CTkButton(
+            status_frame,
+            text="🔍 FARKLARI HESAPLA",
+            width=160,
+            height=35,
+            command=self._compare
+        ).pack(side="right", padx=5, pady=8)
+        
+        ctk.CTkCheckBox(
+            status_frame,
+            text="Tam sayım (sayılmayanlar = 0)",
+            variable=self.full_count,
+            font=ctk.CTkFont(size=12),
+            command=self._on_scope_change
+        ).pack(side="right", padx=10)
+        
+        # Tablo başlıkları
+        headers_frame = ctk.CTkFrame(self, fg_color=("gray80", "gray25"))
+        headers_frame.pack(fill="x", padx=20, pady=(10, 0))
+        
+        headers = [
+            ("Ürün ID", 100),
+            ("Barkod", 120),
+            ("Ürün Adı", 170),
+            ("Beden", 55),
+            ("Sistem", 60),
+            ("Sayılan", 60),
+            ("Fark", 60),
+            ("Değer Farkı", 100)
+        ]
+        
+        for text, width in headers:
+            ctk.CTkLabel(
+                headers_frame,
+                text=text,
+                font=ctk.CTkFont(size=12, weight="bold"),
+                width=width
+            ).pack(side="left", padx=2, pady=10)
+        
+        # Fark listesi - binlerce satırda da sabit widget sayısı
+        self.list_container = VirtualList(
+            self,
+            columns=[(width, "w") for _, width in headers],
+            formatter=self._format_row,
+            row_height=36,
+            padx=2,
+            fg_color=("gray95", "gray17"),
+            height=300
+        )
+        self.list_container.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        self.list_container.show_placeholder(
+            "📦 Ürünleri okutun, sonra FARKLARI HESAPLA'ya basın\n\n"
+            "Tam sayımda okutulmayan ürünlerin stoku 0 kabul edilir"
+        )
+        
+        # Özet
+        self.footer = ctk.CTkFrame(self, fg_color=("gray85", "gray22"), height=50)
+        self.footer.pack(fill="x", padx=20, pady=(0, 10))
+        self.footer.pack_propagate(False)
+        
+        self.summary_label = ctk.CTkLabel(
+            self.footer,
+            text="",
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.summary_label.pack(side="left", padx=20, pady=12)
+        
+        self.unknown_label = ctk.CTkLabel(
+            self.footer,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="orange"
+        )
+        self.unknown_label.pack(side="right", padx=20, pady=12)
+        
+        # Mesaj alanı
+        self.message_label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(size=14)
+        )
+        self.message_label.pack(pady=5)
+    
+    # ========== OKUTMA ==========
+    
+    def _add_scan(self, timestamp_ms: int = None):
+        """Enter - okutulan veya yazılan kodu tampona al."""
+        self.scan_buffer.submit(self.scan_entry.get(), timestamp_ms)
+        self.scan_entry.delete(0, "end")
+    
+    def _on_scan_batch(self, codes: List[str]):
+        """Okutmaları sayıma ekle - veritabanına gidilmez."""
+        invalid = []
+        for code in codes:
+            try:
+                quantity, barcode = parse_scan(code)
+            except ValueError:
+                invalid.append(code)
+                continue
+            self.counts[barcode] = self.counts.get(barcode, 0) + quantity
+            self.history.append((barcode, quantity))
+        
+        if self.history:
+            barcode, quantity = self.history[-1]
+            self.last_scan_label.configure(text=f"Son: {barcode} ×{quantity} (toplam {self.counts[barcode]})")
+        if invalid:
+            self._show_message(f"❌ Geçersiz giriş: {', '.join(invalid[:3])}", "red")
+        
+        self._update_count_label()
+        self._mark_stale()
+    
+    def _undo_last(self):
+        """Son okutmayı geri al."""
+        if not self.history or self.apply_pending:
+            return
+        
+        barcode, quantity = self.history.pop()
+        self.counts[barcode] -= quantity
+        if self.counts[barcode] <= 0:
+            del self.counts[barcode]
+        
+        self.last_scan_label.configure(text=f"Geri alındı: {barcode} ×{quantity}")
+        self._update_count_label()
+        self._mark_stale()
+        self.scan_entry.focus()
+    
+    def _update_count_label(self):
+        self.count_label.configure(
+            text=f"Okutulan: {len(self.counts)} çeşit / {sum(self.counts.values())} adet"
+        )
+    
+    def _mark_stale(self):
+        """Sayım değişti - gösterilen farklar eskidi, önce yeniden hesaplanmalı."""
+        self.apply_btn.configure(state="disabled")
+    
+    def _on_scope_change(self):
+        self._mark_stale()
+    
+    # ========== KARŞILAŞTIRMA / UYGULAMA ==========
+    
+    def _compare(self):
+        """Farkları hesapla (arka planda, tek sorgu)."""
+        if not self.counts and not self.full_count.get():
+            self._show_message("❌ Önce ürün okutun!", "red")
+            return
+        
+        self.summary_label.configure(text="⏳ Hesaplanıyor...")
+        self.db.compare_stock_count(dict(self.counts), self.full_count.get()).then(
+            self._show_differences,
+            lambda error: self._show_message(f"❌ Hata: {error}", "red")
+        )
+    
+    def _show_differences(self, result: Dict):
+        differences = result['differences']
+        unknown = result['unknown']
+        
+        if differences:
+            self.list_container.set_rows(differences)
+        else:
+            self.list_container.show_placeholder("✅ Sayım ile stok birebir uyuşuyor")
+        
+        self.summary_label.configure(
+            text=f"{len(differences)} farklı ürün | Adet farkı: {result['quantity_delta']:+d} | "
+                 f"Değer farkı: {format_money(result['value_delta'])}"
+        )
+        self.unknown_label.configure(
+            text=f"⚠️ {len(unknown)} bilinmeyen barkod: {', '.join(unknown[:3])}" if unknown else ""
+        )
+        self.apply_btn.configure(state="normal" if differences else "disabled")
+    
+    def _format_row(self, row):
+        """Tek bir fark satırının sütun metinleri."""
+        barcode, row_id, product_id, name, size, price, expected, counted = row
+        difference = counted - expected
+        
+        return [
+            product_id,
+            barcode,
+            name[:20] + "..." if len(name) > 20 else name,
+            size or "-",
+            str(expected),
+            str(counted),
+            f"{difference:+d}",
+            format_money(difference * price, grouping=False)
+        ]
+    
+    def _apply(self):
+        """Tüm farkları tek transaction'da uygula."""
+        if self.apply_pending:
+            return
+        
+        dialog = ctk.CTkInputDialog(
+            text="Stoklar sayıma göre düzeltilecek.\nUygulamak için 'EVET' yazın:",
+            title="Sayım Onayı"
+        )
+        result = dialog.get_input()
+        if not (result and result.upper() == "EVET"):
+            return
+        
+        self.apply_pending = True
+        self.apply_btn.configure(state="disabled")
+        self.scan_buffer.hold()
+        self.db.apply_stock_take(dict(self.counts), self.full_count.get()).then(
+            self._on_applied,
+            lambda error: self._on_applied((False, f"Hata: {error}"))
+        )
+    
+    def _on_applied(self, result):
+        success, message = result
+        self.apply_pending = False
+        self.scan_buffer.release()
+        
+        if success:
+            self._show_message(f"✅ {message}", "green")
+            self._reset_session(confirm=False)
+            if self.on_update:
+                self.on_update()
+        else:
+            self.apply_btn.configure(state="normal")
+            self._show_message(f"❌ {message}", "red")
+    
+    def _reset_session(self, confirm: bool = True):
+        """Sayımı baştan başlat."""
+        if self.apply_pending:
+            return
+        if confirm and self.counts:
+            dialog = ctk.CTkInputDialog(
+                text="Okutulan tüm sayım silinecek.\nDevam etmek için 'EVET' yazın:",
+                title="Sayımı Sıfırla"
+            )
+            result = dialog.get_input()
+            if not (result and result.upper() == "EVET"):
+                return
+        
+        self.counts.clear()
+        self.history.clear()
+        self.last_scan_label.configure(text="")
+        self.summary_label.configure(text="")
+        self.unknown_label.configure(text="")
+        self.list_container.show_placeholder("📦 Ürünleri okutun, sonra FARKLARI HESAPLA'ya basın")
+        self._update_count_label()
+        self._mark_stale()
+    
+    def _show_message(self, text: str, color: str):
+        self.message_label.configure(text=text, text_color=color)
+        self.after(3000, lambda: self.message_label.configure(text=""))
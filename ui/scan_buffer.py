@@ -0,0 +1,220 @@
+"""
+Barkod okuyucu giriş tamponu
+El okuyucuları barkodu ve Enter'ı birkaç milisaniyede klavye olarak yazar.
+Tuşlar arası süreye bakarak okuyucu patlamaları (burst) elle yazımdan
+ayrılır; tamamlanan kodlar kuyruğa alınır ve kısa bir pencere içinde gelen
+okutmalar tek toplu işlem olarak teslim edilir (tek DB çağrısı, tek sepet
+güncellemesi).
+
+Kod "adet*barkod" biçiminde de olabilir ("12*8690000000001"); kasiyer
+"12*" yazıp okutursa önek okuyucu kodunun başına eklenir. Çözümlemek için
+parse_scan kullanılır.
+
+Kullanım:
+    buffer = ScanBuffer(root, on_batch=self._on_scan_batch)
+    entry.bind("<Key>", lambda e: buffer.key(e.char, e.time))
+    entry.bind("<Return>", lambda e: buffer.submit(entry.get(), e.time))
+"""
+
+import re
+import time
+from collections import deque
+from typing import Callable, Dict, List, Tuple
+
+
+# Okuyucu tuşları arası en fazla süre (elle yazım genelde 80 ms üzeri)
+SCANNER_KEY_GAP_MS = 35
+# Okuyucu kodu sayılması için en az karakter
+MIN_SCAN_LENGTH = 4
+# Art arda okutmaların tek toplu işlemde birleştirildiği süre
+BATCH_WINDOW_MS = 40
+# İşlenmeyi bekleyen en fazla kod - fazlası kayıp sayılır
+MAX_PENDING = 500
+# Okutma/saniye hesabı için kayan pencere
+RATE_WINDOW_S = 10.0
+# Tek satırda girilebilecek en fazla adet ("adet*barkod")
+MAX_SCAN_QUANTITY = 9999
+
+_QUANTITY_PREFIX = re.compile(r"^\s*(\d+)\s*\*\s*")
+
+
+def parse_scan(code: str) -> Tuple[int, str]:
+    """
+    "adet*barkod" veya "barkod" -> (adet, barkod).
+    
+    Raises:
+        ValueError: Geçersiz adet veya boş barkod
+    """
+    quantity = 1
+    match = _QUANTITY_PREFIX.match(code)
+    if match:
+        quantity = int(match.group(1))
+        code = code[match.end():]
+        if not 1 <= quantity <= MAX_SCAN_QUANTITY:
+            raise ValueError(f"Geçersiz adet: {quantity}")
+    
+    barcode = code.strip()
+    if not barcode:
+        raise ValueError("Boş barkod")
+    return quantity, barcode
+
+
+class ScanBuffer:
+    """
+    Tuş vuruşlarını okutmalara, okutmaları toplu işlere çevirir.
+    
+    Widget'a dokunmaz; sadece root.after ile zamanlama yapar. hold()
+    çağrıldığında (ör. önceki toplu işin DB sonucu veya satış kaydı
+    beklenirken) kodlar kuyrukta bekler, release() sonrası teslim edilir.
+    """
+    
+    def __init__(self, root, on_batch: Callable[[List[str]], None]):
+        self.root = root
+        self.on_batch = on_batch
+        
+        # Son hızlı tuş dizisi (okuyucu adayı) ve son tuş zamanı
+        self._run: List[str] = []
+        self._last_key_ms = None
+        
+        self._pending: List[str] = []
+        self._flush_id = None
+        self._holds = 0
+        
+        # İstatistikler
+        self.scans = 0
+        self.scanner_scans = 0
+        self.manual_scans = 0
+        self.dropped = 0
+        self.batches = 0
+        self._recent = deque()
+    
+    # ========== GİRİŞ ==========
+    
+    def key(self, char: str, timestamp_ms: int):
+        """Yazdırılabilir bir tuş vuruşunu kaydet (Tk event.char / event.time)."""
+        if not char or not char.isprintable():
+            return
+        
+        if self._last_key_ms is None or timestamp_ms - self._last_key_ms > SCANNER_KEY_GAP_MS:
+            # Uzun ara - yeni dizi başlar (öncesi elle yazılmış olabilir)
+            self._run = []
+        self._run.append(char)
+        self._last_key_ms = timestamp_ms
+    
+    def submit(self, entry_text: str, timestamp_ms: int = None) -> str:
+        """
+        Enter geldi - kodu belirle ve kuyruğa al.
+        
+        Enter'dan hemen önce hızlı bir tuş dizisi varsa kod o dizidir
+        (girişte elle yazılmış artıklar olsa bile); yoksa giriş metni
+        elle girilmiş kod olarak alınır.
+        
+        Returns:
+            Kuyruğa alınan kod ("" = boş giriş veya kayıp)
+        """
+        is_burst = (
+            timestamp_ms is not None and self._last_key_ms is not None
+            and len(self._run) >= MIN_SCAN_LENGTH
+            and timestamp_ms - self._last_key_ms <= SCANNER_KEY_GAP_MS
+        )
+        if is_burst:
+            code = "".join(self._run)
+            # Okutmadan önce yazılmış adet öneki ("12*") korunur
+            prefix = entry_text[:-len(code)] if entry_text.endswith(code) else ""
+            if _QUANTITY_PREFIX.fullmatch(prefix):
+                code = prefix.strip() + code
+        else:
+            code = entry_text.strip()
+        self._run = []
+        self._last_key_ms = None
+        
+        if not code:
+            return ""
+        
+        self.scans += 1
+        if is_burst:
+            self.scanner_scans += 1
+        else:
+            self.manual_scans += 1
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > RATE_WINDOW_S:
+            self._recent.popleft()
+        
+        if len(self._pending) >= MAX_PENDING:
+            self.dropped += 1
+            return ""
+        
+        self._pending.append(code)
+        self._schedule()
+        return code
+    
+    def submit_many(self, codes: List[str]) -> int:
+        """
+        Toplu giriş (yapıştırılan liste) - tüm kodlar aynı toplu işe girer.
+        
+        Returns:
+            Kuyruğa alınan kod sayısı
+        """
+        codes = [code.strip() for code in codes if code.strip()]
+        room = MAX_PENDING - len(self._pending)
+        accepted, rejected = codes[:max(room, 0)], codes[max(room, 0):]
+        
+        self.scans += len(codes)
+        self.manual_scans += len(codes)
+        self.dropped += len(rejected)
+        self._pending.extend(accepted)
+        self._schedule()
+        return len(accepted)
+    
+    # ========== TESLİM ==========
+    
+    def hold(self):
+        """Teslimi durdur - kodlar kuyrukta birikir."""
+        self._holds += 1
+    
+    def release(self):
+        """hold() karşılığı; bekleyen kodlar varsa teslim edilir."""
+        self._holds = max(0, self._holds - 1)
+        self._schedule()
+    
+    def has_pending(self) -> bool:
+        """Teslim edilmeyi bekleyen okutma var mı?"""
+        return bool(self._pending)
+    
+    def drop(self, count: int):
+        """Teslim edildiği halde işlenemeyen kodları kayıp say (ör. DB hatası)."""
+        self.dropped += count
+    
+    def _schedule(self):
+        if self._pending and not self._holds and self._flush_id is None:
+            self._flush_id = self.root.after(BATCH_WINDOW_MS, self._flush)
+    
+    def _flush(self):
+        self._flush_id = None
+        if self._holds or not self._pending:
+            return
+        
+        codes, self._pending = self._pending, []
+        self.batches += 1
+        self.on_batch(codes)
+    
+    # ========== İSTATİSTİK ==========
+    
+    def rate(self) -> float:
+        """Son RATE_WINDOW_S saniyedeki okutma/saniye."""
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > RATE_WINDOW_S:
+            self._recent.popleft()
+        return len(self._recent) / RATE_WINDOW_S
+    
+    def stats(self) -> Dict:
+        return {
+            'scans': self.scans,
+            'scanner_scans': self.scanner_scans,
+            'manual_scans': self.manual_scans,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'pending': len(self._pending),
+            'scans_per_sec': self.rate()
+        }
@@ -0,0 +1 @@
+# Widgets Package
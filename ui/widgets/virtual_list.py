@@ -0,0 +1,206 @@
+"""
+Sanal (virtualized) satır listesi
+Sabit sayıda satır widget'ı oluşturur; kaydırınca widget'lar yeniden
+kullanılır ve sadece verileri değişir. Satır sayısı ne olursa olsun
+widget sayısı sabit kalır.
+"""
+
+import sys
+import customtkinter as ctk
+from typing import Callable, List, Sequence, Tuple
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Geri dönüştürülen satır havuzu ile liste.
+    
+    Args:
+        columns: [(genişlik, anchor), ...] - her sütun için bir CTkLabel
+        formatter: satır verisi -> sütun metinleri listesi
+        actions: [(metin, fg_color, hover_color, callback(row)), ...] satır butonları
+        row_height: Satır yüksekliği (piksel)
+    """
+    
+    def __init__(self, parent, columns: Sequence[Tuple[int, str]], formatter: Callable,
+                 actions: Sequence[Tuple] = (), row_height: int = 35,
+                 row_color=("gray90", "gray20"), padx: int = 3, font_size: int = 11, **kwargs):
+        super().__init__(parent, **kwargs)
+        
+        self.columns = list(columns)
+        self.formatter = formatter
+        self.actions = list(actions)
+        self.row_height = row_height
+        self.row_color = row_color
+        self.padx = padx
+        self.font = ctk.CTkFont(size=font_size)
+        
+        self.rows: List = []
+        self.offset = 0
+        # Havuz: [(row_frame, [labels]), ...]
+        self._pool: List[Tuple[ctk.CTkFrame, List[ctk.CTkLabel]]] = []
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        # Boş liste / yer tutucu alanı
+        self.placeholder = ctk.CTkFrame(self.viewport, fg_color="transparent")
+        
+        self.viewport.bind("<Configure>", self._on_resize)
+        self.bind_all("<MouseWheel>", self._on_mouse_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_mouse_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_mouse_wheel, add="+")
+    
+    # ========== VERİ ==========
+    
+    def set_rows(self, rows: List, keep_offset: bool = False):
+        """Listeyi yeni verilerle doldur (widget oluşturmaz, havuzu yeniden bağlar)."""
+        self.rows = rows
+        if not keep_offset:
+            self.offset = 0
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self.placeholder.place_forget()
+        self._render()
+    
+    def show_placeholder(self, text: str, button_text: str = None, command: Callable = None,
+                         text_color="gray"):
+        """Satırları gizle ve ortada mesaj (ve isteğe bağlı buton) göster."""
+        self.rows = []
+        self.offset = 0
+        self._render()
+        
+        for widget in self.placeholder.winfo_children():
+            widget.destroy()
+        
+        ctk.CTkLabel(
+            self.placeholder,
+            text=text,
+            font=ctk.CTkFont(size=16),
+            text_color=text_color,
+            justify="center"
+        ).pack(pady=(80, 10))
+        
+        if button_text:
+            ctk.CTkButton(
+                self.placeholder,
+                text=button_text,
+                font=ctk.CTkFont(size=14, weight="bold"),
+                height=40,
+                width=150,
+                command=command
+            ).pack()
+        
+        self.placeholder.place(relx=0.5, y=0, anchor="n")
+    
+    def widget_count(self) -> int:
+        """Havuzdaki satır widget sayısı (satır sayısından bağımsız)."""
+        return len(self._pool)
+    
+    # ========== HAVUZ / ÇİZİM ==========
+    
+    def _visible_count(self) -> int:
+        height = max(self.viewport.winfo_height(), self.row_height)
+        return height // self.row_height + 1
+    
+    def _max_offset(self) -> int:
+        return max(0, len(self.rows) - self._visible_count() + 1)
+    
+    def _ensure_pool(self):
+        """Görünen satır sayısı kadar widget olsun - sadece pencere büyüyünce artar."""
+        needed = self._visible_count()
+        while len(self._pool) < needed:
+            slot = len(self._pool)
+            row = ctk.CTkFrame(self.viewport, fg_color=self.row_color, height=self.row_height - 2)
+            row.pack_propagate(False)
+            
+            labels = []
+            for width, anchor in self.columns:
+                label = ctk.CTkLabel(row, text="", font=self.font, width=width, anchor=anchor)
+                label.pack(side="left", padx=self.padx, pady=5)
+                labels.append(label)
+            
+            for text, fg_color, hover_color, callback in self.actions:
+                ctk.CTkButton(
+                    row,
+                    text=text,
+                    width=32,
+                    height=self.row_height - 10,
+                    fg_color=fg_color,
+                    hover_color=hover_color,
+                    command=lambda s=slot, cb=callback: self._on_action(s, cb)
+                ).pack(side="left", padx=2)
+            
+            self._pool.append((row, labels))
+    
+    def _render(self):
+        self._ensure_pool()
+        for slot, (row, labels) in enumerate(self._pool):
+            index = self.offset + slot
+            if index >= len(self.rows):
+                row.place_forget()
+                continue
+            
+            texts = self.formatter(self.rows[index])
+            for label, text in zip(labels, texts):
+                if label.cget("text") != text:
+                    label.configure(text=text)
+            row.place(x=0, y=slot * self.row_height, relwidth=1.0)
+        
+        self._update_scrollbar()
+    
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.offset / total
+        last = min(1.0, (self.offset + self._visible_count() - 1) / total)
+        self.scrollbar.set(first, last)
+    
+    # ========== OLAYLAR ==========
+    
+    def _scroll_to(self, offset: int):
+        offset = max(0, min(offset, self._max_offset()))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+    
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible_count() - 1
+            self._scroll_to(self.offset + step)
+    
+    def _on_mouse_wheel(self, event):
+        # Sadece imleç bu listenin (veya alt widget'larının) üzerindeyse kaydır;
+        # yol bileşen bazında karşılaştırılır (".!virtuallist2", ".!virtuallist"
+        # ile başlasa da onun altında değildir)
+        widget, path = str(event.widget), str(self)
+        if widget != path and not widget.startswith(path + "."):
+            return
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        elif sys.platform == "darwin":
+            step = -event.delta
+        else:
+            step = -3 * (event.delta // 120)
+        self._scroll_to(self.offset + step)
+    
+    def _on_resize(self, event=None):
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self._render()
+    
+    def _on_action(self, slot: int, callback: Callable):
+        index = self.offset + slot
+        if index < len(self.rows):
+            callback(self.rows[index])